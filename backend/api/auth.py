@@ -9,7 +9,7 @@ from sqlalchemy.exc import IntegrityError
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 
-from db.session import get_db
+from db.session import get_db, get_read_db, SessionLocal
 from models.company import Company as CompanyModel
 from models.user import User as UserModel
 
@@ -154,7 +154,7 @@ class MeOut(BaseModel):
     user_type: str
     comp_domain: str
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -163,7 +163,12 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise HTTPException(status_code=401, detail="토큰이 만료되었거나 올바르지 않습니다.")
 
+    # 매 요청마다 조회 → 레플리카에서 읽음
     user = db.query(UserModel).filter(UserModel.user_email == email).first()
+    if not user:
+        # 방금 가입해서 레플리카에 아직 없을 수 있음 → primary 에서 한 번 더
+        with SessionLocal() as primary:
+            user = primary.query(UserModel).filter(UserModel.user_email == email).first()
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
     return user
@@ -1,17 +1,21 @@
 # backend/api/chat.py
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
 import anyio
 
 # ⬇️ 변경: 기존 db.qa_faiss_store 대신 services.rag_engine 사용
 # from db.qa_faiss_store import qa  # (삭제)
-from services.rag_engine import ask as rag_ask  # (추가)
+from services.rag_engine import ask_with_match as rag_ask  # (추가) 조회수는 아래에서 비동기로
+from services.view_logger import aincrement_view_from_metadata
+from db.vector_collections import UnknownCollectionError
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
 class AskReq(BaseModel):
     question: str = Field(..., min_length=1)
+    # 검색할 컬렉션 (예: ["faq/hr", "laws"]), 비우면 RAG_COLLECTIONS 기본값
+    collections: Optional[List[str]] = None
 
 class AskResp(BaseModel):
     answer: str
@@ -25,8 +29,15 @@ async def ask(req: AskReq) -> AskResp:
 
     try:
         # rag_engine.ask 는 동기 함수이므로 스레드로 실행(이벤트 루프 블로킹 방지)
-        answer, sources = await anyio.to_thread.run_sync(rag_ask, q)
+        answer, sources, matched = await anyio.to_thread.run_sync(rag_ask, q, req.collections)
+        # 가장 유사한 FAQ 조회수 +1 (비동기 세션, 실패해도 답변은 그대로)
+        try:
+            await aincrement_view_from_metadata(matched)
+        except Exception:
+            pass
         return AskResp(answer=answer or "응답이 비어 있습니다.", sources=sources or [])
+    except UnknownCollectionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception:
         # 내부 에러 상세는 서버 로그로 남기고, 사용자에겐 일반 메시지
         return AskResp(answer="죄송합니다. 답변을 생성할 수 없습니다.", sources=[])
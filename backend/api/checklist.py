@@ -5,7 +5,7 @@ from typing import List, Optional
 from datetime import datetime
 from sqlalchemy.orm import joinedload
 
-from db.session import get_db
+from db.session import get_db, get_read_db
 from models.checklist import Checklist
 from models.user import User
 from api.auth import get_current_user   # ✅ auth.py에서 가져옴 (JWT 인증)
@@ -42,7 +42,7 @@ class ChecklistOut(BaseModel):
 # ✅ 체크리스트 목록 조회 (내가 받은/보낸 것 모두)
 @router.get("/", response_model=List[ChecklistOut])
 def list_checklists(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),   # 읽기 전용 → 레플리카
     current_user: User = Depends(get_current_user)
 ):
     checklists = (
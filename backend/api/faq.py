@@ -1,30 +1,35 @@
 # backend/api/faq.py
-from fastapi import APIRouter, Body, BackgroundTasks, Depends, HTTPException, Path
-import fitz  # PyMuPDF
-import openai
+from fastapi import APIRouter, Body, Depends, HTTPException, Path
 import os
-import glob
 from typing import List, Optional
-import shutil
+import anyio
 
 # === DB / 모델 ===
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select  # ✅ 옵션 A 검증용
-from db.session import get_db
+from db.session import get_db, get_async_db
 from models.faq import CompFAQ
 from models.company import Company  # ✅ 옵션 A 검증용
 
 # === 벡터 인덱스 업서트 (배치 유틸 재사용) ===
 #   backend/db/ingest_faq_to_faiss.py 에 정의됨
-from db.ingest_faq_to_faiss import upsert_faqs_to_faiss
-from db.ingest_faq_to_faiss import rebuild_faiss_index
-
-# === OpenAI 설정 ===
-openai_api_key = os.getenv("OPENAI_API_KEY", "sk-...YOUR_KEY...")
-openai_client = openai.OpenAI(api_key=openai_api_key)
+#   실제 반영은 영속 작업 큐(index 큐)를 db/index_writer.py 의 단일 writer 가 병합해서 처리
+from db.ingest_faq_to_faiss import (
+    prepare_faq_deletion, commit_faq_deletion, abort_faq_deletion,
+)
+from db.index_writer import enqueue_upsert, enqueue_delete, index_queue_stats
+from services.job_worker import get_embedded_index_writer
+from services.rate_limiter import BATCH
+from services.llm_gateway import get_llm_gateway
+from services import pdf_text
+from services.upload_store import find_upload, get_upload_root
+from services import document_registry
+
+# === LLM 설정 (호출은 services/llm_gateway.py 공용 게이트웨이) ===
+SUMMARY_MODEL = "gpt-3.5-turbo"
 
 router = APIRouter()
-UPLOAD_DIR = "./uploaded_files"  # 실제 업로드 경로 유지
 
 # === 옵션 A: 엄격 도메인 검증 스위치 ===
 STRICT_DOMAIN = True  # 존재하지 않는 comp_domain이면 409로 차단
@@ -32,17 +37,14 @@ STRICT_DOMAIN = True  # 존재하지 않는 comp_domain이면 409로 차단
 # ---------------------------
 # 유틸: PDF 텍스트 추출
 # ---------------------------
-def extract_text_from_pdf_path(path: str) -> str:
-    doc = fitz.open(path)
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    return text
+def extract_text_from_pdf_path(path: str, max_chars: Optional[int] = None) -> str:
+    """정리된 본문 텍스트 (services/pdf_text: 내용 해시 캐시 → 같은 업로드는 한 번만 파싱)"""
+    return pdf_text.extract_text(path, max_chars=max_chars)
 
 # ---------------------------
 # 유틸: GPT에게 FAQ 생성 요청
 # ---------------------------
-def ask_gpt_for_faq(text: str) -> str:
+async def ask_gpt_for_faq(text: str, use_cache: bool = True) -> str:
     prompt = f"""
     다음은 회사 문서의 본문입니다. 이 내용을 요약하고, 주요 고객 질문(FAQ) 3~5개와 그에 대한 답변을 생성해 주세요.
 
@@ -57,39 +59,40 @@ def ask_gpt_for_faq(text: str) -> str:
     Q2: ...
     A2: ...
     """
-    response = openai_client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=1024,
-        temperature=0.2,
+    # 캐시(같은 본문은 재사용) / 레이트 리미터(batch 우선순위 → 채팅에 양보) / 재시도는 게이트웨이에서
+    return await get_llm_gateway().achat(
+        [{"role": "user", "content": prompt}],
+        model=SUMMARY_MODEL, temperature=0.2, max_tokens=1024,
+        priority=BATCH, use_cache=use_cache, tag="faq_summary",
     )
-    return response.choices[0].message.content
 
 # ---------------------------
 # 엔드포인트: 업로드 파일 → 요약/FAQ 생성
 # ---------------------------
 @router.post("/ai/extract-faq")
-async def extract_faq(data: dict = Body(...)):
+async def extract_faq(data: dict = Body(...), db: AsyncSession = Depends(get_async_db)):
     """
     요청 예시:
-    { "file_id": "abcd-1234" }
+    { "file_id": "abcd-1234" }            # "no_cache": true 면 LLM 응답 캐시 사용 안 함
     """
     file_id = data.get("file_id")
-    # 확장자 무관하게 file_id로 시작하는 파일 찾기
-    files = glob.glob(os.path.join(UPLOAD_DIR, f"{file_id}.*"))
-    if not files:
-        return {"summary": "파일을 찾을 수 없습니다.", "faqs": []}
-
-    file_path = files[0]
-    text = extract_text_from_pdf_path(file_path)
+    use_cache = not data.get("no_cache", False)
+    # file_id → 저장 경로: 문서 레지스트리 인덱스 조회, 없으면 저장소에서 (예전 uuid.확장자 파일도 찾음)
+    doc = await db.run_sync(document_registry.find_document, file_id)
+    file_path = doc.stored_path if doc is not None else None
+    if not file_path or not os.path.exists(file_path):
+        path = find_upload(file_id)
+        if path is None:
+            return {"summary": "파일을 찾을 수 없습니다.", "faqs": []}
+        file_path = str(path)
 
     # 텍스트가 너무 길면 앞부분 일부만 사용 (토큰 초과 방지)
     max_chars = 6000
-    if len(text) > max_chars:
-        text = text[:max_chars]
+    # PDF 파싱은 스레드에서 (이벤트 루프 블로킹 방지)
+    text = await anyio.to_thread.run_sync(extract_text_from_pdf_path, file_path, max_chars)
 
     try:
-        gpt_result = ask_gpt_for_faq(text)
+        gpt_result = await ask_gpt_for_faq(text, use_cache)
         summary = gpt_result.split("FAQ:")[0].replace("요약:", "").strip()
         faqs = []
         try:
@@ -127,7 +130,7 @@ class FAQCommitIn(BaseModel):
 # 엔드포인트: FAQ 저장 → 임베딩/FAISS 업서트 (옵션 A: 엄격 도메인 검증 추가)
 # ---------------------------
 @router.post("/faq/commit")
-def commit_faqs(payload: FAQCommitIn, bg: BackgroundTasks, db: Session = Depends(get_db)):
+def commit_faqs(payload: FAQCommitIn, db: Session = Depends(get_db)):
     """
     요청 예시:
     {
@@ -139,7 +142,8 @@ def commit_faqs(payload: FAQCommitIn, bg: BackgroundTasks, db: Session = Depends
       ]
     }
     - qa_id 가 있으면 UPDATE, 없으면 INSERT
-    - DB 반영 직후, 백그라운드에서 해당 항목만 벡터화 → FAISS 업서트
+    - DB 반영 직후, index 작업 큐에 qa_id를 넣음 → writer 가 모아서 벡터화 후 FAISS 업서트
+    - 응답의 job_id 로 GET /jobs/{job_id} 에서 진행 상태 확인
     """
     # 0) comp_domain 정규화(공백 제거만; 케이스는 DB 값과 동일 사용)
     comp_domain = (payload.comp_domain or "").strip()
@@ -160,18 +164,22 @@ def commit_faqs(payload: FAQCommitIn, bg: BackgroundTasks, db: Session = Depends
             )
 
     # sc_file 기본값: 항목에 없으면 공통값 사용, 그것도 없으면 'manual'
-    default_sc_file = (payload.source_file or "").strip() or "manual"
+    # (업로드 file_id 가 오면 레지스트리의 원래 파일명으로)
+    default_sc_file = document_registry.source_name(db, comp_domain, (payload.source_file or "").strip()) or "manual"
 
     faq_ids: List[int] = []
+    touched = set()
 
     # 1) DB 반영
     for it in payload.items:
-        sc_file_val = (it.sc_file or "").strip() or default_sc_file
+        sc_file_val = document_registry.source_name(db, comp_domain, (it.sc_file or "").strip()) or default_sc_file
+        touched.add(sc_file_val)
 
         if it.qa_id:  # UPDATE
             row = db.query(CompFAQ).filter(CompFAQ.qa_id == it.qa_id).first()
             if not row:
                 raise HTTPException(status_code=404, detail=f"QA {it.qa_id} not found")
+            touched.add(row.sc_file)
             row.question    = it.question
             row.answer      = it.answer
             row.ref_article = it.ref_article
@@ -192,35 +200,51 @@ def commit_faqs(payload: FAQCommitIn, bg: BackgroundTasks, db: Session = Depends
             faq_ids.append(row.qa_id)
 
     db.commit()
+    document_registry.refresh_faq_counts(db, comp_domain, touched)
 
     # 2) 비동기 벡터화 → FAISS 업서트
-    #    (동일 id는 제거 후 재추가)
-    bg.add_task(upsert_faqs_to_faiss, comp_domain, faq_ids)
+    #    (동일 id는 제거 후 재추가, 동시 저장은 writer 에서 한 번의 save 로 병합)
+    job_id = enqueue_upsert(faq_ids)
 
-    return {"ok": True, "faq_ids": faq_ids, "count": len(faq_ids)}
+    return {"ok": True, "faq_ids": faq_ids, "count": len(faq_ids), "job_id": job_id}
 @router.delete("/faq/files/{filename}")
 def delete_faq_file(
     filename: str = Path(..., description="삭제할 파일명"),
     db: Session = Depends(get_db),
 ):
     # 1) DB에서 해당 파일 관련 FAQ 삭제
-    print("🗑️ DELETE 요청 filename =", filename)
     rows = db.query(CompFAQ).filter(CompFAQ.sc_file == filename).all()
-    print("🗑️ DB 조회된 rows =", len(rows))
-    if not rows:
+    # FAQ 가 없는 문서도 레지스트리에서는 지움 (commit 은 아래 FAQ 삭제와 한 번에)
+    docs = document_registry.delete_documents(db, filename)
+    if not rows and not docs:
+        db.rollback()
         raise HTTPException(status_code=404, detail="해당 파일 관련 FAQ 없음")
-    for row in rows:
-        db.delete(row)
-    db.commit()
 
-    # 2) 업로드된 파일 삭제
-    file_path = os.path.join(UPLOAD_DIR, filename)
+    # 삭제 대상 qa_id를 저널에 먼저 기록 → 중간에 죽어도 재시작 시 인덱스 정리
+    qa_ids = [row.qa_id for row in rows]
+    entry_id = prepare_faq_deletion(qa_ids)
+    try:
+        for row in rows:
+            db.delete(row)
+        db.commit()  # 레지스트리 삭제 + FAQ 삭제를 한 트랜잭션으로
+    except Exception:
+        db.rollback()
+        abort_faq_deletion(entry_id)
+        raise
+    commit_faq_deletion(entry_id)
+
+    # 2) 예전 방식(파일명 그대로)으로 업로드된 파일 삭제
+    #    내용 주소 저장소(objects/)의 파일은 다른 회사/문서와 공유될 수 있어서 남겨 둠
+    file_path = os.path.join(get_upload_root(), filename)
     if os.path.exists(file_path):
         os.remove(file_path)
 
-    # 3) FAISS 인덱스 재빌드 (안전하게 전체 리빌드)
-    rebuild_faiss_index(db)
-    
-    
+    # 3) FAISS 인덱스에서 해당 qa_id 벡터만 제거 (index 큐 → writer, 재임베딩 없음)
+    job_id = enqueue_delete(qa_ids)
+
+    return {"ok": True, "deleted_count": len(rows), "job_id": job_id}
 
-    return {"ok": True, "deleted_count": len(rows)}
\ No newline at end of file
+@router.get("/faq/index/stats")
+def get_index_stats():
+    """인덱스 writer 큐 깊이 / 반영 지연 시간"""
+    return index_queue_stats(get_embedded_index_writer())
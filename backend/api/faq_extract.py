@@ -1,73 +1,278 @@
 # backend/api/faq_extract.py
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from pathlib import Path
-import shutil, uuid
+import json, asyncio
+import anyio
+from typing import Optional
 
-from db.session import get_db
-from api.main_faq import faq_from_pdf, save_rows_to_db
+from db.session import get_async_db
 from models.user import User as UserModel
+from services.job_queue import get_job_queue, wait_for_job, DONE, DEAD
+from services.job_worker import EXTRACT_QUEUE, KIND_FAQ_EXTRACT
+from services.upload_store import (
+    save_upload, find_upload, upload_name, exceeds_limit, UploadTooLarge,
+    init_session, session_status, write_part, complete_session, abort_session, UploadSessionError,
+)
+from services import document_registry
+from api.main_faq import extract_progress, asave_rows_to_db
 from api.auth import get_current_user   # ✅ 추가
 
 router = APIRouter(prefix="/admin/files", tags=["files"])
 
-UPLOAD_DIR = Path("uploaded_files")
-UPLOAD_DIR.mkdir(exist_ok=True)
-
 # ----------------------
 # 파일 업로드
+# - 청크 단위로 디스크에 쓰면서 sha256 계산, 내용 주소로 저장 (services/upload_store.py)
+# - file_id = sha256 → 같은 이름의 다른 파일이 서로 덮어쓰지 않음
+# - 같은 내용을 다시 올리면 dedup=true, 텍스트/LLM 캐시가 내용 기준이라 추출도 바로 끝남
+# - 원래 파일명은 문서 레지스트리(comp_document)에 회사별로 등록해서 FAQ 출처(sc_file)로 사용
 # ----------------------
 @router.post("/upload")
 async def upload_file(
+    request: Request,
     file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)  # ✅ JWT 인증
 ):
     if current_user.user_type != "admin":
         raise HTTPException(status_code=403, detail="관리자만 업로드 가능합니다.")
+    if exceeds_limit(request.headers.get("content-length")):
+        raise HTTPException(status_code=413, detail="파일이 너무 큽니다.")
+
+    try:
+        saved = await save_upload(file, owner=current_user.comp_domain)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    await db.run_sync(document_registry.register_upload, current_user.comp_domain, saved)
+
+    return {"file_id": saved["file_id"], "filename": saved["filename"], "path": saved["path"],
+            "size": saved["size"], "dedup": saved["dedup"], "text_cached": saved["text_cached"]}
+
+# ----------------------
+# 분할 업로드 (큰 문서 / 모바일 이어 올리기, 프로토콜은 api/files.py 와 같음)
+# - 세션은 회사(comp_domain) 단위, 다른 회사 세션은 없는 것처럼 404
+# ----------------------
+def _require_admin(current_user: UserModel):
+    if current_user.user_type != "admin":
+        raise HTTPException(status_code=403, detail="관리자만 업로드 가능합니다.")
 
-    # ✅ 원래 파일명 사용
-    fid = file.filename
-    path = UPLOAD_DIR / fid
+def _session_error(e: UploadSessionError) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=str(e))
 
-    with open(path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+@router.post("/uploads")
+async def start_upload(payload: dict, current_user: UserModel = Depends(get_current_user)):
+    _require_admin(current_user)
+    try:
+        return await anyio.to_thread.run_sync(
+            init_session, payload.get("filename"), int(payload.get("size") or 0),
+            current_user.comp_domain, payload.get("part_size"))
+    except UploadSessionError as e:
+        raise _session_error(e)
 
-    return {"file_id": fid, "path": str(path)}
+@router.get("/uploads/{upload_id}")
+async def get_upload(upload_id: str, current_user: UserModel = Depends(get_current_user)):
+    _require_admin(current_user)
+    try:
+        return await anyio.to_thread.run_sync(session_status, upload_id, current_user.comp_domain)
+    except UploadSessionError as e:
+        raise _session_error(e)
+
+@router.put("/uploads/{upload_id}/parts/{part_number}")
+async def upload_part(upload_id: str, part_number: int, request: Request,
+                      current_user: UserModel = Depends(get_current_user)):
+    _require_admin(current_user)
+    try:
+        return await write_part(upload_id, part_number, request.stream(),
+                                request.headers.get("x-part-sha256"), owner=current_user.comp_domain)
+    except UploadSessionError as e:
+        raise _session_error(e)
+
+@router.post("/uploads/{upload_id}/complete")
+async def complete_upload(upload_id: str, payload: dict = None, db: AsyncSession = Depends(get_async_db),
+                          current_user: UserModel = Depends(get_current_user)):
+    _require_admin(current_user)
+    try:
+        saved = await anyio.to_thread.run_sync(
+            complete_session, upload_id, current_user.comp_domain, (payload or {}).get("sha256"))
+    except UploadSessionError as e:
+        raise _session_error(e)
+    await db.run_sync(document_registry.register_upload, current_user.comp_domain, saved)
+    return {"file_id": saved["file_id"], "filename": saved["filename"], "path": saved["path"],
+            "size": saved["size"], "dedup": saved["dedup"], "text_cached": saved["text_cached"]}
+
+@router.delete("/uploads/{upload_id}")
+async def cancel_upload(upload_id: str, current_user: UserModel = Depends(get_current_user)):
+    _require_admin(current_user)
+    try:
+        await anyio.to_thread.run_sync(abort_session, upload_id, current_user.comp_domain)
+    except UploadSessionError as e:
+        raise _session_error(e)
+    return {"ok": True}
 
 # ----------------------
 # FAQ 추출
+# - 추출은 extract 작업 큐로 넘기고, 요청은 이벤트 루프에서 비동기로 결과만 기다림
+# - {"wait": false} 로 보내면 job_id 만 바로 반환 (GET /jobs/{job_id} 로 확인)
+# - 섹션별 LLM 응답은 캐시되므로 analyze 후 save 는 API 호출 없이 끝남 ({"no_cache": true} 로 끌 수 있음)
+# - DB 는 비동기 세션 (get_async_db) → 쿼리 대기 중에도 이벤트 루프가 다른 요청 처리
 # ----------------------
+async def _enqueue_extract(db: AsyncSession, fid: str, comp_domain: str, save: bool, use_cache: bool = True,
+                           dedup_threshold: Optional[float] = None) -> str:
+    # 레지스트리 인덱스 조회 → 없으면(등록 전 업로드) 저장소에서 직접 찾음
+    doc = await db.run_sync(document_registry.find_document, fid, comp_domain)
+    pdf_path = Path(doc.stored_path) if doc is not None and doc.stored_path else None
+    if pdf_path is None or not pdf_path.exists():
+        pdf_path = find_upload(fid)
+    if pdf_path is None:
+        raise HTTPException(status_code=404, detail="업로드된 파일을 찾을 수 없습니다.")
+    source_name = doc.file_name if doc is not None else (upload_name(fid, comp_domain) or pdf_path.name)
+    return get_job_queue().enqueue(
+        KIND_FAQ_EXTRACT,
+        {"pdf_path": str(pdf_path.resolve()), "file_id": fid, "source_name": source_name,
+         "comp_domain": comp_domain, "save": save, "cache": use_cache,
+         "dedup_threshold": dedup_threshold},
+        queue=EXTRACT_QUEUE,
+    )
+
+def _result_rows(job: dict) -> list:
+    """끝난 추출 작업의 FAQ 행 (결과가 비어 있으면 TypeError 대신 작업 오류와 함께 500)"""
+    result = job.get("result")
+    if not isinstance(result, dict) or result.get("rows") is None:
+        raise HTTPException(status_code=500,
+                            detail={"msg": "FAQ 추출 결과가 없습니다.", "job_id": job["job_id"],
+                                    "status": job["status"], "error": job.get("last_error")})
+    return result["rows"]
+
 @router.post("/analyze")
 async def analyze_file(
     payload: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)  # ✅ JWT 인증
 ):
     if current_user.user_type != "admin":
         raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
 
     fid = payload["file_id"]
-    pdf_path = UPLOAD_DIR / fid
-    rows = await faq_from_pdf(pdf_path)
+    job_id = await _enqueue_extract(db, fid, current_user.comp_domain, save=False,
+                                    use_cache=not payload.get("no_cache", False))
+    if not payload.get("wait", True):
+        return {"job_id": job_id}
+
+    job = await wait_for_job(job_id)
+    if not job or job["status"] != DONE:
+        raise HTTPException(
+            status_code=504 if job and job["status"] != DEAD else 500,
+            detail={"msg": "FAQ 추출이 끝나지 않았습니다.", "job_id": job_id,
+                    "status": job["status"] if job else None,
+                    "error": job["last_error"] if job else None},
+        )
+    rows = _result_rows(job)
     return {
         "summary": "FAQ 자동 추출 결과",
         "faqs": [{"q": r["question"], "a": r["answer"]} for r in rows],
+        "job_id": job_id,
+    }
+
+# ----------------------
+# 추출 작업 API (비동기)
+# - POST /jobs            : 추출 시작 → job_id
+# - GET  /jobs/{id}       : 진행 상황 (섹션 완료/전체, Q/A 수, ETA), 끝나면 결과 포함
+# - GET  /jobs/{id}/events: 같은 내용을 SSE 로 스트리밍 (끝나면 done 이벤트 후 종료)
+# - 끝난 결과는 작업 큐에 남아 있으므로 /save 에 job_id 를 주면 다시 추출하지 않고 저장
+# ----------------------
+SSE_INTERVAL = 1.0   # 초
+
+def _get_extract_job(job_id: str, current_user: UserModel) -> dict:
+    job = get_job_queue().get(job_id)
+    # 다른 회사의 작업은 없는 것처럼 처리
+    if (not job or job["kind"] != KIND_FAQ_EXTRACT
+            or job["payload"].get("comp_domain") != current_user.comp_domain):
+        raise HTTPException(status_code=404, detail="추출 작업을 찾을 수 없습니다.")
+    return job
+
+def _job_view(job: dict) -> dict:
+    out = {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "file_id": job["payload"].get("file_id") or Path(job["payload"]["pdf_path"]).name,
+        "filename": job["payload"].get("source_name"),
+        "progress": extract_progress(job.get("progress")),
+        "error": job["last_error"] if job["status"] == DEAD else None,
     }
+    if job["status"] == DONE and job["result"] and job["result"].get("rows") is not None:
+        out["faqs"] = [{"q": r["question"], "a": r["answer"]} for r in job["result"]["rows"]]
+    return out
+
+@router.post("/jobs")
+async def start_extract_job(
+    payload: dict,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    if current_user.user_type != "admin":
+        raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
+    job_id = await _enqueue_extract(db, payload["file_id"], current_user.comp_domain, save=False,
+                                    use_cache=not payload.get("no_cache", False))
+    return {"job_id": job_id}
+
+@router.get("/jobs/{job_id}")
+def get_extract_job(job_id: str, current_user: UserModel = Depends(get_current_user)):
+    return _job_view(_get_extract_job(job_id, current_user))
+
+@router.get("/jobs/{job_id}/events")
+async def stream_extract_job(job_id: str, current_user: UserModel = Depends(get_current_user)):
+    _get_extract_job(job_id, current_user)
+    queue = get_job_queue()
+
+    async def events():
+        last = None
+        while True:
+            job = await anyio.to_thread.run_sync(queue.get, job_id)
+            if job is None:
+                yield "event: error\ndata: {}\n\n"
+                return
+            view = _job_view(job)
+            finished = job["status"] in (DONE, DEAD)
+            body = json.dumps(view, ensure_ascii=False)
+            if body != last:
+                last = body
+                yield f"event: {'done' if finished else 'progress'}\ndata: {body}\n\n"
+            elif not finished:
+                yield ": keep-alive\n\n"
+            if finished:
+                return
+            await asyncio.sleep(SSE_INTERVAL)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 # ----------------------
-# DB 저장
+# DB 저장 (추출 + 저장을 작업 큐에 넣고 바로 반환)
 # ----------------------
 @router.post("/save")
 async def save_to_db(
     payload: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)  # ✅ JWT 인증
 ):
     if current_user.user_type != "admin":
         raise HTTPException(status_code=403, detail="관리자만 저장 가능합니다.")
 
+    # 끝난 추출 작업이 있으면 그 결과를 그대로 저장 (LLM 재호출 없음)
+    if payload.get("job_id"):
+        job = _get_extract_job(payload["job_id"], current_user)
+        if job["status"] != DONE:
+            raise HTTPException(status_code=409,
+                                detail={"msg": "추출이 아직 끝나지 않았습니다.", "status": job["status"]})
+        rows = _result_rows(job)
+        report = await asave_rows_to_db(rows, current_user.comp_domain, db,
+                                        threshold=payload.get("dedup_threshold"))
+        return {"ok": True, "job_id": job["job_id"], "saved": report["saved"], "dedup": report}
+
     fid = payload["file_id"]
-    pdf_path = UPLOAD_DIR / fid
-    rows = await faq_from_pdf(pdf_path)
-    save_rows_to_db(rows, comp_domain=current_user.comp_domain, db=db)  # ✅ 현재 로그인한 유저 회사 도메인 사용
-    return {"ok": True, "count": len(rows)}
+    # ✅ 현재 로그인한 유저 회사 도메인 사용
+    job_id = await _enqueue_extract(db, fid, current_user.comp_domain, save=True,
+                                    use_cache=not payload.get("no_cache", False),
+                                    dedup_threshold=payload.get("dedup_threshold"))
+    return {"ok": True, "job_id": job_id}
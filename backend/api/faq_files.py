@@ -1,23 +1,38 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from db.session import get_db
-from models.faq import CompFAQ
+from db.session import get_read_db
 from api.auth import get_current_user
+from services import document_registry
 
 router = APIRouter()
 
 @router.get("/faq/files")
 def list_uploaded_files(
-    db: Session = Depends(get_db),
+    detail: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    db: Session = Depends(get_read_db),   # 읽기 전용 → 레플리카
     current_user=Depends(get_current_user)
 ):
     """
-    회사별(comp_domain) 업로드된 문서 파일 목록 반환 (sc_file 기준, 중복 제거)
+    회사별(comp_domain) 업로드 문서 목록 (문서 레지스트리, 최근 업로드 순)
+    - 기본: 파일명 목록 (예전 응답과 같은 모양)
+    - detail=true: file_id / 크기 / 페이지 / 상태 / FAQ 수 포함, limit / offset 으로 페이지 나눔
     """
-    rows = (
-        db.query(CompFAQ.sc_file)
-        .filter(CompFAQ.comp_domain == current_user.comp_domain)
-        .group_by(CompFAQ.sc_file)
-        .all()
-    )
-    return [r.sc_file for r in rows]
+    docs = document_registry.list_documents(db, current_user.comp_domain, limit=limit, offset=offset)
+    if detail:
+        return [document_registry.to_dict(d) for d in docs]
+    return [d.file_name for d in docs]
+
+@router.get("/faq/files/{file_id}")
+def get_uploaded_file(
+    file_id: str,
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user)
+):
+    """file_id(sha256) 또는 파일명으로 문서 하나 조회"""
+    doc = document_registry.find_document(db, file_id, current_user.comp_domain)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다.")
+    return document_registry.to_dict(doc)
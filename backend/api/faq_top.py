@@ -1,13 +1,13 @@
 # backend/api/faq_top.py
 from fastapi import APIRouter
 from sqlalchemy import text
-from db.session import get_db
+from db.session import get_read_db   # 읽기 전용 → 레플리카 (DB_REPLICA_URLS)
 
 router = APIRouter(prefix="/faq", tags=["faq"])
 
 @router.get("/top")
 def top_faqs(limit: int = 10):
-    db = next(get_db())
+    db = next(get_read_db())
     try:
         rows = db.execute(text("""
             SELECT qa_id, question, answer, ref_article, views,
@@ -23,7 +23,7 @@ def top_faqs(limit: int = 10):
 @router.get("/all")
 def all_faqs():
     """모든 FAQ를 views 내림차순으로 전부 반환 (순위 포함)"""
-    db = next(get_db())
+    db = next(get_read_db())
     try:
         rows = db.execute(text("""
             SELECT qa_id, question, answer, ref_article, views,
@@ -1,22 +1,84 @@
 # backend/api/files.py
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
-import os
-import uuid
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Depends
+import anyio
 
-router = APIRouter()
+from models.user import User as UserModel
+from api.auth import get_current_user
+
+from services.upload_store import (
+    save_upload, exceeds_limit, UploadTooLarge,
+    init_session, session_status, write_part, complete_session, abort_session, UploadSessionError,
+)
 
-UPLOAD_DIR = os.path.join(os.path.dirname(__file__), '..', 'uploaded_files')
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+router = APIRouter()
 
 @router.post("/files/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(request: Request, file: UploadFile = File(...)):
+    # 청크 단위로 디스크에 쓰면서 해시 → 같은 내용은 기존 파일 재사용 (services/upload_store.py)
+    if exceeds_limit(request.headers.get("content-length")):
+        raise HTTPException(status_code=413, detail="파일이 너무 큽니다.")
     try:
-        ext = file.filename.split('.')[-1]
-        file_id = str(uuid.uuid4())
-        save_path = os.path.join(UPLOAD_DIR, f"{file_id}.{ext}")
-        with open(save_path, "wb") as buffer:
-            buffer.write(await file.read())
-        return {"file_id": file_id, "filename": file.filename}
+        saved = await save_upload(file)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return {"file_id": saved["file_id"], "filename": file.filename, "size": saved["size"],
+            "dedup": saved["dedup"]}
+
+
+# ----------------------
+# 분할 업로드 (이어 올리기)
+# - POST   /files/uploads                       {"filename", "size", "part_size"?} → upload_id, part_size, total_parts
+# - PUT    /files/uploads/{id}/parts/{n}        본문 = 파트 바이트, 헤더 X-Part-Sha256 필수 (재전송/병렬 가능)
+# - GET    /files/uploads/{id}                  받은/남은 파트 (끊긴 뒤 이어 올릴 때)
+# - POST   /files/uploads/{id}/complete         {"sha256"?} → 단일 업로드와 같은 응답
+# - DELETE /files/uploads/{id}                  취소
+# - 로그인 필요, 세션은 회사(comp_domain) 단위 → 다른 회사 세션은 조회/이어쓰기/취소 불가 (404)
+# ----------------------
+def _session_error(e: UploadSessionError) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=str(e))
+
+@router.post("/files/uploads")
+async def start_upload(payload: dict, current_user: UserModel = Depends(get_current_user)):
+    try:
+        return await anyio.to_thread.run_sync(
+            init_session, payload.get("filename"), int(payload.get("size") or 0),
+            current_user.comp_domain, payload.get("part_size"))
+    except UploadSessionError as e:
+        raise _session_error(e)
+
+@router.get("/files/uploads/{upload_id}")
+async def get_upload(upload_id: str, current_user: UserModel = Depends(get_current_user)):
+    try:
+        return await anyio.to_thread.run_sync(session_status, upload_id, current_user.comp_domain)
+    except UploadSessionError as e:
+        raise _session_error(e)
+
+@router.put("/files/uploads/{upload_id}/parts/{part_number}")
+async def upload_part(upload_id: str, part_number: int, request: Request,
+                      current_user: UserModel = Depends(get_current_user)):
+    try:
+        return await write_part(upload_id, part_number, request.stream(),
+                                request.headers.get("x-part-sha256"), owner=current_user.comp_domain)
+    except UploadSessionError as e:
+        raise _session_error(e)
+
+@router.post("/files/uploads/{upload_id}/complete")
+async def complete_upload(upload_id: str, payload: dict = None,
+                          current_user: UserModel = Depends(get_current_user)):
+    try:
+        saved = await anyio.to_thread.run_sync(
+            complete_session, upload_id, current_user.comp_domain, (payload or {}).get("sha256"))
+    except UploadSessionError as e:
+        raise _session_error(e)
+    return {"file_id": saved["file_id"], "filename": saved["filename"], "size": saved["size"],
+            "dedup": saved["dedup"]}
+
+@router.delete("/files/uploads/{upload_id}")
+async def cancel_upload(upload_id: str, current_user: UserModel = Depends(get_current_user)):
+    try:
+        await anyio.to_thread.run_sync(abort_session, upload_id, current_user.comp_domain)
+    except UploadSessionError as e:
+        raise _session_error(e)
+    return {"ok": True}
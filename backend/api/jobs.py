@@ -0,0 +1,48 @@
+# backend/api/jobs.py
+from fastapi import APIRouter, Depends, HTTPException
+
+from models.user import User as UserModel
+from api.auth import get_current_user
+from services.job_queue import get_job_queue, public_job
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+def _require_admin(current_user: UserModel):
+    if current_user.user_type != "admin":
+        raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
+
+@router.get("/stats")
+def job_stats(current_user: UserModel = Depends(get_current_user)):
+    """큐별 상태 개수 (queued / running / done / dead)"""
+    _require_admin(current_user)
+    q = get_job_queue()
+    return {name: q.counts(name) for name in ("index", "extract")}
+
+@router.get("/llm")
+def llm_stats(current_user: UserModel = Depends(get_current_user)):
+    """LLM 게이트웨이 지표 (tag 별 호출/오류/재시도/토큰/지연) + 레이트 리미터 / 응답 캐시 상태"""
+    _require_admin(current_user)
+    from services.llm_gateway import get_llm_gateway
+    from services.rate_limiter import get_rate_limiter
+    from services.llm_cache import get_llm_cache
+    cache = get_llm_cache()
+    return {
+        "gateway": get_llm_gateway().stats(),
+        "rate_limiter": get_rate_limiter().stats(),
+        "cache": cache.stats() if cache else None,
+    }
+
+@router.get("/{job_id}")
+def get_job(job_id: str, current_user: UserModel = Depends(get_current_user)):
+    """
+    작업 상태 (result 에 추출된 FAQ 가 들어 있으므로 자기 회사 작업만)
+    - comp_domain 이 없는 작업(index writer 등 회사 공용)은 관리자만
+    """
+    job = get_job_queue().get(job_id)
+    if job:
+        owner = job["payload"].get("comp_domain")
+        visible = owner == current_user.comp_domain if owner else current_user.user_type == "admin"
+    # 다른 회사의 작업은 없는 것처럼 처리
+    if not job or not visible:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return public_job(job)
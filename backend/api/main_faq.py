@@ -1,19 +1,23 @@
 # backend/api/main_faq.py
-import os, re, json, time, asyncio
+import os, re, json, time, asyncio, glob, hashlib
 from pathlib import Path
-from typing import List, Dict
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv, find_dotenv
 
-from pypdf import PdfReader
-import httpx
-from difflib import SequenceMatcher
 from tqdm import tqdm
 
+import anyio
+from sqlalchemy import select, insert, delete
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
-from db.session import get_db
+from db.session import get_db, get_async_db, SessionLocal
 from models.faq import CompFAQ   # ✅ 모델 import 확인
+from services.rate_limiter import BATCH
+from services.llm_gateway import get_llm_gateway
+from services import near_dup, pdf_text, document_registry
+from services.extract_checkpoint import ExtractCheckpoint, DONE
 
 import sys, os
 
@@ -28,42 +32,50 @@ DEFAULT_MAX_PER_SECTION = 5
 MIN_CONFIDENCE = 0.0
 SECTIONS_MAX_CHARS = 7000
 MODEL_DEFAULT = "gpt-4o-mini"
-HTTP_TIMEOUT = 120.0
-RETRY = 3
+LLM_CONCURRENCY = 4        # 문서 하나에서 동시에 LLM 으로 보내는 프롬프트 수 (.env LLM_CONCURRENCY)
+BULK_FILES = 2             # 대량 모드에서 동시에 처리할 파일 수 (LLM 한도는 파일들이 공유)
+BULK_STATE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "db", "faq_bulk_state.sqlite3")
+PACK_TOKENS = 6000         # 연속 섹션을 묶은 프롬프트 하나의 본문 토큰 상한 (.env LLM_PACK_TOKENS, 0 = 섹션마다 호출)
+TOKENS_PER_QA = 150        # Q/A 한 개의 응답 토큰 추정치 (응답 한도 안에 들어갈 섹션 수 계산용)
+# 모델별 (컨텍스트, 최대 응답) 토큰
+MODEL_LIMITS = {
+    "gpt-4o-mini": (128_000, 16_384),
+    "gpt-4o": (128_000, 16_384),
+    "gpt-4.1-mini": (1_000_000, 32_768),
+    "gpt-4.1": (1_000_000, 32_768),
+    "gpt-3.5-turbo": (16_385, 4_096),
+}
 # ==================
 
 # .env 로드
 load_dotenv(find_dotenv(usecwd=True))
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 LLM_MODEL = os.getenv("LLM_MODEL", MODEL_DEFAULT)
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", LLM_CONCURRENCY))
+PACK_TOKENS = int(os.getenv("LLM_PACK_TOKENS", PACK_TOKENS))
 assert OPENAI_API_KEY, "환경변수 OPENAI_API_KEY가 필요합니다 (.env에 설정)."
 
-# ---------- 텍스트 전처리 ----------
-def _clean_artifacts(text: str) -> str:
-    lines = []
-    for ln in text.splitlines():
-        s = ln.strip()
-        if not s:
-            continue
-        if s in {"법제처", "국가법령정보센터"}:
-            continue
-        if re.fullmatch(r"\d+\s*", s):
-            continue
-        s = re.sub(r"\s+", " ", s)
-        lines.append(s)
-    cleaned = "\n".join(lines)
-    cleaned = re.sub(r"(\S)-\s+(\S)", r"\1\2", cleaned)
-    return cleaned
+# ---------- 텍스트 추출 ----------
+# 추출/정리/캐시는 services/pdf_text.py (백엔드 선택, 큰 파일 병렬 추출, 내용 해시 캐시)
+def iter_pdf_pages(path: Path, stats: Optional[dict] = None) -> Iterator[str]:
+    """
+    정리된 페이지 텍스트를 한 장씩 내보냄 (문서 전체를 한 문자열로 만들지 않음)
+    stats 를 주면 pages_total / pages_done 을 채움 (진행률 계산용)
+    """
+    for t in pdf_text.iter_pages(path, stats):
+        if t.strip():
+            yield t
+
+def iter_clean_lines(pages: Iterable[str]) -> Iterator[str]:
+    """페이지 스트림 → 줄 스트림"""
+    for page in pages:
+        for ln in page.splitlines():
+            ln = ln.strip()
+            if ln:
+                yield ln
 
 def extract_text_from_pdf(path: Path) -> str:
-    reader = PdfReader(str(path))
-    texts = []
-    for p in reader.pages:
-        t = p.extract_text() or ""
-        if t.strip():
-            texts.append(t)
-    raw = "\n".join(texts).strip()
-    return _clean_artifacts(raw)
+    return "\n".join(iter_clean_lines(iter_pdf_pages(path)))
 
 # ---------- 섹션 분리 ----------
 HEADER_RE = re.compile(
@@ -77,42 +89,57 @@ HEADER_RE = re.compile(
     r")"
 )
 
-def split_into_sections(text: str) -> List[str]:
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-    if not lines:
-        return []
-    sections, buf = [], []
+SECTION_MIN_CHARS = 200   # 이보다 짧은 섹션은 앞 섹션에 붙임
+
+def iter_sections(lines: Iterable[str]) -> Iterator[str]:
+    """
+    줄 스트림 → 섹션 스트림 (HEADER_RE 기준, 점진적)
+    - 짧은 섹션은 앞 섹션에 병합
+    - 어떤 섹션도 SECTIONS_MAX_CHARS 를 넘지 않도록 줄 경계에서 끊어서 내보냄
+    → 메모리는 문서 전체가 아니라 섹션 하나 크기에 비례
+    """
+    pending = ""            # 병합 대기 중인 섹션 (다음 섹션이 짧으면 여기에 붙음)
+    buf: List[str] = []     # 현재 섹션의 줄들
+    buf_len = 0
+
+    def push(sec: str) -> Iterator[str]:
+        nonlocal pending
+        if pending and len(sec) < SECTION_MIN_CHARS and len(pending) + len(sec) + 1 <= SECTIONS_MAX_CHARS:
+            pending = pending + "\n" + sec
+            return
+        if pending:
+            yield pending
+        pending = sec
+
     for ln in lines:
-        if HEADER_RE.search(ln) and buf:
-            sections.append("\n".join(buf))
-            buf = [ln]
-        else:
-            buf.append(ln)
+        if buf and (HEADER_RE.search(ln) or buf_len + len(ln) + 1 > SECTIONS_MAX_CHARS):
+            yield from push("\n".join(buf))
+            buf, buf_len = [], 0
+        buf.append(ln)
+        buf_len += len(ln) + 1
     if buf:
-        sections.append("\n".join(buf))
-    merged = []
-    for s in sections:
-        if merged and len(s) < 200:
-            merged[-1] = merged[-1] + "\n" + s
-        else:
-            merged.append(s)
-    chunked = []
-    for s in merged:
-        if len(s) <= SECTIONS_MAX_CHARS:
-            chunked.append(s)
-        else:
-            paras = re.split(r"\n{2,}", s)
-            cur = ""
-            for para in paras:
-                if len(cur) + len(para) + 2 > SECTIONS_MAX_CHARS:
-                    if cur:
-                        chunked.append(cur)
-                    cur = para
-                else:
-                    cur = (cur + "\n\n" + para) if cur else para
-            if cur:
-                chunked.append(cur)
-    return chunked
+        yield from push("\n".join(buf))
+    if pending:
+        yield pending
+
+def split_into_sections(text: str) -> List[str]:
+    return list(iter_sections(l.strip() for l in text.splitlines() if l.strip()))
+
+def iter_pdf_sections(path: Path, stats: Optional[dict] = None) -> Iterator[str]:
+    """PDF → 페이지 → 정리 → 섹션 (전 과정 generator)"""
+    return iter_sections(iter_clean_lines(iter_pdf_pages(path, stats)))
+
+async def aiter_pdf_sections(path: Path, stats: Optional[dict] = None) -> AsyncIterator[str]:
+    """
+    섹션을 하나씩 스레드에서 파싱해서 내보냄 (이벤트 루프 블로킹 없음).
+    소비하는 쪽이 필요할 때만 다음 섹션을 파싱하므로 파싱이 끝나기 전에 LLM 호출을 시작할 수 있음.
+    """
+    it = await asyncio.to_thread(iter_pdf_sections, path, stats)
+    while True:
+        sec = await asyncio.to_thread(next, it, None)
+        if sec is None:
+            break
+        yield sec
 
 # ---------- 프롬프트 ----------
 def build_prompt(section_text: str, k: int) -> str:
@@ -131,6 +158,83 @@ def build_prompt(section_text: str, k: int) -> str:
 섹션:
 \"\"\"{section_text[:SECTIONS_MAX_CHARS]}\"\"\""""
 
+def build_pack_prompt(sections: List[Tuple[int, str]], k: int) -> str:
+    """연속 섹션 여러 개를 한 프롬프트로 (섹션 번호로 출처를 돌려받음)"""
+    body = "\n\n".join(f"[섹션 {idx}]\n{sec[:SECTIONS_MAX_CHARS]}" for idx, sec in sections)
+    return f"""
+너는 한국어 법령/규정 문서 섹션에서 FAQ를 추출한다.
+
+출력 형식(중요): 오직 JSON 배열만 출력.
+각 항목은 {{"section_id":섹션 번호, "question":"...", "answer":"...", "confidence":0~1, "ref_article":"제7조(…)"}} 형식.
+
+규칙:
+- 섹션마다 최대 {k}개, section_id 에는 근거가 된 [섹션 N] 의 번호 N
+- 문서에 없는 내용은 "근거 부족", confidence=0.0~0.3, ref_article=""
+- answer는 간결·정확·조건/예외 포함
+- ref_article에는 해당 조문/항목을 간단히 기입
+
+섹션들:
+\"\"\"{body}\"\"\""""
+
+# ---------- 토큰 계산 / 섹션 묶기 ----------
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_ENCODING = None
+
+def count_tokens(text: str) -> int:
+    """LLM_MODEL 기준 토큰 수 (tiktoken 이 없거나 인코딩을 못 받으면 글자수 기반 추정)"""
+    global _ENCODING
+    if tiktoken is not None and _ENCODING is None:
+        try:
+            _ENCODING = tiktoken.encoding_for_model(LLM_MODEL)
+        except KeyError:
+            _ENCODING = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _ENCODING = False   # 인코딩 파일 다운로드 실패 등 → 추정치 사용
+    if _ENCODING:
+        return len(_ENCODING.encode(text))
+    return len(text) // 2 + 1
+
+def pack_limits(k: int, pack_tokens: Optional[int] = None) -> Tuple[int, int]:
+    """(프롬프트 하나의 본문 토큰 상한, 프롬프트당 최대 섹션 수) — 모델 컨텍스트/응답 한도 기준"""
+    budget = PACK_TOKENS if pack_tokens is None else pack_tokens
+    if budget <= 0:
+        return 0, 1
+    context, max_out = MODEL_LIMITS.get(LLM_MODEL, (16_385, 4_096))
+    overhead = count_tokens(SYSTEM_PROMPT + build_pack_prompt([], k))
+    budget = min(budget, context - max_out - overhead)
+    max_sections = max(1, (max_out - 256) // (max(1, k) * TOKENS_PER_QA))
+    return budget, max_sections
+
+class SectionPacker:
+    """
+    연속 섹션을 토큰 예산 안에서 묶음.
+    섹션은 쪼개지 않으므로 조문 경계가 유지되고, 예산보다 큰 섹션은 혼자 한 프롬프트가 됨.
+    """
+
+    def __init__(self, budget: int, max_sections: int):
+        self.budget = budget
+        self.max_sections = max_sections
+        self._pack: List[Tuple[int, str]] = []
+        self._tokens = 0
+
+    def add(self, idx: int, sec: str) -> Optional[List[Tuple[int, str]]]:
+        """섹션 추가. 넣으면 예산을 넘는 경우 지금까지의 묶음을 돌려주고 새 묶음을 시작"""
+        n = count_tokens(sec) + 8   # [섹션 N] 머리표 몫
+        out = None
+        if self._pack and (self._tokens + n > self.budget or len(self._pack) >= self.max_sections):
+            out = self.flush()
+        self._pack.append((idx, sec))
+        self._tokens += n
+        return out
+
+    def flush(self) -> List[Tuple[int, str]]:
+        pack, self._pack, self._tokens = self._pack, [], 0
+        return pack
+
 # ---------- JSON 파싱 ----------
 def _normalize_rows(arr: List[Dict]) -> List[Dict]:
     out = []
@@ -143,12 +247,17 @@ def _normalize_rows(arr: List[Dict]) -> List[Dict]:
         except:
             c = 0.0
         if q and a:
-            out.append({
+            row = {
                 "question": q,
                 "answer": a,
                 "confidence": max(0.0, min(1.0, c)),
                 "ref_article": ra
-            })
+            }
+            try:
+                row["section_id"] = int(it["section_id"])
+            except (KeyError, TypeError, ValueError):
+                pass
+            out.append(row)
     return out
 
 def parse_json_safe(s: str) -> List[Dict]:
@@ -169,21 +278,21 @@ def parse_json_safe(s: str) -> List[Dict]:
     return []
 
 # ---------- LLM 호출 ----------
-async def call_llm(prompt: str, temperature: float = 0.2) -> str:
-    headers = {"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"}
-    payload = {
-        "model": LLM_MODEL,
-        "messages": [
-            {"role": "system", "content": "너는 한국어 문서 요약·FAQ 추출 어시스턴트다."},
-            {"role": "user", "content": prompt},
-        ],
-        "temperature": temperature,
-    }
-    async with httpx.AsyncClient(timeout=httpx.Timeout(HTTP_TIMEOUT)) as client:
-        r = await client.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
-        r.raise_for_status()
-        data = r.json()
-        return data["choices"][0]["message"]["content"].strip()
+# 커넥션 풀 / 재시도 / 타임아웃 / 레이트 리미터 / 응답 캐시는 services/llm_gateway.py 에서 공통 처리
+SYSTEM_PROMPT = "너는 한국어 문서 요약·FAQ 추출 어시스턴트다."
+
+def _count_usage(usage: Optional[dict], name: str, n: int = 1):
+    if usage is not None:
+        usage[name] = usage.get(name, 0) + (n or 0)
+
+async def call_llm(prompt: str, temperature: float = 0.2, priority: str = BATCH, use_cache: bool = True,
+                   usage: Optional[dict] = None) -> str:
+    """usage 를 주면 llm_calls / cache_hits / prompt_tokens / completion_tokens 를 누적"""
+    return await get_llm_gateway().achat(
+        [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}],
+        model=LLM_MODEL, temperature=temperature, priority=priority, use_cache=use_cache,
+        usage=usage, tag="faq_extract",
+    )
 
 # ---------- 후처리 ----------
 def _post_fix(row: Dict) -> Dict:
@@ -193,90 +302,391 @@ def _post_fix(row: Dict) -> Dict:
         row["confidence"] = min(row["confidence"], 0.3)
     return row
 
-def dedup_rows(rows: List[Dict], sim_threshold: float = 0.92) -> List[Dict]:
-    out: List[Dict] = []
-    for r in rows:
-        q = re.sub(r"\s+", " ", r["question"].strip().lower())
-        dup = False
-        for x in out:
-            qx = re.sub(r"\s+", " ", x["question"].strip().lower())
-            if SequenceMatcher(None, q, qx).ratio() >= sim_threshold:
-                dup = True
-                break
-        if not dup:
-            out.append(r)
-    return out
+def dedup_rows(rows: List[Dict], sim_threshold: Optional[float] = None,
+               report: Optional[dict] = None) -> List[Dict]:
+    """추출 결과 안의 근접 중복 질문 제거 (MinHash/LSH, services/near_dup.py)"""
+    kept, rep = near_dup.dedup(rows, threshold=sim_threshold)
+    if report is not None:
+        report.update(rep)
+    return kept
+
+def existing_questions(db: Session, comp_domain: str) -> List[Tuple[int, str]]:
+    """회사에 이미 저장된 FAQ 질문 (qa_id, question)"""
+    return [(qa_id, q) for qa_id, q in db.execute(
+        select(CompFAQ.qa_id, CompFAQ.question).where(CompFAQ.comp_domain == comp_domain)
+    )]
 
 # ---------- PDF → rows ----------
+def pack_key(pack: List[Tuple[int, str]]) -> str:
+    """섹션 묶음 체크포인트 키 (섹션 번호 범위 + 본문 해시)"""
+    h = hashlib.sha1("\x00".join(sec for _, sec in pack).encode("utf-8")).hexdigest()[:16]
+    return f"{pack[0][0]}-{pack[-1][0]}:{h}"
+
+async def extract_pack(pack: List[Tuple[int, str]], source_file: str, max_per_section: int,
+                       use_cache: bool = True, usage: Optional[dict] = None) -> Optional[List[Dict]]:
+    """
+    섹션 묶음 하나 → Q/A 목록
+    각 Q/A 의 section_id 는 모델이 돌려준 섹션 번호 (묶음 밖 번호면 묶음의 첫 섹션)
+    게이트웨이 재시도까지 모두 실패하면 None
+    """
+    if len(pack) == 1:
+        prompt = build_prompt(pack[0][1], k=max_per_section)
+    else:
+        prompt = build_pack_prompt(pack, k=max_per_section)
+    ids = {idx for idx, _ in pack}
+    label = f"섹션{pack[0][0]}" if len(pack) == 1 else f"섹션{pack[0][0]}-{pack[-1][0]}"
+    try:
+        raw = await call_llm(prompt, use_cache=use_cache, usage=usage)
+    except Exception as e:
+        # 재시도는 게이트웨이가 이미 함
+        print(f"  ! {source_file} {label} 실패: {e}")
+        return None
+    items = parse_json_safe(raw)
+    for it in items:
+        if it.get("section_id") not in ids:
+            it["section_id"] = pack[0][0]
+        it["source_file"] = source_file
+    items.sort(key=lambda it: it["section_id"])
+    return items
+
 async def faq_from_pdf(pdf_path: Path,
                        max_per_section: int = DEFAULT_MAX_PER_SECTION,
-                       min_confidence: float = MIN_CONFIDENCE) -> List[Dict]:
-    text = extract_text_from_pdf(pdf_path)
-    if not text:
-        return []
-    sections = split_into_sections(text)
-
-    rows: List[Dict] = []
-    for idx, sec in enumerate(tqdm(sections, desc=f"[LLM] {pdf_path.name}", leave=False), start=1):
-        prompt = build_prompt(sec, k=max_per_section)
-        for attempt in range(RETRY):
-            try:
-                raw = await call_llm(prompt)
-                items = parse_json_safe(raw)
-                for it in items:
-                    it["section_id"] = idx
-                    it["source_file"] = pdf_path.name
-                rows.extend(items)
-                break
-            except Exception as e:
-                if attempt == RETRY - 1:
-                    print(f"  ! {pdf_path.name} 섹션{idx} 실패: {e}")
-                else:
-                    time.sleep(1.5 * (attempt + 1))
-
+                       min_confidence: float = MIN_CONFIDENCE,
+                       concurrency: Optional[int] = None,
+                       use_cache: bool = True,
+                       on_progress: Optional[Callable[..., None]] = None,
+                       pack_tokens: Optional[int] = None,
+                       semaphore: Optional[asyncio.Semaphore] = None,
+                       checkpoint=None,
+                       source_name: Optional[str] = None) -> List[Dict]:
+    """
+    파싱되는 섹션을 토큰 예산(pack_tokens, 기본 LLM_PACK_TOKENS)까지 묶어서
+    최대 concurrency 개 프롬프트를 동시에 LLM 으로 보냄. pack_tokens=0 이면 섹션마다 호출.
+    semaphore 를 주면 concurrency 대신 그 한도를 씀 (여러 파일이 같은 한도를 공유).
+    진행 중인 프롬프트 수가 한도에 차면 다음 섹션 파싱도 기다림 (메모리 상한).
+    결과는 섹션 순서대로 합침.
+    on_progress(progress, force=False) 로 진행 상황을 알림 (extract_progress 참고)
+    checkpoint(get/put, services/extract_checkpoint.FileCheckpoint) 를 주면 끝난 묶음은 저장해두고
+    다시 실행할 때 LLM 을 부르지 않음. 실패한 묶음 수는 progress["failed_prompts"]
+    source_name: Q/A 의 source_file (기본은 파일 이름, 업로드 저장소는 해시 이름이라 원래 파일명을 넘김)
+    """
+    source_name = source_name or pdf_path.name
+    sem = semaphore or asyncio.Semaphore(max(1, concurrency or LLM_CONCURRENCY))
+    packer = SectionPacker(*pack_limits(max_per_section, pack_tokens))
+    bar = tqdm(desc=f"[LLM] {source_name}", unit="sec", leave=False)
+    progress = {"started_at": time.time(), "pages_total": 0, "pages_done": 0,
+                "sections_found": 0, "sections_done": 0, "parsing_done": False, "rows": 0,
+                "prompts": 0, "llm_calls": 0, "cache_hits": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "resumed_prompts": 0, "failed_prompts": 0}
+
+    def report(force: bool = False):
+        if on_progress is not None:
+            on_progress(dict(progress), force=force)
+
+    async def run(pack: List[Tuple[int, str]]) -> List[Dict]:
+        try:
+            key = pack_key(pack) if checkpoint is not None else None
+            items = checkpoint.get(key) if checkpoint is not None else None
+            if items is not None:
+                progress["resumed_prompts"] += 1
+            else:
+                items = await extract_pack(pack, source_name, max_per_section, use_cache, usage=progress)
+                if items is None:
+                    progress["failed_prompts"] += 1
+                    items = []
+                elif checkpoint is not None:
+                    checkpoint.put(key, items)
+            progress["rows"] += len(items)
+            return items
+        finally:
+            progress["sections_done"] += len(pack)
+            report()
+            bar.update(len(pack))
+            sem.release()
+
+    async def submit(pack: List[Tuple[int, str]]):
+        await sem.acquire()
+        progress["prompts"] += 1
+        tasks.append(asyncio.create_task(run(pack)))
+
+    tasks: List[asyncio.Task] = []
+    try:
+        idx = 0
+        async for sec in aiter_pdf_sections(pdf_path, progress):
+            idx += 1
+            progress["sections_found"] = idx
+            pack = packer.add(idx, sec)
+            if pack:
+                await submit(pack)
+        pack = packer.flush()
+        if pack:
+            await submit(pack)
+        progress["parsing_done"] = True
+        report(force=True)
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        raise
+    finally:
+        bar.close()
+
+    rows = [r for items in results for r in items]
     rows = [_post_fix(r) for r in rows]
     rows = [r for r in rows if r["confidence"] >= float(min_confidence)]
     rows = dedup_rows(rows)
+    progress["rows"] = len(rows)
+    report(force=True)
+    print(f"[LLM] {source_name}: 섹션 {progress['sections_found']}개 → 프롬프트 {progress['prompts']}개 "
+          f"(API {progress['llm_calls']}회, 캐시 {progress['cache_hits']}회), "
+          f"토큰 {progress['prompt_tokens']}+{progress['completion_tokens']}")
     return rows
 
+def extract_progress(progress: Optional[dict], now: Optional[float] = None) -> dict:
+    """
+    faq_from_pdf 진행 기록 → API 응답용 (섹션 완료/전체, 찾은 Q/A 수, ETA)
+    파싱이 끝나기 전에는 지금까지의 페이지당 섹션 수로 전체 섹션 수를 추정
+    """
+    if not progress:
+        return {"sections_done": 0, "sections_total": None, "total_estimated": True,
+                "rows": 0, "percent": 0.0, "eta_seconds": None}
+    now = now or time.time()
+    done = progress["sections_done"]
+    found = progress["sections_found"]
+    if progress["parsing_done"]:
+        total, estimated = found, False
+    elif progress["pages_done"]:
+        total = max(found, round(found / progress["pages_done"] * progress["pages_total"]))
+        estimated = True
+    else:
+        total, estimated = None, True
+    eta = None
+    if done and total:
+        eta = round(max(0.0, (now - progress["started_at"]) / done * (total - done)), 1)
+    return {
+        "sections_done": done,
+        "sections_total": total,
+        "total_estimated": estimated,
+        "pages_done": progress["pages_done"],
+        "pages_total": progress["pages_total"],
+        "rows": progress["rows"],
+        "percent": round(100.0 * done / total, 1) if total else 0.0,
+        "eta_seconds": eta,
+        "llm": {
+            "prompts": progress.get("prompts", 0),
+            "calls": progress.get("llm_calls", 0),
+            "cache_hits": progress.get("cache_hits", 0),
+            "prompt_tokens": progress.get("prompt_tokens", 0),
+            "completion_tokens": progress.get("completion_tokens", 0),
+        },
+    }
+
 # ---------- DB 저장 ----------
-def save_rows_to_db(rows: List[Dict], comp_domain: str, db: Session):
-    for r in rows:
-        faq = CompFAQ(
-            comp_domain=comp_domain,
-            sc_file=r.get("source_file"),
-            question=r.get("question"),
-            answer=r.get("answer"),
-            ref_article=r.get("ref_article"),
-            views=0
-        )
-        db.add(faq)
+def save_rows_to_db(rows: List[Dict], comp_domain: str, db: Session,
+                    dedup_existing: bool = True, threshold: Optional[float] = None) -> dict:
+    """
+    추출 행 저장. dedup_existing 이면 회사의 기존 FAQ 와 근접 중복인 질문은 건너뜀.
+    반환: 중복 제거 리포트 (+ saved 건수)
+    """
+    existing = existing_questions(db, comp_domain) if dedup_existing else []
+    rows, report = near_dup.dedup(rows, existing=existing, threshold=threshold)
+    values = _faq_values(rows, comp_domain, report)
     try:
+        # 한 번의 executemany 로 일괄 INSERT
+        if values:
+            db.execute(insert(CompFAQ), values)
         db.commit()
+        report["saved"] = len(rows)
     except IntegrityError as e:
         db.rollback()
         print("DB 저장 실패:", e)
+        report["saved"] = 0
+        return report
+    # 문서 레지스트리 FAQ 수 갱신 (CLI 로 넣은 파일은 여기서 등록)
+    document_registry.refresh_faq_counts(db, comp_domain, (v["sc_file"] for v in values), create=True)
+    return report
+
+def _faq_values(rows: List[Dict], comp_domain: str, report: dict) -> List[Dict]:
+    if report["merged"]:
+        print(f"[DEDUP] {comp_domain}: {report['input']}개 중 {len(report['merged'])}개 중복 제외 "
+              f"(기존 {report['merged_existing']}, 배치 내 {report['merged_in_batch']})")
+    return [{
+        "comp_domain": comp_domain,
+        "sc_file": r.get("source_file"),
+        "question": r.get("question"),
+        "answer": r.get("answer"),
+        "ref_article": r.get("ref_article"),
+        "views": 0,
+    } for r in rows]
+
+async def asave_rows_to_db(rows: List[Dict], comp_domain: str, db: AsyncSession,
+                           dedup_existing: bool = True, threshold: Optional[float] = None) -> dict:
+    """save_rows_to_db 의 비동기 세션 버전 (쿼리 대기 중 이벤트 루프 양보, 중복 계산은 스레드)"""
+    existing = await db.run_sync(existing_questions, comp_domain) if dedup_existing else []
+    rows, report = await anyio.to_thread.run_sync(
+        lambda: near_dup.dedup(rows, existing=existing, threshold=threshold))
+    values = _faq_values(rows, comp_domain, report)
+    try:
+        if values:
+            await db.execute(insert(CompFAQ), values)
+        await db.commit()
+        report["saved"] = len(rows)
+    except IntegrityError as e:
+        await db.rollback()
+        print("DB 저장 실패:", e)
+        report["saved"] = 0
+        return report
+    await db.run_sync(document_registry.refresh_faq_counts, comp_domain,
+                      [v["sc_file"] for v in values], True)
+    return report
 
 # ---------- 엔트리 ----------
-async def run_single_file(pdf_path: Path, comp_domain: str, k: int, min_conf: float, db: Session):
-    rows = await faq_from_pdf(pdf_path, max_per_section=k, min_confidence=min_conf)
+async def run_single_file(pdf_path: Path, comp_domain: str, k: int, min_conf: float, db: Session,
+                          concurrency: Optional[int] = None, use_cache: bool = True,
+                          pack_tokens: Optional[int] = None):
+    rows = await faq_from_pdf(pdf_path, max_per_section=k, min_confidence=min_conf,
+                              concurrency=concurrency, use_cache=use_cache, pack_tokens=pack_tokens)
     save_rows_to_db(rows, comp_domain, db)
     print(f"[완료] {pdf_path.name}: {len(rows)}개 Q/A → DB 저장")
 
+# ---------- 대량 모드 (디렉터리 / glob, 이어서 실행) ----------
+def resolve_inputs(inputs: Iterable[str]) -> List[Path]:
+    """파일 / 디렉터리(하위 포함 *.pdf) / glob 패턴 → PDF 경로 목록 (중복 제거, 정렬)"""
+    found = set()
+    for arg in inputs:
+        p = Path(arg)
+        if p.is_dir():
+            found.update(x for x in p.rglob("*") if x.is_file() and x.suffix.lower() == ".pdf")
+        elif p.is_file():
+            found.add(p)
+        else:
+            found.update(Path(x) for x in glob.glob(arg, recursive=True) if x.lower().endswith(".pdf"))
+    return sorted(x.resolve() for x in found)
+
+def _save_file_rows(rows: List[Dict], comp_domain: str) -> dict:
+    db = SessionLocal()
+    try:
+        return save_rows_to_db(rows, comp_domain, db)
+    finally:
+        db.close()
+
+async def run_bulk(pdf_paths: List[Path], comp_domain: str, k: int, min_conf: float,
+                   concurrency: Optional[int] = None, file_concurrency: int = BULK_FILES,
+                   use_cache: bool = True, pack_tokens: Optional[int] = None,
+                   state_path: str = BULK_STATE_PATH, redo: bool = False) -> dict:
+    """
+    여러 PDF 를 file_concurrency 개씩 동시에 처리 (LLM 동시 호출 한도 concurrency 는 전체 공유)
+    - 상태 파일(state_path)에 파일/섹션 묶음 단위로 체크포인트 → 다시 실행하면 이어서 처리
+    - 파일이 끝날 때마다 그 파일의 Q/A 를 일괄 INSERT
+    - 실패한 파일은 건너뛰고 계속 진행, 마지막에 요약 반환
+    """
+    state = ExtractCheckpoint(state_path)
+    sem = asyncio.Semaphore(max(1, concurrency or LLM_CONCURRENCY))
+    file_sem = asyncio.Semaphore(max(1, file_concurrency))
+    save_lock = asyncio.Lock()   # 회사의 기존 FAQ 와 중복 검사 후 저장 → 파일끼리 겹치지 않게 한 번에 하나
+    summary = {"files": len(pdf_paths), "done": 0, "skipped": 0, "failed": 0, "rows": 0,
+               "duplicates": 0, "pages": 0, "sections": 0, "llm_calls": 0, "resumed_prompts": 0,
+               "prompt_tokens": 0, "completion_tokens": 0, "failures": []}
+    started = time.time()
+
+    async def one(path: Path):
+        async with file_sem:
+            sha = await asyncio.to_thread(pdf_text.file_sha256, str(path))
+            st = state.file_status(sha)
+            if st and st["status"] == DONE and not redo:
+                summary["skipped"] += 1
+                print(f"[건너뜀] {path.name}: 이미 완료 ({st['rows']}개 Q/A)")
+                return
+            state.start_file(sha, str(path))
+            t0 = time.time()
+            progress: dict = {}
+            try:
+                rows = await faq_from_pdf(
+                    path, max_per_section=k, min_confidence=min_conf, use_cache=use_cache,
+                    pack_tokens=pack_tokens, semaphore=sem, checkpoint=state.for_file(sha),
+                    on_progress=lambda p, force=False: progress.update(p),
+                )
+                if progress.get("failed_prompts"):
+                    raise RuntimeError(f"프롬프트 {progress['failed_prompts']}개 실패 "
+                                       f"(다시 실행하면 실패한 섹션만 재시도)")
+                async with save_lock:
+                    report = await asyncio.to_thread(_save_file_rows, rows, comp_domain)
+                if report["kept"] and not report["saved"]:
+                    raise RuntimeError("DB 저장 실패")
+            except Exception as e:
+                state.fail_file(sha, f"{type(e).__name__}: {e}")
+                summary["failed"] += 1
+                summary["failures"].append({"file": str(path), "error": f"{type(e).__name__}: {e}"})
+                print(f"[실패] {path.name}: {e}")
+                return
+            stats = {
+                "pages": progress.get("pages_done", 0),
+                "sections": progress.get("sections_found", 0),
+                "llm_calls": progress.get("llm_calls", 0),
+                "resumed_prompts": progress.get("resumed_prompts", 0),
+                "prompt_tokens": progress.get("prompt_tokens", 0),
+                "completion_tokens": progress.get("completion_tokens", 0),
+                "duplicates": len(report["merged"]),
+                "elapsed": round(time.time() - t0, 1),
+            }
+            state.finish_file(sha, report["saved"], stats)
+            summary["done"] += 1
+            summary["rows"] += report["saved"]
+            for name in ("pages", "sections", "llm_calls", "resumed_prompts",
+                         "prompt_tokens", "completion_tokens", "duplicates"):
+                summary[name] += stats[name]
+            print(f"[완료] {path.name}: {report['saved']}개 Q/A 저장 (중복 제외 {stats['duplicates']}, "
+                  f"{stats['elapsed']}s)")
+
+    await asyncio.gather(*(one(p) for p in pdf_paths))
+
+    elapsed = max(time.time() - started, 1e-6)
+    summary["elapsed"] = round(elapsed, 1)
+    summary["files_per_min"] = round(summary["done"] * 60.0 / elapsed, 2)
+    summary["pages_per_sec"] = round(summary["pages"] / elapsed, 2)
+    summary["rows_per_min"] = round(summary["rows"] * 60.0 / elapsed, 1)
+    return summary
+
+def print_bulk_summary(summary: dict):
+    print("\n===== 대량 추출 요약 =====")
+    print(f"파일 {summary['files']}개: 완료 {summary['done']}, 건너뜀 {summary['skipped']}, 실패 {summary['failed']}")
+    print(f"Q/A 저장 {summary['rows']}개 (중복 제외 {summary['duplicates']}), "
+          f"페이지 {summary['pages']}, 섹션 {summary['sections']}")
+    print(f"LLM 호출 {summary['llm_calls']}회 (체크포인트 재사용 {summary['resumed_prompts']}), "
+          f"토큰 {summary['prompt_tokens']}+{summary['completion_tokens']}")
+    print(f"소요 {summary['elapsed']}s → 파일 {summary['files_per_min']}/분, "
+          f"페이지 {summary['pages_per_sec']}/초, Q/A {summary['rows_per_min']}/분")
+    for f in summary["failures"]:
+        print(f"  ✗ {f['file']}: {f['error']}")
+
 if __name__ == "__main__":
     import argparse
-    parser = argparse.ArgumentParser(description="PDF → FAQ DB 저장")
-    parser.add_argument("pdf_path", help="PDF 파일 경로")
+    parser = argparse.ArgumentParser(description="PDF → FAQ DB 저장 (파일 / 디렉터리 / glob, 중단 후 이어서 실행)")
+    parser.add_argument("inputs", nargs="+", help="PDF 파일, 디렉터리(하위 포함) 또는 glob 패턴 (예: 'docs/**/*.pdf')")
     parser.add_argument("--domain", required=True, help="회사 도메인 (comp_domain)")
     parser.add_argument("--k", type=int, default=DEFAULT_MAX_PER_SECTION, help="섹션당 최대 Q/A 개수")
     parser.add_argument("--min_conf", type=float, default=MIN_CONFIDENCE, help="confidence 하한")
+    parser.add_argument("--concurrency", type=int, default=LLM_CONCURRENCY,
+                        help="동시에 보낼 LLM 요청 수 (모든 파일 공유)")
+    parser.add_argument("--files", type=int, default=BULK_FILES, help="동시에 처리할 파일 수")
+    parser.add_argument("--state", default=os.getenv("FAQ_BULK_STATE", BULK_STATE_PATH),
+                        help="체크포인트 상태 파일 (SQLite)")
+    parser.add_argument("--redo", action="store_true", help="이미 완료된 파일도 다시 처리")
+    parser.add_argument("--no-cache", action="store_true", help="LLM 응답 캐시 사용 안 함")
+    parser.add_argument("--pack-tokens", type=int, default=PACK_TOKENS,
+                        help="프롬프트 하나에 묶을 섹션 본문 토큰 상한 (0 = 섹션마다 호출)")
     args = parser.parse_args()
 
-    db = next(get_db())
-    p = Path(args.pdf_path)
-    assert p.exists(), f"경로가 없습니다: {p}"
+    paths = resolve_inputs(args.inputs)
+    assert paths, f"PDF 를 찾지 못했습니다: {args.inputs}"
+    print(f"[대량] PDF {len(paths)}개, 상태 파일: {args.state}")
 
-    asyncio.run(run_single_file(p, args.domain, args.k, args.min_conf, db))
+    summary = asyncio.run(run_bulk(paths, args.domain, args.k, args.min_conf,
+                                   concurrency=args.concurrency, file_concurrency=args.files,
+                                   use_cache=not args.no_cache, pack_tokens=args.pack_tokens,
+                                   state_path=args.state, redo=args.redo))
+    print_bulk_summary(summary)
+    sys.exit(1 if summary["failed"] else 0)
     
     
 router = APIRouter()
@@ -284,21 +694,22 @@ router = APIRouter()
 @router.post("/faqs/bulk-save")
 async def bulk_save(
     payload: dict = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),   # 비동기 세션 → DELETE/COMMIT 대기 중에도 다른 요청 처리
     current_user: UserModel = Depends(get_current_user)
 ):
     comp_domain = current_user.comp_domain   # 로그인한 사용자의 회사 도메인
-    sc_file = payload.get("file_id")         # 원래 파일명
     faqs = payload.get("faqs", [])
+    # 원래 파일명 (업로드 file_id 면 레지스트리에서 파일명으로 바꿈)
+    sc_file = await db.run_sync(document_registry.source_name, comp_domain, payload.get("file_id"))
 
     if not sc_file or not faqs:
         return {"error": "file_id와 faqs는 필수입니다."}
 
     # 기존 데이터 지우고 새로 저장 (원하는 경우만)
-    db.query(CompFAQ).filter(
+    await db.execute(delete(CompFAQ).where(
         CompFAQ.comp_domain == comp_domain,
         CompFAQ.sc_file == sc_file
-    ).delete()
+    ))
 
     # 새 데이터 저장
     for row in faqs:
@@ -315,5 +726,6 @@ async def bulk_save(
             views=0
         )
         db.add(faq)
-    db.commit()
+    await db.commit()
+    await db.run_sync(document_registry.refresh_faq_counts, comp_domain, [sc_file])
     return {"status": "ok", "count": len(faqs)}
\ No newline at end of file
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from db.session import get_db
+from db.session import get_read_db
 from models.user import User
 from api.auth import get_current_user
 
@@ -9,7 +9,7 @@ router = APIRouter()
 # ✅ 같은 회사(comp_domain) 직원 목록 조회 (자기 자신 제외)
 @router.get("/users")
 def get_company_users(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),   # 읽기 전용 → 레플리카
     current_user: User = Depends(get_current_user),
 ):
     users = (
@@ -0,0 +1,190 @@
+# backend/db/embedding_cache.py
+"""
+임베딩 영속 캐시 (SQLite)
+- 키: sha256(모델명 + 텍스트) → 내용이 같으면 재임베딩하지 않음
+- 값: float32 벡터 바이트
+- 용량 초과 시 오래 안 쓰인 항목부터 제거 (LRU)
+- 적중률(hit rate) 통계 제공
+
+.env (선택):
+  EMBED_CACHE_PATH=backend/db/vector_store/embed_cache.sqlite3
+  EMBED_CACHE_MAX_MB=1024
+  EMBED_CACHE_DISABLED=1   # 캐시 끄기
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), "vector_store", "embed_cache.sqlite3")
+DEFAULT_MAX_MB = 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    key       TEXT PRIMARY KEY,
+    model     TEXT NOT NULL,
+    dim       INTEGER NOT NULL,
+    vec       BLOB NOT NULL,
+    nbytes    INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_embedding_cache_last_used ON embedding_cache(last_used);
+"""
+
+
+def cache_key(model_key: str, text: str) -> str:
+    h = hashlib.sha256()
+    h.update(model_key.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+
+class EmbeddingCache:
+    """모델명+텍스트 해시 → 벡터 (SQLite 파일)"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get_many(self, model_key: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        keys = [cache_key(model_key, t) for t in texts]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            # SQLite 변수 개수 제한 때문에 나눠서 조회
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                marks = ",".join("?" * len(part))
+                for key, vec in self._conn.execute(
+                    f"SELECT key, vec FROM embedding_cache WHERE key IN ({marks})", part
+                ):
+                    found[key] = np.frombuffer(vec, dtype=np.float32).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embedding_cache SET last_used = ? WHERE key = ?",
+                    [(now, k) for k in found],
+                )
+                self._conn.commit()
+            out = [found.get(k) for k in keys]
+            hit = sum(1 for v in out if v is not None)
+            self.hits += hit
+            self.misses += len(out) - hit
+        return out
+
+    def put_many(self, model_key: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        if not texts:
+            return
+        now = time.time()
+        rows = []
+        for t, v in zip(texts, vectors):
+            arr = np.asarray(v, dtype=np.float32)
+            blob = arr.tobytes()
+            rows.append((cache_key(model_key, t), model_key, int(arr.shape[0]), blob, len(blob), now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (key, model, dim, vec, nbytes, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._evict_locked()
+
+    def _evict_locked(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM embedding_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 90%까지 줄여서 매번 evict 하지 않도록
+        target = int(self.max_bytes * 0.9)
+        cur = self._conn.execute("SELECT key, nbytes FROM embedding_cache ORDER BY last_used ASC")
+        victims = []
+        for key, nbytes in cur:
+            if total <= target:
+                break
+            victims.append((key,))
+            total -= nbytes
+        self._conn.executemany("DELETE FROM embedding_cache WHERE key = ?", victims)
+        self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, nbytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM embedding_cache"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "entries": entries,
+            "size_mb": round(nbytes / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+        }
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain Embeddings 래퍼: embed_documents 는 캐시를 먼저 보고 없는 텍스트만 인코딩.
+    embed_query 는 실시간 질의용이므로 그대로 위임.
+    """
+
+    def __init__(self, base: Embeddings, model_key: str, cache: "EmbeddingCache"):
+        self.base = base
+        self.model_key = model_key
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = list(texts)
+        vectors = self.cache.get_many(self.model_key, texts)
+        # 같은 배치 안의 중복 텍스트는 한 번만 인코딩
+        miss_texts = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if miss_texts:
+            new_vecs = self.base.embed_documents(miss_texts)
+            self.cache.put_many(self.model_key, miss_texts, new_vecs)
+            by_text = dict(zip(miss_texts, new_vecs))
+            vectors = [v if v is not None else list(by_text[t]) for t, v in zip(texts, vectors)]
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.base.embed_query(text)
+
+
+_CACHE: Optional[EmbeddingCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """프로세스 단위 싱글톤 (EMBED_CACHE_DISABLED=1 이면 None)"""
+    global _CACHE
+    if os.getenv("EMBED_CACHE_DISABLED", "").strip() in {"1", "true", "yes"}:
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            path = os.getenv("EMBED_CACHE_PATH", DEFAULT_CACHE_PATH)
+            max_mb = float(os.getenv("EMBED_CACHE_MAX_MB", DEFAULT_MAX_MB))
+            _CACHE = EmbeddingCache(path, max_bytes=int(max_mb * 1024 * 1024))
+    return _CACHE
+
+def with_cache(base: Embeddings, model_key: str) -> Embeddings:
+    """캐시가 켜져 있으면 CachedEmbeddings 로 감싸서 반환"""
+    cache = get_embedding_cache()
+    if cache is None:
+        return base
+    return CachedEmbeddings(base, model_key, cache)
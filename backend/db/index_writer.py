@@ -0,0 +1,190 @@
+# backend/db/index_writer.py
+"""
+FAISS 인덱스 단일 writer
+- API 요청은 qa_id 단위 업서트/삭제 작업을 영속 큐(services/job_queue.py, "index" 큐)에 넣기만 함
+- index 큐는 exclusive 임대 → 여러 워커/프로세스가 떠 있어도 인덱스를 쓰는 건 한 곳뿐
+- 임대한 작업들을 qa_id 기준으로 병합 (나중 작업이 이김) 후 apply_index_batch 로 한 번에 반영
+- 큐 깊이 / 반영 지연 시간 통계 제공 (GET /faq/index/stats)
+"""
+
+import time
+import threading
+import traceback
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from db.ingest_faq_to_faiss import apply_index_batch, rebuild_faiss_index
+from db.reconcile_faiss import reconcile
+from db.session import SessionLocal
+from services.job_queue import JobQueue, get_job_queue, QUEUED, RUNNING, DEAD
+
+INDEX_QUEUE = "index"
+
+KIND_UPSERT = "index_upsert"
+KIND_DELETE = "index_delete"
+KIND_REBUILD = "index_rebuild"
+KIND_RECONCILE = "index_reconcile"
+
+# 한 번에 병합할 최대 작업 수
+DEFAULT_BATCH_LIMIT = 500
+# 요청이 몰릴 때 조금 기다렸다가 한 번에 반영 (초)
+DEFAULT_FLUSH_DELAY = 0.5
+
+
+# ---------------------------------------------------------------------
+# Producer (API 쪽)
+# ---------------------------------------------------------------------
+
+def enqueue_upsert(qa_ids: Iterable[int], queue: Optional[JobQueue] = None) -> str:
+    return (queue or get_job_queue()).enqueue(
+        KIND_UPSERT, {"qa_ids": [int(i) for i in qa_ids]}, queue=INDEX_QUEUE)
+
+def enqueue_delete(qa_ids: Iterable[int], queue: Optional[JobQueue] = None) -> str:
+    return (queue or get_job_queue()).enqueue(
+        KIND_DELETE, {"qa_ids": [int(i) for i in qa_ids]}, queue=INDEX_QUEUE)
+
+def enqueue_rebuild(queue: Optional[JobQueue] = None) -> str:
+    return (queue or get_job_queue()).enqueue(KIND_REBUILD, {}, queue=INDEX_QUEUE)
+
+def enqueue_reconcile(queue: Optional[JobQueue] = None) -> str:
+    return (queue or get_job_queue()).enqueue(KIND_RECONCILE, {}, queue=INDEX_QUEUE)
+
+
+def coalesce(jobs: List[dict]) -> Tuple[List[int], List[int], Optional[str]]:
+    """
+    작업 목록(생성 순서)을 qa_id 기준으로 병합 → (upsert ids, delete ids, 전체 작업 종류)
+    전체 작업(rebuild > reconcile)은 DB 최신 상태 기준이므로 같은 배치의 개별 작업을 모두 포함
+    """
+    ops: Dict[int, str] = {}
+    full: Optional[str] = None
+    for job in sorted(jobs, key=lambda j: j["created_at"]):
+        if job["kind"] == KIND_REBUILD:
+            full = KIND_REBUILD
+            continue
+        if job["kind"] == KIND_RECONCILE:
+            full = full or KIND_RECONCILE
+            continue
+        op = KIND_DELETE if job["kind"] == KIND_DELETE else KIND_UPSERT
+        for qa_id in job["payload"].get("qa_ids", []):
+            ops[int(qa_id)] = op
+    ups = [i for i, op in ops.items() if op == KIND_UPSERT]
+    dels = [i for i, op in ops.items() if op == KIND_DELETE]
+    return ups, dels, full
+
+
+# ---------------------------------------------------------------------
+# Consumer (워커 쪽)
+# ---------------------------------------------------------------------
+
+class IndexWriter:
+    def __init__(self, worker_id: str, queue: Optional[JobQueue] = None,
+                 batch_limit: int = DEFAULT_BATCH_LIMIT, flush_delay: float = DEFAULT_FLUSH_DELAY,
+                 lease_seconds: float = 60.0):
+        self.worker_id = worker_id
+        self.queue = queue or get_job_queue()
+        self.batch_limit = batch_limit
+        self.flush_delay = flush_delay
+        self.lease_seconds = lease_seconds
+        # 통계
+        self.batches = 0
+        self.applied_jobs = 0
+        self.merged_ids = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_apply_ms = 0.0
+        self.total_apply_ms = 0.0
+        self.max_apply_ms = 0.0
+        self.last_wait_ms = 0.0
+
+    def run_once(self) -> int:
+        """대기 중인 index 작업을 임대해서 한 번에 반영. 처리한 작업 수 반환."""
+        jobs = self.queue.lease([INDEX_QUEUE], self.worker_id, limit=self.batch_limit,
+                                lease_seconds=self.lease_seconds, exclusive=True)
+        if not jobs:
+            return 0
+        ups, dels, full = coalesce(jobs)
+        total_ids = sum(len(j["payload"].get("qa_ids", [])) for j in jobs)
+        self.merged_ids += total_ids - len(ups) - len(dels)
+        job_ids = [j["job_id"] for j in jobs]
+
+        started = time.perf_counter()
+        self.last_wait_ms = (time.time() - min(j["created_at"] for j in jobs)) * 1000
+        stop = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(job_ids, stop), daemon=True)
+        beat.start()
+        try:
+            if full == KIND_REBUILD:
+                db = SessionLocal()
+                try:
+                    rebuild_faiss_index(db)
+                finally:
+                    db.close()
+                result = apply_index_batch()
+                result["rebuild"] = True
+            elif full == KIND_RECONCILE:
+                result = reconcile()
+                apply_index_batch()  # 저널에 남은 삭제 항목 정리
+            else:
+                result = apply_index_batch(upsert_ids=ups, delete_ids=dels)
+            for jid in job_ids:
+                self.queue.complete(jid, self.worker_id, result)
+            self.applied_jobs += len(jobs)
+            self.last_error = None
+        except Exception as e:
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            print("[INDEX WRITER] 반영 실패:", self.last_error)
+            for jid in job_ids:
+                self.queue.fail(jid, self.worker_id, self.last_error)
+        finally:
+            stop.set()
+            ms = (time.perf_counter() - started) * 1000
+            self.batches += 1
+            self.last_apply_ms = ms
+            self.total_apply_ms += ms
+            self.max_apply_ms = max(self.max_apply_ms, ms)
+        return len(jobs)
+
+    def _heartbeat(self, job_ids: List[str], stop: threading.Event):
+        while not stop.wait(self.lease_seconds / 3):
+            self.queue.heartbeat(job_ids, self.worker_id, self.lease_seconds)
+
+    def run_forever(self, poll_interval: float = 1.0, stop: Optional[threading.Event] = None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception:
+                # SQLite 잠금 등 일시 오류로 writer 가 죽지 않도록
+                traceback.print_exc()
+            # 비어 있으면 잠깐 쉬고, 첫 작업이 들어온 뒤에도 flush_delay 만큼 모아서 처리
+            if stop.wait(poll_interval):
+                break
+            if self.queue.counts(INDEX_QUEUE).get(QUEUED):
+                stop.wait(self.flush_delay)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "applied_jobs": self.applied_jobs,
+            "merged_ids": self.merged_ids,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_apply_ms": round(self.last_apply_ms, 1),
+            "avg_apply_ms": round(self.total_apply_ms / self.batches, 1) if self.batches else 0.0,
+            "max_apply_ms": round(self.max_apply_ms, 1),
+            "last_queue_wait_ms": round(self.last_wait_ms, 1),
+        }
+
+
+def index_queue_stats(writer: Optional[IndexWriter] = None) -> dict:
+    """큐 깊이 (영속 큐 기준) + 이 프로세스 writer 의 반영 지연 통계"""
+    counts = get_job_queue().counts(INDEX_QUEUE)
+    out = {
+        "queue_depth": counts.get(QUEUED, 0),
+        "inflight": counts.get(RUNNING, 0),
+        "dead": counts.get(DEAD, 0),
+    }
+    if writer is not None:
+        out.update(writer.stats())
+    return out
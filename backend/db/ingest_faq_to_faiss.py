@@ -3,22 +3,42 @@
 comp_faq → FAISS 색인 유틸
 - CLI 배치: 전체 재생성(rebuild) / 전체 추가(upsert)
 - 프로그램 호출: 특정 faq_ids만 업서트(upsert_faqs_to_faiss)
+- 파일 단위 삭제: 저널 기록 후 해당 qa_id 벡터만 제거(apply_pending_deletions)
+- 배치 반영: 업서트/삭제를 한 번의 load/save 로 처리(apply_index_batch, db.index_writer 에서 사용)
+- 인덱스 쓰기는 모두 _INDEX_LOCK (프로세스 간 파일 잠금) 안에서: API 의 index writer 와 CLI 재색인이 겹치지 않음
+- 저장은 새 버전 디렉터리에 쓴 뒤 포인터(CURRENT)만 교체 (db/vector_collections.py 의 publish_version)
 
 필수 .env (backend/.env):
   EMBED_MODEL=BM-K/KoSimCSE-roberta
-  VSTORE_DIR=backend/db/vector_store/faiss_langchain
+  VSTORE_DIR=backend/db/vector_store/faiss_langchain   # faq 컬렉션 경로 (없으면 vector_store/collections/faq)
+
+임베딩은 db/embedding_cache.py 의 영속 캐시를 거치므로
+재색인 시 새로 추가/수정된 FAQ 텍스트만 실제로 인코딩됨.
 """
 
 import os
+import json
+import hashlib
+import time
+import uuid
+import shutil
 import argparse
-from typing import Iterable, List, Optional
+import threading
+from typing import Iterable, Iterator, List, Optional
 
 from dotenv import load_dotenv
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 
 from db.session import SessionLocal
 # ⚠️ 중복 import 제거: 실제 테이블은 models.faq.CompFAQ 사용
 from models.faq import CompFAQ
+from db.embedding_cache import with_cache, get_embedding_cache
+from db.parallel_embed import ParallelEmbeddings
+from db.vector_collections import (
+    collection_dir, collection_embedding, embedding_cache_key, COLLECTION_FAQ,
+    CollectionLock, resolve_index_dir, new_version_dir, publish_version,
+)
 
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
@@ -34,20 +54,48 @@ def load_env():
 
 _EMB = None
 def get_embeddings():
-    """Singleton embeddings"""
+    """Singleton embeddings (임베딩 캐시 경유: 바뀌지 않은 텍스트는 재인코딩 안 함)"""
     global _EMB
     if _EMB is None:
-        model_name = os.getenv("EMBED_MODEL", "BM-K/KoSimCSE-roberta")
-        _EMB = HuggingFaceEmbeddings(model_name=model_name)
+        model_name, normalize = collection_embedding(COLLECTION_FAQ)
+        _EMB = with_cache(HuggingFaceEmbeddings(model_name=model_name,
+                                                encode_kwargs={"normalize_embeddings": normalize}),
+                          embedding_cache_key(model_name, normalize))
     return _EMB
 
+def get_embed_model_name() -> str:
+    """faq 컬렉션 임베딩 모델 (db/vector_collections.py, 검색 쪽과 같은 값)"""
+    return collection_embedding(COLLECTION_FAQ)[0]
+
+def get_embed_cache_key() -> str:
+    return embedding_cache_key(*collection_embedding(COLLECTION_FAQ))
+
+def make_parallel_embeddings(workers: int, threads_per_worker: Optional[int] = None) -> ParallelEmbeddings:
+    """전체 재색인용 멀티 프로세스 임베딩 (캐시는 호출 측에서 with_cache 로 감쌈)"""
+    model_name, normalize = collection_embedding(COLLECTION_FAQ)
+    return ParallelEmbeddings(model_name, workers, threads_per_worker=threads_per_worker,
+                              encode_kwargs={"normalize_embeddings": normalize})
+
+def print_cache_stats():
+    cache = get_embedding_cache()
+    if cache is None:
+        return
+    st = cache.stats()
+    print(f"[CACHE] hit {st['hits']} / miss {st['misses']} "
+          f"(hit rate {st['hit_rate']:.1%}), entries={st['entries']}, "
+          f"size={st['size_mb']}MB / {st['max_mb']}MB")
+
 def get_vstore_dir() -> str:
-    return os.getenv("VSTORE_DIR", "backend/db/vector_store/faiss_langchain")
+    """faq 컬렉션 인덱스 경로 (db/vector_collections.py, VSTORE_DIR 설정 우선)"""
+    return collection_dir(COLLECTION_FAQ)
 
 # ---------------------------------------------------------------------
 # DB fetch
 # ---------------------------------------------------------------------
 
+DEFAULT_CHUNK_SIZE = 1000   # DB에서 한 번에 읽는 행 수
+DEFAULT_BATCH_SIZE = 64     # 한 번에 임베딩하는 텍스트 수
+
 def fetch_faqs(limit: Optional[int] = None,
                ids: Optional[Iterable[int]] = None,
                comp_domain: Optional[str] = None) -> List[CompFAQ]:
@@ -66,11 +114,63 @@ def fetch_faqs(limit: Optional[int] = None,
     finally:
         db.close()
 
+_FAQ_COLUMNS = (
+    CompFAQ.qa_id, CompFAQ.question, CompFAQ.answer,
+    CompFAQ.sc_file, CompFAQ.ref_article, CompFAQ.comp_domain,
+)
+
+def count_faqs(limit: Optional[int] = None,
+               comp_domain: Optional[str] = None,
+               db: Optional[Session] = None) -> int:
+    """진행률(ETA) 계산용 전체 행 수"""
+    own = db is None
+    db = db or SessionLocal()
+    try:
+        q = select(func.count(CompFAQ.qa_id))
+        if comp_domain:
+            q = q.where(CompFAQ.comp_domain == comp_domain)
+        total = int(db.scalar(q) or 0)
+        return min(total, limit) if limit else total
+    finally:
+        if own:
+            db.close()
+
+def iter_faq_chunks(chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    limit: Optional[int] = None,
+                    comp_domain: Optional[str] = None,
+                    db: Optional[Session] = None) -> Iterator[list]:
+    """
+    comp_faq를 chunk_size 행씩 스트리밍 (서버 사이드 커서 + yield_per)
+    - ORM 객체 대신 필요한 컬럼만 Row로 받아 identity map 에 쌓이지 않게 함
+    """
+    own = db is None
+    db = db or SessionLocal()
+    try:
+        q = select(*_FAQ_COLUMNS).order_by(CompFAQ.qa_id)
+        if comp_domain:
+            q = q.where(CompFAQ.comp_domain == comp_domain)
+        if limit:
+            q = q.limit(limit)
+        result = db.execute(q.execution_options(stream_results=True, yield_per=chunk_size))
+        for part in result.partitions():
+            yield part
+    finally:
+        if own:
+            db.close()
+
 # ---------------------------------------------------------------------
 # Build FAISS inputs
 # ---------------------------------------------------------------------
 
-def build_texts_metas_ids(rows: List[CompFAQ]):
+def content_hash(question, answer, sc_file, ref_article, comp_domain) -> str:
+    """
+    색인 내용 해시 (reconcile 에서 DB 쪽 MD5(CONCAT_WS(CHAR(31), ...)) 와 비교)
+    - 필드 순서/구분자를 바꾸면 db/reconcile_faiss.py 의 SQL 도 같이 바꿔야 함
+    """
+    parts = [question or "", answer or "", sc_file or "", ref_article or "", comp_domain or ""]
+    return hashlib.md5("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+def build_texts_metas_ids(rows):
     """LangChain-FAISS에 넣을 texts/metas/ids 생성 (ids = qa_id 고정)"""
     texts, metas, ids = [], [], []
     for r in rows:
@@ -81,6 +181,7 @@ def build_texts_metas_ids(rows: List[CompFAQ]):
             "sc_file": r.sc_file,
             "ref_article": r.ref_article,
             "comp_domain": r.comp_domain,
+            "content_hash": content_hash(r.question, r.answer, r.sc_file, r.ref_article, r.comp_domain),
         })
         ids.append(str(r.qa_id))
     return texts, metas, ids
@@ -89,111 +190,399 @@ def build_texts_metas_ids(rows: List[CompFAQ]):
 # Vector store helpers
 # ---------------------------------------------------------------------
 
-def _load_vs():
-    """기존 인덱스 로드 (없으면 빈 인덱스 생성)"""
+def _recover_vstore_dir():
+    """
+    예전 방식(디렉토리 통째 교체) 저장 도중 죽어서 남은 .old / .tmp 정리
+    (지금은 포인터 교체라 새로 생기지 않음, 업그레이드 전 상태만 복구)
+    """
+    vstore_dir = get_vstore_dir()
+    old_dir = vstore_dir + ".old"
+    shutil.rmtree(vstore_dir + ".tmp", ignore_errors=True)
+    if os.path.isdir(old_dir):
+        if os.path.exists(os.path.join(resolve_index_dir(vstore_dir), "index.faiss")):
+            # 새 인덱스 교체는 끝났고 이전 디렉토리 정리만 못한 경우
+            shutil.rmtree(old_dir, ignore_errors=True)
+        else:
+            # 교체 전에 죽은 경우 → 이전 인덱스로 되돌림
+            shutil.rmtree(vstore_dir, ignore_errors=True)
+            os.replace(old_dir, vstore_dir)
+
+def _load_vs(with_embeddings: bool = True):
+    """
+    기존 인덱스 로드 (없으면 빈 인덱스 생성)
+    - with_embeddings=False: 삭제만 할 때 임베딩 모델 로딩 생략 (없으면 None 반환)
+    """
+    _recover_vstore_dir()
     vstore_dir = get_vstore_dir()
     os.makedirs(vstore_dir, exist_ok=True)
-    emb = get_embeddings()
+    emb = get_embeddings() if with_embeddings else None
     try:
-        vs = FAISS.load_local(vstore_dir, emb, allow_dangerous_deserialization=True)
+        vs = FAISS.load_local(resolve_index_dir(vstore_dir), emb, allow_dangerous_deserialization=True)
     except Exception:
+        if not with_embeddings:
+            return None
         # 빈 인덱스 생성
         vs = FAISS.from_texts(texts=[], embedding=emb, metadatas=[])
     return vs
 
+MANIFEST_NAME = "manifest.json"
+
+def build_manifest(vs) -> dict:
+    """인덱스에 들어있는 qa_id → content_hash (메타데이터에 해시가 없는 옛 항목은 본문에서 계산)"""
+    manifest = {}
+    for _id in vs.index_to_docstore_id.values():
+        doc = vs.docstore.search(_id)
+        md = getattr(doc, "metadata", None) or {}
+        h = md.get("content_hash")
+        if not h:
+            question = md.get("question") or ""
+            body = getattr(doc, "page_content", "") or ""
+            answer = body[len(f"Q: {question}\nA: "):]
+            h = content_hash(question, answer, md.get("sc_file"), md.get("ref_article"), md.get("comp_domain"))
+        manifest[str(_id)] = h
+    return manifest
+
+def load_manifest() -> Optional[dict]:
+    """저장된 manifest (없으면 None)"""
+    path = os.path.join(resolve_index_dir(get_vstore_dir()), MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["items"]
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
 def _save_vs(vs):
+    """
+    새 버전 디렉토리에 저장 후 포인터만 교체 (_INDEX_LOCK 안에서 호출)
+    - index.faiss / index.pkl / manifest.json(qa_id → content_hash) 이 한 디렉토리에 짝으로 저장됨
+    - 교체 중에도 읽는 쪽은 이전 버전 또는 새 버전 중 하나를 온전히 봄 (디렉토리가 비는 순간 없음)
+    """
     vstore_dir = get_vstore_dir()
-    vs.save_local(vstore_dir)
+    version_dir = new_version_dir(vstore_dir)
+    vs.save_local(version_dir)
+    with open(os.path.join(version_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump({"updated_at": time.time(), "items": build_manifest(vs)}, f)
+    publish_version(vstore_dir, version_dir)
 
-def _delete_ids(vs, ids: Iterable[str]):
-    if hasattr(vs, "docstore") and hasattr(vs.docstore, "delete"):
-        for _id in ids:
-            try:
-                vs.docstore.delete(_id)
-            except Exception:
-                # 존재하지 않으면 무시
-                pass
+def _delete_ids(vs, ids: Iterable[str]) -> int:
+    """
+    FAISS 인덱스 + docstore + id 매핑에서 함께 제거 (없는 id는 무시)
+    반환값: 실제 제거된 벡터 수
+    """
+    existing = set(vs.index_to_docstore_id.values())
+    targets = [str(_id) for _id in ids if str(_id) in existing]
+    if not targets:
+        return 0
+    vs.delete(targets)
+    return len(targets)
 
 # ---------------------------------------------------------------------
-# Public functions
+# 스트리밍 색인 (청크 단위로 임베딩 → 인덱스에 바로 추가)
 # ---------------------------------------------------------------------
 
-def rebuild_all(limit: Optional[int] = None,
-                comp_domain: Optional[str] = None) -> int:
+class ProgressReporter:
+    """rows/sec 와 ETA 출력 (interval 초마다 한 번)"""
+
+    def __init__(self, total: int, label: str = "index", interval: float = 2.0, enabled: bool = True):
+        self.total = total
+        self.label = label
+        self.interval = interval
+        self.enabled = enabled
+        self.done = 0
+        self.started = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, n: int):
+        self.done += n
+        now = time.perf_counter()
+        if self.enabled and (now - self._last >= self.interval or self.done >= self.total):
+            self._last = now
+            print(self.line())
+
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def line(self) -> str:
+        rate = self.rate()
+        remain = max(self.total - self.done, 0)
+        eta = (remain / rate) if rate > 0 else float("inf")
+        eta_txt = f"{eta:,.0f}s" if eta != float("inf") else "-"
+        pct = (self.done / self.total * 100) if self.total else 100.0
+        return (f"[{self.label}] {self.done:,}/{self.total:,} rows ({pct:.1f}%) "
+                f"{rate:,.1f} rows/s, ETA {eta_txt}")
+
+def _embed_in_batches(emb, texts: List[str], batch_size: int) -> List[List[float]]:
+    vectors: List[List[float]] = []
+    for i in range(0, len(texts), batch_size):
+        vectors.extend(emb.embed_documents(texts[i:i + batch_size]))
+    return vectors
+
+def _add_chunk(vs, emb, rows, batch_size: int, replace: bool = False):
     """
-    전체 재색인 (index.faiss를 새로 구성)
+    청크 하나를 임베딩해서 인덱스에 추가 (vs가 None이면 첫 청크로 인덱스 생성)
+    - replace=True: 같은 qa_id가 있으면 먼저 제거 (upsert)
     """
-    rows = fetch_faqs(limit=limit, comp_domain=comp_domain)
-    if not rows:
-        raise RuntimeError("comp_faq 테이블에서 가져온 FAQ가 없습니다.")
-
     texts, metas, ids = build_texts_metas_ids(rows)
-    emb = get_embeddings()
+    if not texts:
+        return vs
+    vectors = _embed_in_batches(emb, texts, batch_size)
+    pairs = list(zip(texts, vectors))
+    if vs is None:
+        return FAISS.from_embeddings(pairs, emb, metadatas=metas, ids=ids)
+    if replace:
+        _delete_ids(vs, ids)
+    vs.add_embeddings(pairs, metadatas=metas, ids=ids)
+    return vs
 
-    # 완전 재생성
-    vs = FAISS.from_texts(texts=texts, metadatas=metas, embedding=emb, ids=ids)
-    _save_vs(vs)
-    return len(texts)
+def build_index_streaming(chunks: Iterable[list],
+                          vs=None,
+                          replace: bool = False,
+                          batch_size: int = DEFAULT_BATCH_SIZE,
+                          progress: Optional[ProgressReporter] = None,
+                          emb=None):
+    """
+    청크 이터레이터를 받아 인덱스를 점진적으로 구성.
+    한 번에 메모리에 올라가는 것은 청크 1개 분량의 행/텍스트/임베딩뿐.
+    반환: (vs, 처리 행 수)
+    """
+    emb = emb or get_embeddings()
+    count = 0
+    for rows in chunks:
+        vs = _add_chunk(vs, emb, rows, batch_size, replace=replace)
+        count += len(rows)
+        if progress:
+            progress.update(len(rows))
+    return vs, count
 
-def upsert_all(limit: Optional[int] = None,
-               comp_domain: Optional[str] = None) -> int:
+# ---------------------------------------------------------------------
+# 삭제 저널 (per-file 삭제를 요청 경로 밖에서 처리)
+#   1) DB 삭제 전에 qa_id 목록을 prepared 상태로 기록
+#   2) DB commit 후 committed 로 표시 → 백그라운드에서 벡터만 제거
+#   3) 재시작 시 남아있는 작업을 다시 적용 (prepared 는 DB에서 실제로 지워졌는지 확인)
+# ---------------------------------------------------------------------
+
+_JOURNAL_LOCK = threading.Lock()
+
+def _journal_path() -> str:
+    return get_vstore_dir() + ".journal.json"
+
+def _read_journal() -> dict:
+    try:
+        with open(_journal_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"jobs": []}
+
+def _write_journal(journal: dict):
+    path = _journal_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(journal, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def prepare_faq_deletion(qa_ids: Iterable[int]) -> str:
+    """DB 삭제 전에 호출. 저널 항목 id를 반환"""
+    job_id = uuid.uuid4().hex
+    with _JOURNAL_LOCK:
+        journal = _read_journal()
+        journal["jobs"].append({
+            "job_id": job_id,
+            "qa_ids": [int(i) for i in qa_ids],
+            "state": "prepared",
+            "created_at": time.time(),
+        })
+        _write_journal(journal)
+    return job_id
+
+def commit_faq_deletion(job_id: str):
+    """DB commit 직후 호출"""
+    with _JOURNAL_LOCK:
+        journal = _read_journal()
+        for job in journal["jobs"]:
+            if job["job_id"] == job_id:
+                job["state"] = "committed"
+        _write_journal(journal)
+
+def abort_faq_deletion(job_id: str):
+    """DB commit 실패 시 호출 (작업 폐기)"""
+    with _JOURNAL_LOCK:
+        journal = _read_journal()
+        journal["jobs"] = [j for j in journal["jobs"] if j["job_id"] != job_id]
+        _write_journal(journal)
+
+def has_pending_deletions() -> bool:
+    return bool(_read_journal()["jobs"])
+
+def resolve_prepared_deletions():
+    """시작 시: prepared 작업은 DB에서 실제로 사라진 qa_id만 남기고 committed 로 전환"""
+    with _JOURNAL_LOCK:
+        journal = _read_journal()
+        for job in journal["jobs"]:
+            if job["state"] != "prepared":
+                continue
+            db: Session = SessionLocal()
+            try:
+                alive = set(db.scalars(
+                    select(CompFAQ.qa_id).where(CompFAQ.qa_id.in_(job["qa_ids"]))
+                ).all())
+            finally:
+                db.close()
+            job["qa_ids"] = [i for i in job["qa_ids"] if i not in alive]
+            job["state"] = "committed"
+        _write_journal(journal)
+
+def _committed_jobs() -> List[dict]:
+    with _JOURNAL_LOCK:
+        return [j for j in _read_journal()["jobs"] if j["state"] == "committed"]
+
+def _finish_jobs(job_ids: Iterable[str]):
+    """인덱스 저장이 끝난 뒤에만 저널에서 제거 (중간에 죽으면 재시도)"""
+    done_ids = set(job_ids)
+    if not done_ids:
+        return
+    with _JOURNAL_LOCK:
+        journal = _read_journal()
+        journal["jobs"] = [j for j in journal["jobs"] if j["job_id"] not in done_ids]
+        _write_journal(journal)
+
+def apply_pending_deletions(resolve_prepared: bool = False) -> int:
     """
-    기존 인덱스에 전체 추가(있는 id는 제거 후 재추가)
+    저널에 쌓인 삭제 작업을 인덱스에 반영 (재임베딩 없음)
+    - resolve_prepared=True (시작 시): prepared 작업은 DB에서 사라진 qa_id만 반영하고 나머지는 폐기
+    반환값: 제거된 벡터 수
     """
-    rows = fetch_faqs(limit=limit, comp_domain=comp_domain)
-    if not rows:
-        raise RuntimeError("comp_faq 테이블에서 가져온 FAQ가 없습니다.")
+    if resolve_prepared:
+        resolve_prepared_deletions()
+    return apply_index_batch()["removed"]
 
-    texts, metas, ids = build_texts_metas_ids(rows)
-    vs = _load_vs()
+# ---------------------------------------------------------------------
+# 배치 반영 (업서트 + 삭제 + 저널을 한 번의 load/save 로 처리)
+# ---------------------------------------------------------------------
+
+# load → 수정 → save 가 겹치지 않도록 보호 (같은 프로세스: 재진입 가능, 다른 프로세스: <dir>.lock 파일 잠금)
+_INDEX_LOCK = CollectionLock(get_vstore_dir)
 
-    # 동일 id 제거 후 추가
-    _delete_ids(vs, ids)
-    vs.add_texts(texts=texts, metadatas=metas, ids=ids, embedding=get_embeddings())
-    _save_vs(vs)
-    return len(texts)
+def _fetch_rows_by_ids(ids: List[int]) -> list:
+    db: Session = SessionLocal()
+    try:
+        rows = []
+        for i in range(0, len(ids), DEFAULT_CHUNK_SIZE):
+            part = ids[i:i + DEFAULT_CHUNK_SIZE]
+            rows.extend(db.execute(
+                select(*_FAQ_COLUMNS).where(CompFAQ.qa_id.in_(part)).order_by(CompFAQ.qa_id)
+            ).all())
+        return rows
+    finally:
+        db.close()
+
+def apply_index_batch(upsert_ids: Iterable[int] = (),
+                      delete_ids: Iterable[int] = ()) -> dict:
+    """
+    upsert_ids 는 DB에서 최신 내용을 읽어 교체, delete_ids 는 벡터만 제거.
+    저널의 committed 삭제 작업도 같이 반영하고, 인덱스 저장은 한 번만 수행.
+    (DB에 없는 upsert id는 삭제로 처리)
+    """
+    with _INDEX_LOCK:
+        jobs = _committed_jobs()
+        dels = {str(i) for i in delete_ids}
+        dels |= {str(i) for job in jobs for i in job["qa_ids"]}
+
+        ups = sorted({int(i) for i in upsert_ids} - {int(i) for i in dels})
+        rows = _fetch_rows_by_ids(ups) if ups else []
+        found = {r.qa_id for r in rows}
+        dels |= {str(i) for i in ups if i not in found}
+
+        removed = 0
+        vs = _load_vs(with_embeddings=False)
+        if vs is not None:
+            removed = _delete_ids(vs, dels | {str(i) for i in found})
+        if rows:
+            vs = _add_chunk(vs, get_embeddings(), rows, DEFAULT_BATCH_SIZE)
+        if removed or rows:
+            _save_vs(vs)
+        _finish_jobs(j["job_id"] for j in jobs)
+        return {"upserted": len(rows), "removed": removed}
+
+# ---------------------------------------------------------------------
+# Public functions
+# ---------------------------------------------------------------------
+
+def rebuild_all(limit: Optional[int] = None,
+                comp_domain: Optional[str] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE,
+                batch_size: int = DEFAULT_BATCH_SIZE,
+                show_progress: bool = False,
+                emb=None) -> int:
+    """
+    전체 재색인 (index.faiss를 새로 구성, 청크 단위 스트리밍)
+    - emb: 병렬 임베딩 등 기본 임베딩 대신 쓸 객체 (None이면 get_embeddings())
+    """
+    progress = ProgressReporter(count_faqs(limit, comp_domain), "rebuild", enabled=show_progress)
+    chunks = iter_faq_chunks(chunk_size, limit=limit, comp_domain=comp_domain)
+    # 재색인 중에 들어온 증분 반영이 새 인덱스에 덮여 사라지지 않도록 끝날 때까지 잠금 유지
+    # (index writer 는 그동안 기다렸다가 이어서 반영)
+    with _INDEX_LOCK:
+        vs, count = build_index_streaming(chunks, batch_size=batch_size, progress=progress, emb=emb)
+        if vs is None:
+            raise RuntimeError("comp_faq 테이블에서 가져온 FAQ가 없습니다.")
+
+        # 완전 재생성
+        _save_vs(vs)
+    return count
+
+def upsert_all(limit: Optional[int] = None,
+               comp_domain: Optional[str] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE,
+               batch_size: int = DEFAULT_BATCH_SIZE,
+               show_progress: bool = False,
+               emb=None) -> int:
+    """
+    기존 인덱스에 전체 추가(있는 id는 제거 후 재추가, 청크 단위 스트리밍)
+    """
+    progress = ProgressReporter(count_faqs(limit, comp_domain), "upsert", enabled=show_progress)
+    chunks = iter_faq_chunks(chunk_size, limit=limit, comp_domain=comp_domain)
+    with _INDEX_LOCK:
+        vs = _load_vs()
+        vs, count = build_index_streaming(chunks, vs=vs, replace=True,
+                                          batch_size=batch_size, progress=progress, emb=emb)
+        if not count:
+            raise RuntimeError("comp_faq 테이블에서 가져온 FAQ가 없습니다.")
+
+        _save_vs(vs)
+    return count
 
 def upsert_faqs_to_faiss(comp_domain: Optional[str],
                          faq_ids: Iterable[int]) -> int:
     """
-    ✅ 프로그램에서 호출하는 업서트 함수 (API에서 BackgroundTasks로 사용)
+    ✅ 프로그램에서 호출하는 업서트 함수 (동기 실행)
+    - API에서는 db.index_writer 큐를 통해 호출됨 (동시 저장 병합)
     - comp_domain는 필터용(선택), faq_ids로 필요한 항목만 업서트
     """
     ids_list = list(faq_ids)
     if not ids_list:
         return 0
-
-    rows = fetch_faqs(ids=ids_list, comp_domain=comp_domain)
-    if not rows:
-        return 0
-
-    texts, metas, ids = build_texts_metas_ids(rows)
-    vs = _load_vs()
-
-    # 동일 id 제거 후 추가
-    _delete_ids(vs, ids)
-    vs.add_texts(texts=texts, metadatas=metas, ids=ids, embedding=get_embeddings())
-    _save_vs(vs)
-    return len(texts)
+    if comp_domain:
+        ids_list = [r.qa_id for r in _fetch_rows_by_ids(ids_list) if r.comp_domain == comp_domain]
+        if not ids_list:
+            return 0
+    return apply_index_batch(upsert_ids=ids_list)["upserted"]
 
 def rebuild_faiss_index(db: Session):
     """
-    DB 전체 CompFAQ를 다시 임베딩해서 FAISS 인덱스를 새로 만듦.
+    DB 전체 CompFAQ를 다시 임베딩해서 FAISS 인덱스를 새로 만듦. (청크 단위 스트리밍)
     """
-    faqs = db.query(CompFAQ).all()
-    if not faqs:
-        return
+    with _INDEX_LOCK:
+        vs, _ = build_index_streaming(iter_faq_chunks(db=db))
+        if vs is None:
+            return
 
-    vstore_dir = get_vstore_dir()
-    if os.path.exists(vstore_dir):
-        import shutil
-        shutil.rmtree(vstore_dir)  # 디렉토리 전체 삭제
+        # ✅ 완전 새로 만들기 (_save_vs 가 새 버전으로 통째로 교체)
+        _save_vs(vs)
 
-    # ✅ 완전 새로 만들기
-    texts, metas, ids = build_texts_metas_ids(faqs)
-    emb = get_embeddings()
-    vs = FAISS.from_texts(texts=texts, metadatas=metas, embedding=emb, ids=ids)
-    _save_vs(vs)
 # ---------------------------------------------------------------------
 # CLI entry
 # ---------------------------------------------------------------------
@@ -206,16 +595,48 @@ def main():
     parser.add_argument("--mode", choices=["rebuild", "upsert"], default="rebuild",
                         help="rebuild: 새로 생성, upsert: 기존 인덱스에 추가/교체")
     parser.add_argument("--domain", type=str, default=None, help="특정 회사 도메인만 색인")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="DB에서 한 번에 스트리밍할 행 수")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="한 번에 임베딩할 텍스트 수")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="임베딩 프로세스 수 (2 이상이면 병렬 모드)")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="워커당 torch 스레드 수 (기본: 코어 수 / workers)")
+    parser.add_argument("--baseline", type=int, default=0,
+                        help="병렬 모드에서 직렬 처리량 비교용 샘플 행 수 (0이면 생략)")
     args = parser.parse_args()
 
+    opts = dict(limit=args.limit, comp_domain=args.domain, chunk_size=args.chunk_size,
+                batch_size=args.batch_size, show_progress=True)
+    par = None
+    if args.workers > 1:
+        par = make_parallel_embeddings(args.workers, args.threads_per_worker)
+        opts["emb"] = with_cache(par, get_embed_cache_key())
+        # 청크 전체를 한 번에 넘겨야 shard 가 워커들에 고르게 분배됨
+        opts["batch_size"] = max(args.batch_size, args.chunk_size)
+        print(f"[INFO] parallel embedding: {par.workers} workers x {par.threads_per_worker} threads")
+    started = time.perf_counter()
     if args.mode == "rebuild":
         print("[INFO] Rebuild index ...")
-        count = rebuild_all(limit=args.limit, comp_domain=args.domain)
+        count = rebuild_all(**opts)
         print(f"[DONE] rebuild 완료. 저장 문서 수: {count}")
     else:
         print("[INFO] Upsert into existing index ...")
-        count = upsert_all(limit=args.limit, comp_domain=args.domain)
+        count = upsert_all(**opts)
         print(f"[DONE] upsert 완료. 반영 문서 수: {count}")
+    elapsed = time.perf_counter() - started
+    print(f"[TIME] {elapsed:,.1f}s ({count / elapsed if elapsed else 0:,.1f} rows/s)")
+    print_cache_stats()
+
+    if par is not None:
+        serial_rate = None
+        if args.baseline:
+            sample = next(iter_faq_chunks(args.baseline, limit=args.baseline, comp_domain=args.domain), [])
+            serial_rate = par.measure_serial_rate(build_texts_metas_ids(sample)[0])
+        for line in par.report(serial_rate):
+            print(line)
+        par.close()
 
 if __name__ == "__main__":
     main()
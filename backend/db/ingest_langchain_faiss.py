@@ -1,22 +1,39 @@
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import sys
+import json
+import time
+import hashlib
 import argparse
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 # ---------- 경로/환경 ----------
 HERE    = Path(__file__).resolve().parent            # .../backend/db
 BACKEND = HERE.parent                                # .../backend
 load_dotenv(BACKEND / ".env", override=True, encoding="utf-8")  # backend/.env 고정 로드
+sys.path.append(str(BACKEND))  # `python db/ingest_langchain_faiss.py` 로 실행해도 db.* 임포트 가능
 
 # 기본 경로(인자 없을 때 사용)
 DEFAULT_PDF_DIR   = HERE / "vector_store" / "data" / "laws"      # PDF 기본 폴더
-DEFAULT_STORE_DIR = HERE / "vector_store" / "faiss_langchain"    # 벡터 저장 폴더
 
 # ---------- LangChain ----------
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from db.embedding_cache import with_cache, get_embedding_cache
+from db.parallel_embed import ParallelEmbeddings
+from db.vector_collections import (
+    collection_dir, collection_embedding, embedding_cache_key, COLLECTION_LAWS,
+    CollectionLock, resolve_index_dir, new_version_dir, publish_version,
+)
+
+# 임베딩 모델 / 정규화는 컬렉션 레지스트리 기준 (db/vector_collections.py 의 collection_embedding)
+MODEL_KWARGS  = {"device": "cpu"}
 
 
 def load_pdfs(pdf_dir: Path):
@@ -25,21 +42,209 @@ def load_pdfs(pdf_dir: Path):
     files = []
     for pat in pats:
         files += list(pdf_dir.rglob(pat))
+    files = sorted(set(files))  # 대소문자 구분 없는 파일시스템에서 중복 제거
     print(f"[INFO] Found {len(files)} PDF(s): {[p.name for p in files]}")
     return files
 
+# ---------- 병렬 파싱 ----------
+PAGES_PER_TASK = 40   # 큰 파일은 이 페이지 수 단위로 나눠서 병렬 파싱
+
+
+def _parse_page_range(path: str, start: int, end: int):
+    """워커 프로세스: PDF 페이지 범위의 텍스트 추출 → [(page, text)]"""
+    from pypdf import PdfReader
+    reader = PdfReader(path)
+    return [(i, reader.pages[i].extract_text() or "") for i in range(start, min(end, len(reader.pages)))]
+
+
+def plan_parse_tasks(pdf_files, pages_per_task: int = PAGES_PER_TASK):
+    """파일별 페이지 수를 보고 (path, start, end) 작업으로 분할"""
+    from pypdf import PdfReader
+    tasks, total_pages = [], 0
+    for p in pdf_files:
+        n = len(PdfReader(str(p)).pages)
+        total_pages += n
+        for start in range(0, n, pages_per_task):
+            tasks.append((str(p), start, start + pages_per_task))
+    return tasks, total_pages
+
+
+def iter_page_docs(tasks, parse_workers: int):
+    """
+    프로세스 풀에서 파싱한 페이지를 순서대로 Document 로 내보냄.
+    앞 작업이 끝나는 대로 결과를 주므로 파싱과 청킹/임베딩이 겹쳐서 진행됨.
+    동시에 제출하는 구간은 parse_workers × 2 개까지 → 임베딩이 느려도 파싱 결과가 메모리에 쌓이지 않음
+    (메타데이터는 PyPDFLoader 와 같은 source/page)
+    """
+    if parse_workers <= 1:
+        for path, start, end in tasks:
+            for page, text in _parse_page_range(path, start, end):
+                yield Document(page_content=text, metadata={"source": path, "page": page})
+        return
+
+    pool = ProcessPoolExecutor(max_workers=parse_workers, mp_context=mp.get_context("spawn"))
+    pending = iter(tasks)
+    window = deque()
+
+    def submit_next() -> bool:
+        task = next(pending, None)
+        if task is None:
+            return False
+        window.append((task[0], pool.submit(_parse_page_range, *task)))
+        return True
+
+    try:
+        for _ in range(parse_workers * 2):
+            if not submit_next():
+                break
+        while window:
+            path, fut = window.popleft()
+            pages = fut.result()
+            submit_next()
+            for page, text in pages:
+                yield Document(page_content=text, metadata={"source": path, "page": page})
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def build_index_pipeline(page_docs, splitter, embeddings, embed_batch: int, stats: dict,
+                         vs=None, id_prefix: dict = None):
+    """
+    페이지 → 청크 → 임베딩 배치 → 인덱스에 바로 추가 (전체 문서를 메모리에 모으지 않음)
+    vs 를 주면 기존 인덱스에 추가. id_prefix(source → "<상대경로>@<해시>")가 있으면 청크 id 를 "<prefix>:<순번>" 으로 부여.
+    반환: (vs, {source: [chunk ids]})
+    """
+    pending = []
+    chunk_ids = {}
+
+    def flush():
+        nonlocal vs, pending
+        if not pending:
+            return
+        texts = [d.page_content for d in pending]
+        metas = [d.metadata for d in pending]
+        ids = None
+        if id_prefix is not None:
+            ids = []
+            for m in metas:
+                owned = chunk_ids.setdefault(m["source"], [])
+                ids.append(f"{id_prefix[m['source']]}:{len(owned)}")
+                owned.append(ids[-1])
+        vectors = embeddings.embed_documents(texts)
+        pairs = list(zip(texts, vectors))
+        if vs is None:
+            vs = FAISS.from_embeddings(pairs, embeddings, metadatas=metas, ids=ids)
+        else:
+            vs.add_embeddings(pairs, metadatas=metas, ids=ids)
+        stats["chunks"] += len(pending)
+        pending = []
+
+    for doc in page_docs:
+        stats["pages"] += 1
+        pending.extend(splitter.split_documents([doc]))
+        if len(pending) >= embed_batch:
+            flush()
+        if stats["pages"] % 100 == 0:
+            elapsed = time.perf_counter() - stats["started"]
+            print(f"[PIPE] {stats['pages']:,}/{stats['total_pages']:,} pages, {stats['chunks']:,} chunks, "
+                  f"{stats['pages'] / elapsed:,.1f} pages/s")
+    flush()
+    return vs, chunk_ids
+
+
+# ---------- 파일 manifest (증분 색인) ----------
+FILES_MANIFEST = "files_manifest.json"   # 인덱스와 같은 버전 디렉터리에 함께 저장
+
+
+def file_sha256(path: Path, block: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for buf in iter(lambda: f.read(block), b""):
+            h.update(buf)
+    return h.hexdigest()
+
+
+def load_files_manifest(store_dir: Path):
+    """{"files": {상대경로: {size, mtime, sha256, chunk_ids}}} 또는 None (없음/손상)"""
+    path = store_dir / FILES_MANIFEST
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["files"]
+    except Exception as e:
+        print(f"[WARN] manifest 읽기 실패 → 전체 재색인: {e}")
+        return None
+
+
+def save_files_manifest(store_dir: Path, files: dict):
+    path = store_dir / FILES_MANIFEST
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps({"version": 1, "files": files}, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def plan_delta(pdf_dir: Path, pdf_files, manifest: dict):
+    """
+    현재 폴더 ↔ manifest 비교 → {"new", "changed", "deleted", "unchanged", "entries"}
+    size/mtime 이 같으면 해시 계산 생략, 다르면 해시로 실제 변경 여부 판단 (touch 만 된 파일은 unchanged)
+    """
+    delta = {"new": [], "changed": [], "deleted": [], "unchanged": [], "entries": {}}
+    seen = set()
+    for p in pdf_files:
+        key = p.relative_to(pdf_dir).as_posix()
+        seen.add(key)
+        st = p.stat()
+        entry = {"size": st.st_size, "mtime": st.st_mtime}
+        old = manifest.get(key)
+        if old and old["size"] == st.st_size and old["mtime"] == st.st_mtime:
+            delta["unchanged"].append(key)
+            delta["entries"][key] = old
+            continue
+        entry["sha256"] = file_sha256(p)
+        if old and old["sha256"] == entry["sha256"]:
+            delta["unchanged"].append(key)
+            delta["entries"][key] = {**old, **entry}
+            continue
+        delta["changed" if old else "new"].append(key)
+        delta["entries"][key] = entry
+    delta["deleted"] = sorted(k for k in manifest if k not in seen)
+    return delta
+
+
+def print_delta(delta: dict, manifest: dict):
+    stale = sum(len(manifest[k]["chunk_ids"]) for k in delta["changed"] + delta["deleted"])
+    print(f"[DELTA] new {len(delta['new'])}, changed {len(delta['changed'])}, "
+          f"deleted {len(delta['deleted'])}, unchanged {len(delta['unchanged'])} "
+          f"→ remove {stale:,} chunk(s)")
+    for kind in ("new", "changed", "deleted"):
+        for key in delta[kind]:
+            print(f"  {kind:8s} {key}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Index PDFs to FAISS (LangChain + OpenAIEmbeddings)")
     parser.add_argument("--pdf-dir", type=str, default=str(DEFAULT_PDF_DIR),
                         help="PDF 폴더 경로 (지정하지 않으면 기본 경로 사용)")
-    parser.add_argument("--store-dir", type=str, default=str(DEFAULT_STORE_DIR),
-                        help="벡터 인덱스 저장 경로 (index.faiss / index.pkl)")
+    parser.add_argument("--collection", type=str, default=COLLECTION_LAWS,
+                        help="저장할 컬렉션 이름 (db/vector_collections.py, 기본: laws)")
+    parser.add_argument("--store-dir", type=str, default=None,
+                        help="벡터 인덱스 저장 경로 직접 지정 (기본: 컬렉션 경로)")
     parser.add_argument("--chunk-size", type=int, default=500, help="청크 최대 문자수")
     parser.add_argument("--chunk-overlap", type=int, default=50, help="청크 겹침 문자수")
+    parser.add_argument("--workers", type=int, default=1, help="임베딩 프로세스 수 (2 이상이면 병렬)")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="워커당 torch 스레드 수 (기본: 코어 수 / workers)")
+    parser.add_argument("--parse-workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="PDF 파싱 프로세스 수 (1이면 직렬)")
+    parser.add_argument("--pages-per-task", type=int, default=PAGES_PER_TASK,
+                        help="큰 파일을 나눠 파싱할 페이지 단위")
+    parser.add_argument("--embed-batch", type=int, default=256, help="한 번에 임베딩할 청크 수")
+    parser.add_argument("--full", action="store_true", help="manifest 를 무시하고 전체 재색인")
+    parser.add_argument("--dry-run", action="store_true", help="추가/변경/삭제될 파일만 보고하고 종료")
     args = parser.parse_args()
 
     pdf_dir   = Path(args.pdf_dir)
-    store_dir = Path(args.store_dir)
+    store_dir = Path(args.store_dir or collection_dir(args.collection))
     store_dir.mkdir(parents=True, exist_ok=True)
 
     print(f"[INFO] PDF_DIR   = {pdf_dir}")
@@ -53,7 +258,14 @@ def main():
             "- 내용 예: OPENAI_API_KEY=sk-xxxx\n"
         )
 
-    # 1) 문서 로드
+    # 같은 컬렉션을 다른 프로세스가 쓰는 중이면 끝날 때까지 기다림 (manifest 읽기 ~ 게시까지 한 번에)
+    with CollectionLock(str(store_dir)):
+        ingest(args, pdf_dir, store_dir)
+
+
+def ingest(args, pdf_dir: Path, store_dir: Path):
+    """변경분 계산 → 새/변경 파일만 색인 → 인덱스 + manifest 를 새 버전으로 게시"""
+    # 1) 문서 목록 + 변경분 계산
     pdf_files = load_pdfs(pdf_dir)
     if not pdf_files:
         raise RuntimeError(
@@ -62,11 +274,25 @@ def main():
             "- PDF를 이 경로로 옮기거나, --pdf-dir 로 실제 경로를 지정하세요.\n"
             "  예) python db/ingest_langchain_faiss.py --pdf-dir \"D:\\자료\\법령PDF\""
         )
+    current_dir = Path(resolve_index_dir(str(store_dir)))  # 현재 게시된 버전 (예전 방식이면 store_dir)
+    has_index = (current_dir / "index.faiss").exists()
+    manifest = None if args.full or not has_index else load_files_manifest(current_dir)
+    incremental = manifest is not None
+    delta = plan_delta(pdf_dir, pdf_files, manifest or {})
+    if not incremental:
+        print("[INFO] 전체 재색인 (manifest 없음 또는 --full)")
+    print_delta(delta, manifest or {})
+    if args.dry_run:
+        return
+    todo = delta["new"] + delta["changed"]
+    if incremental and not todo and not delta["deleted"]:
+        print("[INFO] 변경된 파일이 없습니다.")
+        return
 
-    raw_docs = []
-    for p in pdf_files:
-        loader = PyPDFLoader(str(p))
-        raw_docs.extend(loader.load())  # 페이지 단위로 로드
+    # 새/변경 파일만 파싱
+    todo_paths = [pdf_dir / key for key in todo]
+    tasks, total_pages = plan_parse_tasks(todo_paths, args.pages_per_task)
+    print(f"[INFO] {total_pages:,} pages → {len(tasks)} parse task(s), {args.parse_workers} parse worker(s)")
 
     # 2) 청킹(문서 조각내기)
     splitter = RecursiveCharacterTextSplitter(
@@ -75,29 +301,78 @@ def main():
         separators=["\n\n", "\n", " ", ""],
         length_function=len
     )
-    docs = splitter.split_documents(raw_docs)
-    print(f"[INFO] Split into {len(docs)} chunks (size={args.chunk_size}, overlap={args.chunk_overlap})")
-
-    # 3) 임베딩
-    embeddings = HuggingFaceEmbeddings(
-    model_name="BM-K/KoSimCSE-roberta-multitask",
-    encode_kwargs={"normalize_embeddings": True},
-    model_kwargs={"device": "cpu"}
-)
-    vectorstore = FAISS.load_local(
-    "db/vector_store/faiss_langchain",
-    embeddings,
-    allow_dangerous_deserialization=True
-)
 
-    retriever = vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": 5})
+    # 3) 임베딩 (저장할 컬렉션의 모델 / 정규화 → 검색 쪽 rag_engine 과 같은 공간)
+    model_name, normalize = collection_embedding(args.collection)
+    encode_kwargs = {"normalize_embeddings": normalize}
+    par = None
+    if args.workers > 1:
+        par = ParallelEmbeddings(model_name, args.workers, threads_per_worker=args.threads_per_worker,
+                                 model_kwargs=MODEL_KWARGS, encode_kwargs=encode_kwargs)
+        embeddings = par
+        print(f"[INFO] parallel embedding: {par.workers} workers x {par.threads_per_worker} threads")
+    else:
+        embeddings = HuggingFaceEmbeddings(
+            model_name=model_name,
+            encode_kwargs=encode_kwargs,
+            model_kwargs=MODEL_KWARGS,
+        )
+    # 같은 청크는 재인코딩하지 않도록 영속 캐시 경유 (정규화 여부도 키에 포함)
+    embeddings = with_cache(embeddings, embedding_cache_key(model_name, normalize))
+
+    # 4) 기존 인덱스에서 변경/삭제 파일의 청크 제거
+    vs = None
+    if incremental:
+        vs = FAISS.load_local(str(current_dir), embeddings, allow_dangerous_deserialization=True)
+        stale = [cid for key in delta["changed"] + delta["deleted"] for cid in manifest[key]["chunk_ids"]]
+        # 인덱스에 없는 id 가 섞이면 vs.delete 가 ValueError → 있는 것만 제거
+        existing = set(vs.index_to_docstore_id.values())
+        missing = len(stale)
+        stale = [cid for cid in stale if cid in existing]
+        missing -= len(stale)
+        if stale:
+            vs.delete(stale)
+            print(f"[INFO] removed {len(stale):,} stale chunk(s)")
+        if missing:
+            print(f"[WARN] manifest 에는 있지만 인덱스에 없는 청크 {missing:,}개 (건너뜀)")
 
+    # 5) 파싱 → 청킹 → 임베딩 → 인덱스 추가 (파이프라인)
+    stats = {"pages": 0, "chunks": 0, "total_pages": total_pages, "started": time.perf_counter()}
+    page_docs = iter_page_docs(tasks, args.parse_workers)
+    # 같은 내용의 파일이 여러 경로에 있어도 id 가 겹치지 않도록 경로 + 해시
+    id_prefix = {str(pdf_dir / key): f"{key}@{delta['entries'][key]['sha256'][:16]}" for key in todo}
+    vs, chunk_ids = build_index_pipeline(page_docs, splitter, embeddings, args.embed_batch, stats,
+                                         vs=vs, id_prefix=id_prefix)
+    elapsed = time.perf_counter() - stats["started"]
+    print(f"[INFO] {stats['pages']:,} pages → {stats['chunks']:,} chunks in {elapsed:,.1f}s "
+          f"({stats['pages'] / elapsed if elapsed else 0:,.1f} pages/s)")
+    if vs is None:
+        raise RuntimeError("PDF에서 추출된 텍스트가 없습니다.")
 
-    # 4) 벡터스토어 저장
-    vs = FAISS.from_documents(docs, embeddings)
-    vs.save_local(str(store_dir))  # index.faiss + index.pkl 생성
-    print(f"✅ Saved -> {store_dir / 'index.faiss'}")
-    print(f"✅ Saved -> {store_dir / 'index.pkl'}")
+    # 6) 벡터스토어 + manifest 저장
+    # 새 버전 디렉터리에 인덱스 → manifest 순으로 쓰고 포인터(CURRENT)만 교체
+    # → 중간에 죽어도 게시된 인덱스와 manifest 는 항상 짝이 맞음 (검색 쪽도 이전 버전을 계속 읽음)
+    files = {}
+    for key, entry in delta["entries"].items():
+        if key in todo:
+            entry = {**entry, "chunk_ids": chunk_ids.get(str(pdf_dir / key), [])}
+        files[key] = entry
+    version_dir = Path(new_version_dir(str(store_dir)))
+    vs.save_local(str(version_dir))  # index.faiss + index.pkl 생성
+    save_files_manifest(version_dir, files)
+    publish_version(str(store_dir), str(version_dir))
+    print(f"✅ Saved -> {version_dir / 'index.faiss'}")
+    print(f"✅ Saved -> {version_dir / 'index.pkl'}")
+    print(f"✅ Saved -> {version_dir / FILES_MANIFEST} ({len(files)} file(s))")
+    if par is not None:
+        for line in par.report():
+            print(line)
+        par.close()
+    cache = get_embedding_cache()
+    if cache is not None:
+        st = cache.stats()
+        print(f"[CACHE] hit rate {st['hit_rate']:.1%} ({st['hits']}/{st['hits'] + st['misses']}), "
+              f"entries={st['entries']}, size={st['size_mb']}MB")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,155 @@
+# backend/db/parallel_embed.py
+"""
+멀티 프로세스 임베딩 (전체 재색인용)
+- 입력 텍스트를 shard 단위로 나눠 프로세스 풀에 분배
+- 워커마다 모델을 따로 로드하고 torch 스레드 수를 제한 (코어 과다 구독 방지)
+- 결과는 입력 순서 그대로 합쳐서 반환 → id/메타데이터 순서 유지
+- 워커별 처리량 / 전체 처리량 / 직렬 대비 속도 향상 리포트
+
+사용 예:
+  python -m db.ingest_faq_to_faiss --mode rebuild --workers 8
+  python db/ingest_langchain_faiss.py --workers 8
+"""
+
+import os
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_SHARD_SIZE = 256
+
+# ---------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------
+
+_WORKER_EMB = None
+
+def _limit_threads(threads: int):
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except Exception:
+        # torch 미설치 또는 이미 interop 스레드가 시작된 경우
+        pass
+
+def _init_worker(model_name: str, model_kwargs: dict, encode_kwargs: dict, threads: int):
+    global _WORKER_EMB
+    _limit_threads(threads)
+    from langchain_huggingface import HuggingFaceEmbeddings
+    _WORKER_EMB = HuggingFaceEmbeddings(
+        model_name=model_name, model_kwargs=model_kwargs, encode_kwargs=encode_kwargs
+    )
+
+def _encode_shard(texts: List[str]):
+    started = time.perf_counter()
+    vectors = np.asarray(_WORKER_EMB.embed_documents(texts), dtype=np.float32)
+    return os.getpid(), vectors, time.perf_counter() - started
+
+# ---------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------
+
+class ParallelEmbeddings(Embeddings):
+    """
+    embed_documents 를 프로세스 풀로 병렬 처리하는 Embeddings.
+    db.embedding_cache.with_cache 로 감싸면 캐시에 없는 텍스트만 풀로 전달됨.
+    """
+
+    def __init__(self,
+                 model_name: str,
+                 workers: int,
+                 threads_per_worker: Optional[int] = None,
+                 shard_size: int = DEFAULT_SHARD_SIZE,
+                 model_kwargs: Optional[dict] = None,
+                 encode_kwargs: Optional[dict] = None):
+        self.model_name = model_name
+        self.workers = max(1, workers)
+        cores = os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker or max(1, cores // self.workers)
+        self.shard_size = shard_size
+        self.model_kwargs = model_kwargs or {}
+        self.encode_kwargs = encode_kwargs or {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._local = None
+        # 통계
+        self.worker_rows: Dict[int, int] = {}
+        self.worker_secs: Dict[int, float] = {}
+        self.rows = 0
+        self.wall = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.model_kwargs, self.encode_kwargs, self.threads_per_worker),
+            )
+        return self._pool
+
+    def _get_local(self):
+        if self._local is None:
+            from langchain_huggingface import HuggingFaceEmbeddings
+            self._local = HuggingFaceEmbeddings(
+                model_name=self.model_name, model_kwargs=self.model_kwargs, encode_kwargs=self.encode_kwargs
+            )
+        return self._local
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = list(texts)
+        if not texts:
+            return []
+        started = time.perf_counter()
+        shards = [texts[i:i + self.shard_size] for i in range(0, len(texts), self.shard_size)]
+        out: List[np.ndarray] = []
+        # map 은 입력 순서대로 결과를 돌려줌 → shard 순서 = 원래 순서
+        for pid, vectors, secs in self._get_pool().map(_encode_shard, shards):
+            out.append(vectors)
+            self.worker_rows[pid] = self.worker_rows.get(pid, 0) + len(vectors)
+            self.worker_secs[pid] = self.worker_secs.get(pid, 0.0) + secs
+        self.wall += time.perf_counter() - started
+        self.rows += len(texts)
+        return np.concatenate(out).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._get_local().embed_query(text)
+
+    def measure_serial_rate(self, texts: List[str]) -> float:
+        """비교용: 부모 프로세스에서 스레드 제한 없이 직렬 인코딩한 rows/sec"""
+        if not texts:
+            return 0.0
+        local = self._get_local()
+        local.embed_documents(texts[:2])  # 워밍업
+        started = time.perf_counter()
+        local.embed_documents(texts)
+        secs = time.perf_counter() - started
+        return len(texts) / secs if secs > 0 else 0.0
+
+    def report(self, serial_rate: Optional[float] = None) -> List[str]:
+        lines = []
+        for i, pid in enumerate(sorted(self.worker_rows), start=1):
+            rows, secs = self.worker_rows[pid], self.worker_secs[pid]
+            lines.append(f"[WORKER {i} pid={pid}] {rows:,} rows, {secs:,.1f}s busy, "
+                         f"{rows / secs if secs else 0:,.1f} rows/s")
+        rate = self.rows / self.wall if self.wall else 0.0
+        busy = sum(self.worker_secs.values())
+        lines.append(f"[PARALLEL] {self.workers} workers x {self.threads_per_worker} threads, "
+                     f"{self.rows:,} rows in {self.wall:,.1f}s = {rate:,.1f} rows/s "
+                     f"(busy/wall {busy / self.wall if self.wall else 0:,.2f}x)")
+        if serial_rate:
+            lines.append(f"[SPEEDUP] serial {serial_rate:,.1f} rows/s → parallel {rate:,.1f} rows/s "
+                         f"= {rate / serial_rate:,.2f}x")
+        return lines
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -1,15 +1,19 @@
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import sys
 
 HERE    = Path(__file__).resolve().parent
 BACKEND = HERE.parent
 load_dotenv(BACKEND / ".env", override=True, encoding="utf-8")
+sys.path.append(str(BACKEND))
 
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
 
-STORE_DIR = HERE / "vector_store" / "faiss_langchain"
+from db.vector_collections import index_dir, COLLECTION_LAWS
+
+STORE_DIR = Path(index_dir(COLLECTION_LAWS))
 
 def search(query: str, k: int = 5):
     if not (STORE_DIR / "index.faiss").exists():
@@ -0,0 +1,140 @@
+# backend/db/reconcile_faiss.py
+"""
+FAISS 인덱스 ↔ comp_faq 정합성 맞추기 (reconcile)
+- 인덱스 쪽: manifest.json (qa_id → content_hash, _save_vs 가 함께 저장)
+- DB 쪽: qa_id, MD5(CONCAT_WS(CHAR(31), ...)) 만 읽는 가벼운 체크섬 쿼리
+- 차이(추가/수정/삭제)만 apply_index_batch 로 반영 → 전체 재색인 불필요
+
+사용 예:
+  python -m db.reconcile_faiss --dry-run          # 드리프트만 보고
+  python -m db.reconcile_faiss                    # index 큐에 reconcile 작업 등록 (writer 가 반영)
+  python -m db.reconcile_faiss --direct           # 이 프로세스에서 바로 반영 (API/워커가 꺼져 있을 때)
+  python -m db.reconcile_faiss --every 3600       # 1시간마다 반복 (스케줄 실행)
+"""
+
+import time
+import argparse
+from typing import Dict, Optional
+
+from sqlalchemy import func, select, literal_column
+from sqlalchemy.orm import Session
+
+from db.session import SessionLocal
+from models.faq import CompFAQ
+from db.ingest_faq_to_faiss import (
+    load_env, content_hash, load_manifest, build_manifest, apply_index_batch,
+    _load_vs, _INDEX_LOCK, DEFAULT_CHUNK_SIZE,
+)
+
+# ---------------------------------------------------------------------
+# 체크섬
+# ---------------------------------------------------------------------
+
+def db_checksums(db: Optional[Session] = None) -> Dict[str, str]:
+    """comp_faq 의 qa_id → content_hash (MySQL 은 DB에서 MD5 계산, 그 외는 스트리밍 후 계산)"""
+    own = db is None
+    db = db or SessionLocal()
+    try:
+        out: Dict[str, str] = {}
+        if db.get_bind().dialect.name == "mysql":
+            digest = func.md5(func.concat_ws(
+                literal_column("CHAR(31)"),
+                CompFAQ.question, CompFAQ.answer,
+                func.ifnull(CompFAQ.sc_file, ""),
+                func.ifnull(CompFAQ.ref_article, ""),
+                func.ifnull(CompFAQ.comp_domain, ""),
+            ))
+            q = select(CompFAQ.qa_id, digest)
+            result = db.execute(q.execution_options(stream_results=True, yield_per=DEFAULT_CHUNK_SIZE))
+            for qa_id, h in result:
+                out[str(qa_id)] = h
+        else:
+            q = select(CompFAQ.qa_id, CompFAQ.question, CompFAQ.answer,
+                       CompFAQ.sc_file, CompFAQ.ref_article, CompFAQ.comp_domain)
+            result = db.execute(q.execution_options(stream_results=True, yield_per=DEFAULT_CHUNK_SIZE))
+            for r in result:
+                out[str(r.qa_id)] = content_hash(r.question, r.answer, r.sc_file, r.ref_article, r.comp_domain)
+        return out
+    finally:
+        if own:
+            db.close()
+
+def index_checksums() -> Dict[str, str]:
+    """manifest.json 이 있으면 그걸, 없으면(옛 인덱스) docstore 에서 계산"""
+    manifest = load_manifest()
+    if manifest is not None:
+        return manifest
+    vs = _load_vs(with_embeddings=False)
+    return build_manifest(vs) if vs is not None else {}
+
+# ---------------------------------------------------------------------
+# Diff / Apply
+# ---------------------------------------------------------------------
+
+def diff(index_sums: Dict[str, str], db_sums: Dict[str, str]) -> dict:
+    inserts = [k for k in db_sums if k not in index_sums]
+    updates = [k for k, h in db_sums.items() if k in index_sums and index_sums[k] != h]
+    deletes = [k for k in index_sums if k not in db_sums]
+    return {
+        "db_rows": len(db_sums),
+        "index_rows": len(index_sums),
+        "inserts": sorted(inserts, key=int),
+        "updates": sorted(updates, key=int),
+        "deletes": sorted(deletes, key=int),
+    }
+
+def reconcile(dry_run: bool = False) -> dict:
+    """
+    드리프트를 찾아 최소 변경만 반영. 반환: 드리프트 리포트
+    (index writer 안에서도 호출되므로 인덱스 락 안에서 diff → 반영)
+    """
+    started = time.perf_counter()
+    with _INDEX_LOCK:
+        report = diff(index_checksums(), db_checksums())
+        if not dry_run and (report["inserts"] or report["updates"] or report["deletes"]):
+            result = apply_index_batch(
+                upsert_ids=[int(i) for i in report["inserts"] + report["updates"]],
+                delete_ids=[int(i) for i in report["deletes"]],
+            )
+            report["applied"] = result
+    report["drift"] = len(report["inserts"]) + len(report["updates"]) + len(report["deletes"])
+    report["dry_run"] = dry_run
+    report["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+def summarize(report: dict, sample: int = 10) -> str:
+    def ids(key):
+        xs = report[key]
+        more = f" (+{len(xs) - sample})" if len(xs) > sample else ""
+        return ",".join(xs[:sample]) + more
+    return (f"[RECONCILE] db={report['db_rows']} index={report['index_rows']} drift={report['drift']} "
+            f"(insert {len(report['inserts'])}, update {len(report['updates'])}, delete {len(report['deletes'])})"
+            f"{' [dry-run]' if report['dry_run'] else ''} {report['elapsed_ms']}ms\n"
+            f"  insert: {ids('inserts')}\n  update: {ids('updates')}\n  delete: {ids('deletes')}")
+
+# ---------------------------------------------------------------------
+# CLI entry
+# ---------------------------------------------------------------------
+
+def main():
+    load_env()
+    parser = argparse.ArgumentParser(description="Reconcile FAISS index with comp_faq")
+    parser.add_argument("--dry-run", action="store_true", help="드리프트만 보고하고 반영하지 않음")
+    parser.add_argument("--direct", action="store_true",
+                        help="index 큐를 거치지 않고 이 프로세스에서 바로 반영")
+    parser.add_argument("--every", type=float, default=0, help="N초마다 반복 실행 (0이면 1회)")
+    args = parser.parse_args()
+
+    while True:
+        if args.dry_run or args.direct:
+            print(summarize(reconcile(dry_run=args.dry_run)))
+        else:
+            from db.index_writer import enqueue_reconcile
+            print(summarize(reconcile(dry_run=True)))
+            print(f"[RECONCILE] index 큐에 등록: job_id={enqueue_reconcile()}")
+        if not args.every:
+            break
+        time.sleep(args.every)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,36 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+"""
+DB 세션
+- 동기: engine / SessionLocal / get_db (기존 코드, 스레드에서 도는 def 엔드포인트 / 워커용)
+- 비동기: get_async_engine / get_async_sessionmaker / get_async_db (async def 엔드포인트용)
+  → 쿼리를 기다리는 동안 이벤트 루프가 다른 요청을 처리함 (aiomysql 또는 asyncmy 필요)
+  → 엔진은 처음 쓸 때 만듦 (드라이버가 없어도 동기 경로는 그대로 동작)
+- 읽기 전용: get_read_db (읽기가 많은 엔드포인트 / get_current_user)
+  → DB_REPLICA_URLS 의 레플리카를 라운드로빈으로 사용, 연결 실패한 레플리카는 잠시 빼고 primary 로
+  → 쓰기 문장, 그리고 같은 요청 안에서 쓰기가 있었던 뒤의 읽기는 primary 로 (DBRoutingMiddleware)
+  → 레플리카 연결이 실패한 그 읽기도 primary 로 한 번 다시 실행 (500 대신)
+  → 레플리카를 설정하지 않으면 get_db 와 같음
+
+.env (선택):
+  DB_POOL_SIZE=5
+  DB_MAX_OVERFLOW=10
+  DB_POOL_RECYCLE=1800        # 초, MySQL wait_timeout 보다 짧게
+  DB_POOL_TIMEOUT=30          # 초, 풀이 꽉 찼을 때 기다리는 시간
+  DB_ASYNC_DRIVER=aiomysql    # 또는 asyncmy
+  DB_REPLICA_URLS=mysql+pymysql://ro:pw@replica1:3306/db?charset=utf8mb4,mysql+pymysql://ro:pw@replica2:3306/db?charset=utf8mb4
+  DB_REPLICA_RETRY=30         # 초, 연결 실패한 레플리카를 다시 쓰기까지
+"""
 import os
+import time
+import threading
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, DisconnectionError
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
 
 MYSQL_USER = os.getenv("MYSQL_USER", "mp_25K_LI3_p3_3")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "smhrd3")
@@ -11,8 +41,23 @@ MYSQL_DB = os.getenv("MYSQL_DB", "mp_25K_LI3_p3_3")
 DATABASE_URL = (
     f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}?charset=utf8mb4"
 )
+ASYNC_DRIVER = os.getenv("DB_ASYNC_DRIVER", "aiomysql")
+ASYNC_DATABASE_URL = (
+    f"mysql+{ASYNC_DRIVER}://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}?charset=utf8mb4"
+)
+
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, echo=True)
+def pool_options() -> dict:
+    """동기/비동기 엔진 공통 커넥션 풀 설정"""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+    }
+
+
+engine = create_engine(DATABASE_URL, pool_pre_ping=True, echo=True, **pool_options())
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
 
@@ -22,4 +67,253 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# ---------------------------------------------------------
+# 요청 단위 쓰기 추적 (read-after-write → primary)
+# - DBRoutingMiddleware 가 요청마다 새 dict 를 ContextVar 에 넣음
+#   (def 엔드포인트 / 의존성은 스레드에서 돌지만 같은 dict 를 보므로 표시가 공유됨)
+# - primary 엔진으로 나가는 쓰기 문장을 보면 표시 → 그 뒤 읽기 세션도 primary 사용
+# ---------------------------------------------------------
+_request_state: ContextVar[Optional[dict]] = ContextVar("db_request_state", default=None)
+_WRITE_VERBS = ("INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "ALTER", "DROP", "TRUNCATE")
+
+
+def _is_write_sql(statement: str) -> bool:
+    return statement.lstrip().upper().startswith(_WRITE_VERBS)
+
+
+def mark_write():
+    state = _request_state.get()
+    if state is not None:
+        state["wrote"] = True
+
+
+def wrote_in_request() -> bool:
+    state = _request_state.get()
+    return bool(state and state.get("wrote"))
+
+
+def _track_writes(engine_: Engine):
+    @event.listens_for(engine_, "before_cursor_execute")
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        if _is_write_sql(statement):
+            mark_write()
+
+
+_track_writes(engine)
+
+
+class DBRoutingMiddleware:
+    """요청마다 쓰기 표시를 초기화 (main.py 에서 app.add_middleware)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_state.set({"wrote": False})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_state.reset(token)
+
+# ---------------------------------------------------------
+# 읽기 레플리카 (라운드로빈 + 장애 시 primary)
+# ---------------------------------------------------------
+class ReplicaPool:
+    def __init__(self, urls: List[str], retry_seconds: float = 30.0):
+        self.urls = urls
+        self.retry_seconds = retry_seconds
+        self.engines = [create_engine(u, pool_pre_ping=True, **pool_options()) for u in urls]
+        self._down_until = [0.0] * len(self.engines)
+        self._picks = [0] * len(self.engines)
+        self._fallbacks = 0
+        self._next = 0
+        self._lock = threading.Lock()
+        for i, e in enumerate(self.engines):
+            self._watch(i, e)
+
+    def _watch(self, idx: int, engine_: Engine):
+        @event.listens_for(engine_, "handle_error")
+        def _on_error(ctx):
+            # 연결 자체가 안 되거나 끊긴 경우만 (쿼리 오류는 레플리카 탓이 아님)
+            if ctx.is_disconnect or ctx.connection is None:
+                self.mark_down(idx)
+
+    def mark_down(self, idx: int):
+        with self._lock:
+            self._down_until[idx] = time.time() + self.retry_seconds
+        print(f"⚠️ 레플리카 연결 실패 → {self.retry_seconds:.0f}초 동안 제외: {self.engines[idx].url!r}")
+
+    def is_up(self, engine_: Engine) -> bool:
+        try:
+            idx = self.engines.index(engine_)
+        except ValueError:
+            return False
+        return self._down_until[idx] <= time.time()
+
+    def pick(self) -> Optional[Engine]:
+        """살아 있는 레플리카 하나 (라운드로빈), 모두 죽었으면 None → primary"""
+        now = time.time()
+        with self._lock:
+            n = len(self.engines)
+            for k in range(n):
+                idx = (self._next + k) % n
+                if self._down_until[idx] <= now:
+                    self._next = idx + 1
+                    self._picks[idx] += 1
+                    return self.engines[idx]
+            self._fallbacks += 1
+            return None
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            return {
+                "replicas": [{"url": repr(e.url), "up": self._down_until[i] <= now, "picks": self._picks[i]}
+                             for i, e in enumerate(self.engines)],
+                "primary_fallbacks": self._fallbacks,
+            }
+
+
+_replica_pool: Optional[ReplicaPool] = None
+_replica_lock = threading.Lock()
+_replica_loaded = False
+
+
+def get_replica_pool() -> Optional[ReplicaPool]:
+    """DB_REPLICA_URLS 가 없으면 None"""
+    global _replica_pool, _replica_loaded
+    with _replica_lock:
+        if not _replica_loaded:
+            urls = [u.strip() for u in os.getenv("DB_REPLICA_URLS", "").split(",") if u.strip()]
+            if urls:
+                _replica_pool = ReplicaPool(urls, float(os.getenv("DB_REPLICA_RETRY", 30)))
+            _replica_loaded = True
+        return _replica_pool
+
+
+def set_replica_pool(pool: Optional[ReplicaPool]):
+    """테스트 / 다른 레플리카로 교체할 때"""
+    global _replica_pool, _replica_loaded
+    with _replica_lock:
+        _replica_pool = pool
+        _replica_loaded = True
+
+
+class RoutingSession(Session):
+    """
+    읽기용 세션: 문장마다 엔진 선택
+    - 쓰기(INSERT/UPDATE/DELETE, flush) / 같은 요청에서 이미 쓰기가 있었으면 → primary
+    - 나머지 읽기 → 세션을 만들 때 고른 레플리카 (그 사이 죽었으면 primary)
+    - 레플리카 읽기가 연결 오류로 실패하면 (handle_error 가 레플리카를 내림) primary 로 한 번 재시도
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        pool = get_replica_pool()
+        self._replica = pool.pick() if pool else None
+        self._last_bind = None
+        self._wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        self._last_bind = self._route(clause)
+        return self._last_bind
+
+    def _route(self, clause):
+        if self._replica is None or wrote_in_request():
+            return engine
+        if (self._flushing or isinstance(clause, UpdateBase)
+                or (isinstance(clause, TextClause) and _is_write_sql(clause.text))):
+            self._wrote = True
+            return engine
+        pool = get_replica_pool()
+        if pool is None or not pool.is_up(self._replica):
+            return engine
+        return self._replica
+
+    def execute(self, *args, **kwargs):
+        try:
+            return super().execute(*args, **kwargs)
+        except (DBAPIError, DisconnectionError):
+            if not self._can_retry_on_primary():
+                raise
+        # 실패한 레플리카 연결은 무효 상태 → 트랜잭션을 비우고 primary 로 (읽기만 한 세션이라 잃을 것 없음)
+        print("⚠️ 레플리카 읽기 실패 → primary 로 재시도")
+        self.rollback()
+        return super().execute(*args, **kwargs)
+
+    def _can_retry_on_primary(self) -> bool:
+        if self._replica is None or self._last_bind is not self._replica:
+            return False
+        if self._wrote or self.new or self.dirty or self.deleted:
+            return False
+        pool = get_replica_pool()
+        # 연결 실패 / 끊김만 (ReplicaPool._watch 가 내림) — 쿼리 자체 오류는 primary 에서도 실패하므로 그대로
+        return pool is not None and not pool.is_up(self._replica)
+
+
+ReadSessionLocal = sessionmaker(bind=engine, class_=RoutingSession, autocommit=False, autoflush=False)
+
+# ✅ 읽기 전용 엔드포인트용 세션 의존성 (레플리카 우선)
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# ---------------------------------------------------------
+# 비동기 엔진 (싱글톤)
+# ---------------------------------------------------------
+_async_engine = None
+_async_sessionmaker = None
+_async_lock = threading.Lock()
+
+
+def get_async_engine():
+    global _async_engine
+    with _async_lock:
+        if _async_engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+            _async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True, echo=True,
+                                                **pool_options())
+            _track_writes(_async_engine.sync_engine)
+        return _async_engine
+
+
+def get_async_sessionmaker():
+    global _async_sessionmaker
+    engine_ = get_async_engine()
+    with _async_lock:
+        if _async_sessionmaker is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker
+            # commit 후에도 객체 속성을 바로 읽을 수 있게 (비동기에서는 지연 로딩 불가)
+            _async_sessionmaker = async_sessionmaker(bind=engine_, autoflush=False, expire_on_commit=False)
+        return _async_sessionmaker
+
+
+def set_async_engine(engine_):
+    """테스트 / 다른 DB 로 교체할 때 (세션 팩토리도 새로 만듦)"""
+    global _async_engine, _async_sessionmaker
+    with _async_lock:
+        _async_engine = engine_
+        _async_sessionmaker = None
+    _track_writes(engine_.sync_engine)
+
+
+async def dispose_async_engine():
+    global _async_engine, _async_sessionmaker
+    with _async_lock:
+        engine_, _async_engine, _async_sessionmaker = _async_engine, None, None
+    if engine_ is not None:
+        await engine_.dispose()
+
+
+# ✅ async def 엔드포인트용 세션 의존성
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
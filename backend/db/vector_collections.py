@@ -0,0 +1,252 @@
+# backend/db/vector_collections.py
+"""
+벡터 인덱스 컬렉션 레지스트리
+- 코퍼스별로 인덱스 디렉터리를 따로 둠 → FAQ / 법령 PDF 색인이 서로 덮어쓰지 않음
+  faq  : comp_faq (db/ingest_faq_to_faiss.py, index writer 가 증분 반영)
+  laws : 법령 PDF (db/ingest_langchain_faiss.py)
+- 컬렉션마다 임베딩 모델 / 정규화 여부가 다를 수 있음 (collection_embedding)
+  → 색인 스크립트와 검색(rag_engine)이 같은 값을 써야 함, 질의 벡터도 컬렉션의 공간에 맞춰 따로 만듦
+- 버전 디렉터리 + 포인터 파일로 교체 (publish_version)
+  <dir>/versions/<버전>/index.faiss, <dir>/CURRENT = 현재 버전 이름
+  → 포인터 파일만 os.replace 로 바꾸므로 읽는 쪽은 항상 완성된 인덱스 하나를 봄 (resolve_index_dir)
+  → CURRENT 가 없으면 예전 방식(<dir>/index.faiss) 그대로 읽음
+- 쓰기는 프로세스 간 잠금(CollectionLock, <dir>.lock 파일) 안에서만 (API 의 index writer / CLI 재색인이 겹치지 않음)
+- "faq/<domain>" 처럼 하위 이름을 쓰면 같은 faq 인덱스를 comp_domain 으로 필터링해서 검색
+  (FAQ 인덱스는 qa_id 단위 증분 반영/정합성 점검이 한 인덱스 기준이라 도메인별로 파일을 나누지 않음)
+
+.env (선택):
+  VSTORE_ROOT=backend/db/vector_store        # 컬렉션 기본 위치 (<root>/collections/<name>)
+  VSTORE_DIR=...                             # faq 컬렉션 경로 (기존 설정 호환)
+  VSTORE_DIR_LAWS=...                        # 컬렉션별 경로 지정: VSTORE_DIR_<NAME>
+  EMBED_MODEL=BM-K/KoSimCSE-roberta          # faq 컬렉션 임베딩 모델 (기존 설정 호환)
+  EMBED_MODEL_LAWS=...                       # 컬렉션별 임베딩 모델: EMBED_MODEL_<NAME>
+  EMBED_NORMALIZE_LAWS=1                     # 컬렉션별 정규화 여부: EMBED_NORMALIZE_<NAME>
+  (모델 / 정규화를 바꾸면 해당 컬렉션은 다시 색인해야 함)
+"""
+
+import os
+import time
+import uuid
+import shutil
+import threading
+from typing import List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+COLLECTION_FAQ = "faq"
+COLLECTION_LAWS = "laws"
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(__file__), "vector_store")
+
+# 컬렉션별 기본 임베딩: (모델, normalize_embeddings)
+DEFAULT_EMBEDDINGS = {
+    COLLECTION_FAQ: ("BM-K/KoSimCSE-roberta", False),
+    COLLECTION_LAWS: ("BM-K/KoSimCSE-roberta-multitask", True),
+}
+
+
+def get_vstore_root() -> str:
+    return os.getenv("VSTORE_ROOT", DEFAULT_ROOT)
+
+
+def parse_collection(name: str) -> Tuple[str, Optional[dict]]:
+    """'faq/<domain>' → ('faq', {'comp_domain': domain}), 'laws' → ('laws', None)"""
+    base, _, sub = name.strip().partition("/")
+    if sub and base == COLLECTION_FAQ:
+        return base, {"comp_domain": sub}
+    if sub:
+        raise ValueError(f"하위 이름을 지원하지 않는 컬렉션입니다: {name}")
+    return base, None
+
+
+def collection_dir(name: str) -> str:
+    """컬렉션 인덱스 디렉터리 (index.faiss / index.pkl 위치)"""
+    base, _ = parse_collection(name)
+    override = os.getenv(f"VSTORE_DIR_{base.upper()}")
+    if override:
+        return override
+    if base == COLLECTION_FAQ and os.getenv("VSTORE_DIR"):
+        return os.environ["VSTORE_DIR"]
+    return os.path.join(get_vstore_root(), "collections", base)
+
+
+def collection_embedding(name: str) -> Tuple[str, bool]:
+    """컬렉션 인덱스를 만든 임베딩 (모델, 정규화 여부) — 같은 값이면 같은 벡터 공간"""
+    base, _ = parse_collection(name)
+    model, normalize = DEFAULT_EMBEDDINGS.get(base, DEFAULT_EMBEDDINGS[COLLECTION_FAQ])
+    model = os.getenv(f"EMBED_MODEL_{base.upper()}") or (
+        os.getenv("EMBED_MODEL", model) if base == COLLECTION_FAQ else model)
+    flag = os.getenv(f"EMBED_NORMALIZE_{base.upper()}")
+    if flag is not None:
+        normalize = flag.strip().lower() in ("1", "true", "yes", "on")
+    return model, normalize
+
+
+def embedding_cache_key(model: str, normalize: bool) -> str:
+    """임베딩 캐시 키 (정규화 여부에 따라 벡터가 다르므로 키에 포함)"""
+    return f"{model}|normalized" if normalize else model
+
+
+POINTER_NAME = "CURRENT"
+VERSIONS_DIR = "versions"
+
+
+def resolve_index_dir(path: str) -> str:
+    """컬렉션 디렉터리 → 실제 인덱스 파일이 있는 디렉터리 (포인터가 없으면 그대로)"""
+    try:
+        with open(os.path.join(path, POINTER_NAME), "r", encoding="utf-8") as f:
+            version = f.read().strip()
+    except OSError:
+        return path
+    version_dir = os.path.join(path, VERSIONS_DIR, version)
+    return version_dir if version and os.path.isdir(version_dir) else path
+
+
+def index_dir(name: str) -> str:
+    return resolve_index_dir(collection_dir(name))
+
+
+def new_version_dir(path: str) -> str:
+    """새 버전 디렉터리 경로 (아직 만들지 않음, 이름은 시간순 정렬 가능)"""
+    return os.path.join(path, VERSIONS_DIR, f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}")
+
+
+LEGACY_FILES = ("index.faiss", "index.pkl", "manifest.json", "files_manifest.json")
+
+
+def publish_version(path: str, version_dir: str):
+    """
+    포인터 파일을 새 버전으로 원자적으로 교체 (CollectionLock 안에서 호출)
+    - 직전 버전은 남겨 둠 (교체 직전에 포인터를 읽은 쪽이 아직 로드 중일 수 있음)
+    - 그 밖의 버전(중간에 죽은 작성자가 남긴 것 포함) / 예전 방식 파일은 정리
+    """
+    previous = resolve_index_dir(path)
+    tmp = os.path.join(path, POINTER_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(os.path.basename(version_dir))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(path, POINTER_NAME))
+
+    keep = {os.path.basename(version_dir)}
+    if previous != path:
+        keep.add(os.path.basename(previous))
+    versions = os.path.join(path, VERSIONS_DIR)
+    for entry in os.listdir(versions):
+        if entry not in keep:
+            shutil.rmtree(os.path.join(versions, entry), ignore_errors=True)
+    if previous == path:
+        # 예전 방식에서 처음 전환 (한 번뿐): 디렉터리 바로 아래 인덱스 파일 정리
+        for entry in LEGACY_FILES:
+            try:
+                os.remove(os.path.join(path, entry))
+            except FileNotFoundError:
+                pass
+
+
+class CollectionLock:
+    """
+    컬렉션 쓰기 잠금: 프로세스 간(<dir>.lock 파일 잠금) + 같은 프로세스 안에서는 재진입 가능
+    with lock: 로 사용 (load → 수정 → publish 를 통째로 감쌈)
+    """
+
+    def __init__(self, path):
+        # path: 컬렉션 디렉터리 또는 그걸 돌려주는 함수 (.env 로드 뒤에 정해지는 경우)
+        self._path = path
+        self.path = None
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._rlock.acquire()
+        try:
+            if self._depth == 0:
+                self.path = (self._path() if callable(self._path) else self._path) + ".lock"
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                f = open(self.path, "a+")
+                try:
+                    _lock_file(f)
+                except BaseException:
+                    f.close()
+                    raise
+                self._file = f
+            self._depth += 1
+        except BaseException:
+            self._rlock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self._depth -= 1
+            if self._depth == 0:
+                f, self._file = self._file, None
+                try:
+                    _unlock_file(f)
+                finally:
+                    f.close()
+        finally:
+            self._rlock.release()
+        return False
+
+
+def _lock_file(f):
+    """다른 프로세스가 잡고 있으면 풀릴 때까지 기다림"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # 10초 기다리다 OSError
+            return
+        except OSError:
+            continue
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return
+    f.seek(0)
+    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def collection_exists(name: str) -> bool:
+    return os.path.exists(os.path.join(index_dir(name), "index.faiss"))
+
+
+def list_collections() -> List[str]:
+    """인덱스가 만들어져 있는 컬렉션 이름 목록"""
+    names = {COLLECTION_FAQ, COLLECTION_LAWS}
+    root = os.path.join(get_vstore_root(), "collections")
+    if os.path.isdir(root):
+        names.update(os.listdir(root))
+    return sorted(n for n in names if collection_exists(n))
+
+
+class UnknownCollectionError(ValueError):
+    """요청에서 받은 컬렉션 이름이 등록된 컬렉션이 아님"""
+
+
+def check_collections(names: List[str]) -> List[str]:
+    """
+    클라이언트가 고른 컬렉션 이름 검사 — 경로 / 환경 변수(VSTORE_DIR_<NAME> 등)를 찾기 전에 호출
+    - faq, faq/<domain>, laws 또는 <root>/collections 아래에 인덱스가 있는 이름만 허용
+    - 그 밖의 이름("../x" 등)은 UnknownCollectionError
+    """
+    known = None
+    for name in names:
+        base, _, sub = name.strip().partition("/")
+        if base == COLLECTION_FAQ or (base == COLLECTION_LAWS and not sub):
+            continue
+        if known is None:
+            known = set(list_collections())
+        if sub or base not in known:
+            raise UnknownCollectionError(f"알 수 없는 컬렉션입니다: {name}")
+    return names
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import os
+import threading
 import traceback
 from typing import List, Optional
 import subprocess
@@ -20,10 +21,10 @@ from api import faq
 from api import files
 
 # DB 연결, 모델 임포트
-from db.session import Base, engine, SessionLocal  # SessionLocal이 있다면 가져와서 헬스체크에 사용
-from models import company, user  # noqa: F401 (테이블 선언 보장)
+from db.session import Base, engine, SessionLocal, DBRoutingMiddleware, get_replica_pool  # SessionLocal이 있다면 가져와서 헬스체크에 사용
+from models import company, user, document  # noqa: F401 (테이블 선언 보장)
 from api import chat  # 기존 라우터 (prefix 가 /api/chat 인지 확인)
-from api import auth, checklist, user, main_faq, faq_files
+from api import auth, checklist, user, main_faq, faq_files, jobs
 
 # 라우터 관련 임포트
 from api import faq_top as faq_routes
@@ -46,6 +47,9 @@ allow_origins: List[str] = (
     [o.strip() for o in _env_origins.split(",")] if _env_origins else ["*"]
 )
 
+# 요청 안에서 쓰기가 있었는지 추적 → 그 뒤 읽기는 레플리카 대신 primary (db/session.py)
+app.add_middleware(DBRoutingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allow_origins,
@@ -75,6 +79,40 @@ app.include_router(faq_routes.router)
 app.include_router(faq_extract.router)
 app.include_router(main_faq.router)
 app.include_router(faq_files.router) 
+app.include_router(jobs.router)
+
+# ------------------------------------------------------------------------------
+# 작업 큐 워커 기동 (JOB_EMBEDDED_WORKERS, 별도 워커를 쓰면 빈 값으로)
+# + 시작 시 남아있는 FAISS 삭제 저널을 index 큐로 재적용
+# ------------------------------------------------------------------------------
+@app.on_event("startup")
+def start_job_workers():
+    from services.job_worker import start_embedded_workers
+    start_embedded_workers()
+
+    from db.ingest_faq_to_faiss import has_pending_deletions, resolve_prepared_deletions
+    from db.index_writer import enqueue_upsert
+
+    def _replay():
+        if has_pending_deletions():
+            resolve_prepared_deletions()
+            enqueue_upsert([])  # 빈 배치 → writer 가 저널의 삭제 작업만 반영
+    threading.Thread(target=_replay, daemon=True).start()
+
+    # 문서 레지스트리가 생기기 전의 FAQ 출처(sc_file)를 등록 (이미 있는 것은 건너뜀)
+    from services.document_registry import backfill_from_faqs
+
+    def _backfill():
+        db = SessionLocal()
+        try:
+            added = backfill_from_faqs(db)
+            if added:
+                print(f"📄 문서 레지스트리에 기존 파일 {added}개 등록")
+        except Exception as e:
+            print("⚠️ 문서 레지스트리 채우기 실패:", e)
+        finally:
+            db.close()
+    threading.Thread(target=_backfill, daemon=True).start()
 
 # ------------------------------------------------------------------------------
 # 기본/헬스체크/버전 엔드포인트
@@ -101,7 +139,8 @@ def health():
             "error": type(e).__name__,
             "detail": str(e),
         }
-    return {"status": "ok", "db": db_ok}
+    pool = get_replica_pool()
+    return {"status": "ok", "db": db_ok, "replicas": pool.stats() if pool else None}
 
 @app.get("/version", tags=["system"])
 def version():
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, BigInteger, String, TIMESTAMP, ForeignKey, Index, UniqueConstraint, func
+from sqlalchemy.orm import relationship
+from db.session import Base
+from models.company import Company
+
+class CompDocument(Base):
+    """회사별 업로드 문서 목록 (업로드 / 추출 / 삭제 때 갱신, services/document_registry.py)"""
+    __tablename__ = "comp_document"
+
+    doc_id      = Column(Integer, primary_key=True, autoincrement=True)          # 문서 ID (PK)
+    comp_domain = Column(String(255), ForeignKey("t_company.comp_domain"), nullable=False)
+    file_name   = Column(String(255), nullable=False)                            # 원래 파일명 (= comp_faq.sc_file)
+    file_id     = Column(String(64), nullable=True)                              # 내용 sha256 (예전 파일은 없음)
+    stored_path = Column(String(512), nullable=True)                             # 저장 경로
+    size        = Column(BigInteger, nullable=True)                              # 바이트
+    pages       = Column(Integer, nullable=True)                                 # 페이지 수 (추출 후)
+    status      = Column(String(20), nullable=False, default="uploaded")         # uploaded / extracting / extracted / saved / failed
+    faq_count   = Column(Integer, nullable=False, default=0)                     # 저장된 FAQ 수
+    error       = Column(String(1000), nullable=True)                            # 마지막 추출 오류
+    created_at  = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    updated_at  = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
+    company = relationship("Company", backref="documents")
+
+    __table_args__ = (
+        UniqueConstraint("comp_domain", "file_name", name="uq_comp_document_name"),
+        Index("ix_comp_document_file", "comp_domain", "file_id"),
+        Index("ix_comp_document_created", "comp_domain", "created_at"),
+        Index("ix_comp_document_file_id", "file_id"),
+    )
@@ -0,0 +1,192 @@
+# backend/services/document_registry.py
+"""
+업로드 문서 레지스트리 (comp_document 테이블)
+- 업로드 / 추출 / 저장 / 삭제 때 갱신 → 문서 목록·조회가 인덱스 한 번으로 끝남
+  · 목록: (comp_domain, created_at) 범위 조회 (comp_faq.sc_file GROUP BY 대신)
+  · file_id → 저장 경로: file_id 인덱스 조회 (업로드 디렉터리 glob 대신)
+- FAQ 가 아직 없는 문서도 목록에 보임 (status / faq_count 로 구분)
+- 테이블이 생기기 전부터 있던 FAQ 출처(sc_file)는 서버 시작 때 backfill_from_faqs 로 채움
+"""
+
+from typing import Iterable, List, Optional
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.document import CompDocument
+from models.faq import CompFAQ
+
+UPLOADED = "uploaded"
+EXTRACTING = "extracting"
+EXTRACTED = "extracted"
+SAVED = "saved"
+FAILED = "failed"
+
+
+def to_dict(doc: CompDocument) -> dict:
+    return {
+        "doc_id": doc.doc_id,
+        "file_id": doc.file_id or doc.file_name,
+        "filename": doc.file_name,
+        "size": doc.size,
+        "pages": doc.pages,
+        "status": doc.status,
+        "faq_count": doc.faq_count,
+        "error": doc.error,
+        "created_at": doc.created_at.isoformat() if doc.created_at else None,
+        "updated_at": doc.updated_at.isoformat() if doc.updated_at else None,
+    }
+
+
+# ---------------------------------------------------------
+# 갱신
+# ---------------------------------------------------------
+def register_upload(db: Session, comp_domain: str, saved: dict) -> CompDocument:
+    """
+    업로드 결과(services/upload_store 의 반환값) 등록
+    같은 회사에 같은 파일명이 있으면 새 내용으로 교체 (내용이 바뀌었으면 상태도 uploaded 로)
+    """
+    name = saved.get("filename") or saved["file_id"]
+    for _ in range(2):
+        doc = db.scalars(select(CompDocument).where(
+            CompDocument.comp_domain == comp_domain, CompDocument.file_name == name)).first()
+        if doc is None:
+            doc = CompDocument(comp_domain=comp_domain, file_name=name, status=UPLOADED, faq_count=0)
+            db.add(doc)
+        elif doc.file_id != saved["sha256"]:
+            doc.status = UPLOADED
+            doc.pages = None
+            doc.error = None
+        doc.file_id = saved["sha256"]
+        doc.stored_path = saved["path"]
+        doc.size = saved["size"]
+        try:
+            db.commit()
+            return doc
+        except IntegrityError:
+            # 같은 이름을 동시에 올린 경우 → 먼저 들어간 행을 갱신
+            db.rollback()
+    raise RuntimeError(f"문서 등록 실패: {comp_domain}/{name}")
+
+
+def set_status(db: Session, comp_domain: str, file_name: str, status: str,
+               pages: Optional[int] = None, error: Optional[str] = None):
+    values = {"status": status, "error": error[:1000] if error else None}
+    if pages is not None:
+        values["pages"] = pages
+    db.execute(update(CompDocument)
+               .where(CompDocument.comp_domain == comp_domain, CompDocument.file_name == file_name)
+               .values(**values))
+    db.commit()
+
+
+def refresh_faq_counts(db: Session, comp_domain: str, file_names: Iterable[str], create: bool = False):
+    """
+    문서별 저장된 FAQ 수 다시 계산 (저장/삭제 직후 호출)
+    create: 레지스트리에 없는 출처면 새로 등록 (CLI 로 직접 넣은 파일 등)
+    """
+    names = sorted({n for n in file_names if n})
+    if not names:
+        return
+    counts = dict(db.execute(
+        select(CompFAQ.sc_file, func.count())
+        .where(CompFAQ.comp_domain == comp_domain, CompFAQ.sc_file.in_(names))
+        .group_by(CompFAQ.sc_file)
+    ).all())
+    docs = {d.file_name: d for d in db.scalars(select(CompDocument).where(
+        CompDocument.comp_domain == comp_domain, CompDocument.file_name.in_(names)))}
+    for name in names:
+        doc = docs.get(name)
+        if doc is None:
+            if not create or not counts.get(name):
+                continue
+            doc = CompDocument(comp_domain=comp_domain, file_name=name, status=SAVED)
+            db.add(doc)
+        doc.faq_count = counts.get(name, 0)
+        if doc.faq_count and doc.status != SAVED:
+            doc.status = SAVED
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+
+
+def delete_documents(db: Session, file_name: str, comp_domain: Optional[str] = None) -> List[CompDocument]:
+    """
+    파일명으로 문서 삭제 (comp_domain 없으면 모든 회사), 삭제한 행 반환
+    commit 하지 않음 → 호출 측에서 FAQ 삭제와 같은 트랜잭션으로 commit / rollback
+    """
+    cond = [CompDocument.file_name == file_name]
+    if comp_domain is not None:
+        cond.append(CompDocument.comp_domain == comp_domain)
+    docs = list(db.scalars(select(CompDocument).where(*cond)))
+    if docs:
+        db.execute(delete(CompDocument).where(*cond))
+    return docs
+
+
+# ---------------------------------------------------------
+# 조회 (모두 인덱스 조회)
+# ---------------------------------------------------------
+def list_documents(db: Session, comp_domain: str, limit: Optional[int] = None,
+                   offset: int = 0) -> List[CompDocument]:
+    stmt = (select(CompDocument)
+            .where(CompDocument.comp_domain == comp_domain)
+            .order_by(CompDocument.created_at.desc(), CompDocument.doc_id.desc())
+            .offset(offset))
+    if limit:
+        stmt = stmt.limit(limit)
+    return list(db.scalars(stmt))
+
+
+def find_document(db: Session, file_id: str, comp_domain: Optional[str] = None) -> Optional[CompDocument]:
+    """file_id(sha256) 또는 예전 방식 file_id(파일명) → 문서 (같은 내용이 여러 이름이면 최근 것)"""
+    if not file_id:
+        return None
+    for col in (CompDocument.file_id, CompDocument.file_name):
+        stmt = select(CompDocument).where(col == file_id)
+        if comp_domain is not None:
+            stmt = stmt.where(CompDocument.comp_domain == comp_domain)
+        doc = db.scalars(stmt.order_by(CompDocument.updated_at.desc()).limit(1)).first()
+        if doc is not None:
+            return doc
+    return None
+
+
+def source_name(db: Session, comp_domain: str, value: Optional[str]) -> Optional[str]:
+    """FAQ 출처 값이 업로드 file_id 면 원래 파일명으로, 아니면 그대로"""
+    if not value:
+        return value
+    doc = find_document(db, value, comp_domain)
+    return doc.file_name if doc is not None else value
+
+
+# ---------------------------------------------------------
+# 기존 데이터 채우기
+# ---------------------------------------------------------
+def backfill_from_faqs(db: Session) -> int:
+    """comp_faq 에만 있는 출처(sc_file)를 레지스트리에 등록 (이미 있으면 건너뜀), 추가한 수 반환"""
+    from services.upload_store import find_upload
+
+    have = set(db.execute(select(CompDocument.comp_domain, CompDocument.file_name)).all())
+    rows = db.execute(
+        select(CompFAQ.comp_domain, CompFAQ.sc_file, func.count())
+        .where(CompFAQ.comp_domain.is_not(None), CompFAQ.sc_file.is_not(None), CompFAQ.sc_file != "")
+        .group_by(CompFAQ.comp_domain, CompFAQ.sc_file)
+    ).all()
+    added = 0
+    for comp_domain, name, n in rows:
+        if (comp_domain, name) in have:
+            continue
+        path = find_upload(name)
+        db.add(CompDocument(
+            comp_domain=comp_domain, file_name=name, status=SAVED, faq_count=n,
+            stored_path=str(path) if path else None,
+            size=path.stat().st_size if path else None,
+        ))
+        added += 1
+    if added:
+        db.commit()
+    return added
+
@@ -0,0 +1,130 @@
+# backend/services/extract_checkpoint.py
+"""
+대량 FAQ 추출 체크포인트 (로컬 SQLite)
+- 파일 단위: 파일 내용 해시(sha256) 기준 상태 (running / done / failed) + 저장 행 수, 통계, 오류
+- 프롬프트(섹션 묶음) 단위: LLM 응답을 파싱한 Q/A 목록
+  → 중간에 죽어도 다시 실행하면 끝난 파일은 건너뛰고, 진행 중이던 파일은 끝난 섹션부터 이어감
+- 파일 이름이 바뀌어도 내용이 같으면 같은 체크포인트를 씀
+"""
+
+import os
+import json
+import time
+import sqlite3
+from contextlib import closing
+from typing import Dict, List, Optional
+
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    sha256     TEXT PRIMARY KEY,
+    path       TEXT NOT NULL,
+    status     TEXT NOT NULL,
+    rows       INTEGER,
+    stats      TEXT,
+    error      TEXT,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS packs (
+    sha256     TEXT NOT NULL,
+    pack_key   TEXT NOT NULL,
+    items      TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (sha256, pack_key)
+);
+"""
+
+
+class ExtractCheckpoint:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ---------------- 파일 ----------------
+
+    def file_status(self, sha256: str) -> Optional[dict]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM files WHERE sha256 = ?", (sha256,)).fetchone()
+        if row is None:
+            return None
+        out = dict(row)
+        out["stats"] = json.loads(out["stats"]) if out["stats"] else None
+        return out
+
+    def start_file(self, sha256: str, path: str):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO files (sha256, path, status, attempts, updated_at) VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT(sha256) DO UPDATE SET path = excluded.path, status = excluded.status, "
+                "error = NULL, attempts = attempts + 1, updated_at = excluded.updated_at",
+                (sha256, path, RUNNING, time.time()),
+            )
+
+    def finish_file(self, sha256: str, rows: int, stats: Optional[dict] = None):
+        """저장까지 끝난 파일 → 묶음 체크포인트는 더 필요 없으므로 삭제"""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            conn.execute(
+                "UPDATE files SET status = ?, rows = ?, stats = ?, error = NULL, updated_at = ? WHERE sha256 = ?",
+                (DONE, rows, json.dumps(stats or {}, ensure_ascii=False), time.time(), sha256),
+            )
+            conn.execute("DELETE FROM packs WHERE sha256 = ?", (sha256,))
+            conn.execute("COMMIT")
+
+    def fail_file(self, sha256: str, error: str):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE files SET status = ?, error = ?, updated_at = ? WHERE sha256 = ?",
+                (FAILED, error[:2000], time.time(), sha256),
+            )
+
+    # ---------------- 섹션 묶음 ----------------
+
+    def get_pack(self, sha256: str, pack_key: str) -> Optional[List[Dict]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT items FROM packs WHERE sha256 = ? AND pack_key = ?", (sha256, pack_key)
+            ).fetchone()
+        return json.loads(row["items"]) if row else None
+
+    def put_pack(self, sha256: str, pack_key: str, items: List[Dict]):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO packs (sha256, pack_key, items, created_at) VALUES (?, ?, ?, ?)",
+                (sha256, pack_key, json.dumps(items, ensure_ascii=False), time.time()),
+            )
+
+    def for_file(self, sha256: str) -> "FileCheckpoint":
+        return FileCheckpoint(self, sha256)
+
+    def counts(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            return {r["status"]: r["n"] for r in
+                    conn.execute("SELECT status, COUNT(*) AS n FROM files GROUP BY status")}
+
+
+class FileCheckpoint:
+    """파일 하나에 묶인 get/put (faq_from_pdf 에 넘기는 용도)"""
+
+    def __init__(self, store: ExtractCheckpoint, sha256: str):
+        self.store = store
+        self.sha256 = sha256
+
+    def get(self, pack_key: str) -> Optional[List[Dict]]:
+        return self.store.get_pack(self.sha256, pack_key)
+
+    def put(self, pack_key: str, items: List[Dict]):
+        self.store.put_pack(self.sha256, pack_key, items)
@@ -0,0 +1,287 @@
+# backend/services/job_queue.py
+"""
+로컬 SQLite 기반 영속 작업 큐
+- enqueue → lease(임대, heartbeat 로 연장) → complete / fail
+- 실패 시 지수 백오프로 재시도, max_attempts 초과 시 dead(dead-letter)
+- 임대 시간이 지난 running 작업은 다른 워커가 다시 가져감 (워커가 죽은 경우)
+- exclusive 큐(index 등)는 동시에 한 워커만 임대 가능 → 단일 writer 보장
+
+.env (선택):
+  JOB_DB_PATH=backend/db/jobs.sqlite3
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+from contextlib import closing
+from typing import Iterable, List, Optional
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "db", "jobs.sqlite3")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+
+DEFAULT_LEASE_SECONDS = 60
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE = 2.0      # 초
+BACKOFF_MAX = 300.0     # 초
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id       TEXT PRIMARY KEY,
+    queue        TEXT NOT NULL,
+    kind         TEXT NOT NULL,
+    payload      TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after    REAL NOT NULL,
+    lease_until  REAL,
+    worker_id    TEXT,
+    last_error   TEXT,
+    result       TEXT,
+    progress     TEXT,
+    created_at   REAL NOT NULL,
+    updated_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_pick ON jobs(queue, status, run_after);
+"""
+
+
+def _row_to_job(row: sqlite3.Row) -> dict:
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"]) if job["payload"] else {}
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    job["progress"] = json.loads(job["progress"]) if job.get("progress") else None
+    return job
+
+
+class JobQueue:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("JOB_DB_PATH", DEFAULT_DB_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # 이전 버전 DB 에는 progress 컬럼이 없음
+            cols = {r["name"] for r in conn.execute("PRAGMA table_info(jobs)")}
+            if "progress" not in cols:
+                conn.execute("ALTER TABLE jobs ADD COLUMN progress TEXT")
+
+    def _connect(self) -> sqlite3.Connection:
+        # 호출마다 새 연결 (스레드/프로세스 간 공유 안 함), 트랜잭션은 직접 제어
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    # ---------------- producer ----------------
+
+    def enqueue(self, kind: str, payload: Optional[dict] = None, queue: str = "default",
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS, delay: float = 0.0) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, queue, kind, payload, status, attempts, max_attempts, "
+                "run_after, created_at, updated_at) VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?, ?)",
+                (job_id, queue, kind, json.dumps(payload or {}, ensure_ascii=False),
+                 QUEUED, max_attempts, now + delay, now, now),
+            )
+        return job_id
+
+    # ---------------- consumer ----------------
+
+    def lease(self, queues: Iterable[str], worker_id: str, limit: int = 1,
+              lease_seconds: float = DEFAULT_LEASE_SECONDS, exclusive: bool = False) -> List[dict]:
+        """
+        실행 가능한 작업을 최대 limit 개 임대.
+        exclusive=True 면 해당 큐에 살아있는 임대가 있을 때 아무것도 가져가지 않음.
+        """
+        queues = list(queues)
+        marks = ",".join("?" * len(queues))
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if exclusive:
+                busy = conn.execute(
+                    f"SELECT 1 FROM jobs WHERE queue IN ({marks}) AND status = ? "
+                    "AND lease_until > ? AND worker_id != ? LIMIT 1",
+                    (*queues, RUNNING, now, worker_id),
+                ).fetchone()
+                if busy:
+                    conn.execute("COMMIT")
+                    return []
+            # 워커가 죽어 임대가 만료됐고 재시도 횟수도 다 쓴 작업은 dead 처리
+            conn.execute(
+                f"UPDATE jobs SET status = ?, lease_until = NULL, updated_at = ?, "
+                "last_error = COALESCE(last_error, 'lease expired') "
+                f"WHERE queue IN ({marks}) AND status = ? AND lease_until <= ? AND attempts >= max_attempts",
+                (DEAD, now, *queues, RUNNING, now),
+            )
+            rows = conn.execute(
+                f"SELECT * FROM jobs WHERE queue IN ({marks}) AND "
+                "((status = ? AND run_after <= ?) OR (status = ? AND lease_until <= ?)) "
+                "ORDER BY run_after, created_at LIMIT ?",
+                (*queues, QUEUED, now, RUNNING, now, limit),
+            ).fetchall()
+            jobs = []
+            for row in rows:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker_id = ?, lease_until = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                    (RUNNING, worker_id, now + lease_seconds, now, row["job_id"]),
+                )
+                job = _row_to_job(row)
+                job["attempts"] += 1
+                job["status"] = RUNNING
+                jobs.append(job)
+            conn.execute("COMMIT")
+            return jobs
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_ids: Iterable[str], worker_id: str,
+                  lease_seconds: float = DEFAULT_LEASE_SECONDS) -> int:
+        """임대 연장. 이미 다른 워커에게 넘어간 작업은 갱신되지 않음."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cur = conn.executemany(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? "
+                "WHERE job_id = ? AND worker_id = ? AND status = ?",
+                [(now + lease_seconds, now, jid, worker_id, RUNNING) for jid in job_ids],
+            )
+            return cur.rowcount
+
+    def set_progress(self, job_id: str, worker_id: str, progress: dict) -> bool:
+        """실행 중인 작업의 진행 상황 기록 (임대한 워커만 갱신 가능)"""
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET progress = ?, updated_at = ? WHERE job_id = ? AND worker_id = ? AND status = ?",
+                (json.dumps(progress, ensure_ascii=False), time.time(), job_id, worker_id, RUNNING),
+            )
+            return cur.rowcount > 0
+
+    def complete(self, job_id: str, worker_id: str, result=None) -> bool:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, lease_until = NULL, last_error = NULL, "
+                "updated_at = ? WHERE job_id = ? AND worker_id = ? AND status = ?",
+                (DONE, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 now, job_id, worker_id, RUNNING),
+            )
+            return cur.rowcount > 0
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> str:
+        """재시도 가능하면 백오프 후 queued, 아니면 dead. 바뀐 상태를 반환."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE job_id = ? AND worker_id = ? AND status = ?",
+                (job_id, worker_id, RUNNING),
+            ).fetchone()
+            if not row:
+                conn.execute("COMMIT")
+                return ""
+            if row["attempts"] >= row["max_attempts"]:
+                status, run_after = DEAD, now
+            else:
+                status = QUEUED
+                run_after = now + min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (row["attempts"] - 1)))
+            conn.execute(
+                "UPDATE jobs SET status = ?, run_after = ?, lease_until = NULL, last_error = ?, "
+                "updated_at = ? WHERE job_id = ?",
+                (status, run_after, error[:2000], now, job_id),
+            )
+            conn.execute("COMMIT")
+            return status
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    # ---------------- 조회 / 관리 ----------------
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def counts(self, queue: Optional[str] = None) -> dict:
+        sql = "SELECT status, COUNT(*) AS n FROM jobs"
+        args: tuple = ()
+        if queue:
+            sql += " WHERE queue = ?"
+            args = (queue,)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql + " GROUP BY status", args).fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def retry_dead(self, job_id: str) -> bool:
+        """dead-letter 작업을 다시 대기열로"""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, run_after = ?, updated_at = ? "
+                "WHERE job_id = ? AND status = ?",
+                (QUEUED, now, now, job_id, DEAD),
+            )
+            return cur.rowcount > 0
+
+    def purge(self, older_than_seconds: float = 7 * 24 * 3600) -> int:
+        """오래된 done 작업 정리"""
+        cutoff = time.time() - older_than_seconds
+        with closing(self._connect()) as conn:
+            cur = conn.execute("DELETE FROM jobs WHERE status = ? AND updated_at < ?", (DONE, cutoff))
+            return cur.rowcount
+
+
+_QUEUE: Optional[JobQueue] = None
+
+def get_job_queue() -> JobQueue:
+    """프로세스 단위 싱글톤"""
+    global _QUEUE
+    if _QUEUE is None:
+        _QUEUE = JobQueue()
+    return _QUEUE
+
+def public_job(job: dict) -> dict:
+    """API 응답용 (payload 제외)"""
+    return {
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "last_error": job["last_error"],
+        "result": job["result"],
+        "progress": job.get("progress"),
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+async def wait_for_job(job_id: str, timeout: float = 1800.0, interval: float = 1.0) -> Optional[dict]:
+    """
+    작업이 done/dead 가 될 때까지 비동기로 대기 (스레드를 점유하지 않음).
+    timeout 이 지나면 그 시점의 작업 상태를 반환.
+    """
+    import asyncio
+    queue = get_job_queue()
+    deadline = time.monotonic() + timeout
+    while True:
+        job = queue.get(job_id)
+        if job is None or job["status"] in (DONE, DEAD) or time.monotonic() >= deadline:
+            return job
+        await asyncio.sleep(interval)
@@ -0,0 +1,270 @@
+# backend/services/job_worker.py
+"""
+영속 작업 큐(services/job_queue.py) 워커
+- API 프로세스 안에서 스레드로 띄우거나 (JOB_EMBEDDED_WORKERS)
+- 별도 프로세스로 여러 개 띄울 수 있음 (다른 코어/호스트에서 같은 SQLite 파일 사용)
+
+사용 예:
+  python -m services.job_worker --workers 4 --queues extract
+  python -m services.job_worker --index            # 인덱스 writer 만
+  python -m services.job_worker --workers 2 --index
+
+.env (선택):
+  JOB_EMBEDDED_WORKERS=index,extract:2   # API 프로세스 안에서 돌릴 워커 (빈 값이면 끔)
+"""
+
+import os
+import time
+import socket
+import asyncio
+import argparse
+import threading
+import traceback
+import multiprocessing as mp
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from services.job_queue import JobQueue, get_job_queue, DEFAULT_LEASE_SECONDS
+
+EXTRACT_QUEUE = "extract"
+KIND_FAQ_EXTRACT = "faq_extract"
+
+DEFAULT_EMBEDDED = "index,extract"
+
+# ---------------------------------------------------------------------
+# Handlers
+# ---------------------------------------------------------------------
+
+HANDLERS: Dict[str, Callable[[dict, "JobContext"], Any]] = {}
+
+def handler(kind: str):
+    def deco(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return deco
+
+
+PROGRESS_INTERVAL = 0.5   # 진행 상황 기록 최소 간격 (초)
+
+class JobContext:
+    def __init__(self, job: dict, queue: JobQueue, worker_id: str):
+        self.job = job
+        self.queue = queue
+        self.worker_id = worker_id
+        self._last_progress = 0.0
+
+    def progress(self, data: dict, force: bool = False):
+        """진행 상황 기록 (너무 자주 쓰지 않도록 PROGRESS_INTERVAL 간격으로만)"""
+        now = time.monotonic()
+        if not force and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        try:
+            self.queue.set_progress(self.job["job_id"], self.worker_id, data)
+        except Exception as e:
+            # 진행 상황 기록 실패로 작업이 죽지 않도록
+            print(f"[JOB] progress 기록 실패: {e}")
+
+
+def _mark_document(payload: dict, status: str, **kwargs):
+    """문서 레지스트리 상태 갱신 (실패해도 추출은 계속)"""
+    if not payload.get("comp_domain") or not payload.get("source_name"):
+        return
+    from db.session import SessionLocal
+    from services import document_registry
+    db = SessionLocal()
+    try:
+        document_registry.set_status(db, payload["comp_domain"], payload["source_name"], status, **kwargs)
+    except Exception as e:
+        print("⚠️ 문서 상태 갱신 실패:", e)
+    finally:
+        db.close()
+
+@handler(KIND_FAQ_EXTRACT)
+def _faq_extract(payload: dict, ctx: JobContext):
+    """PDF → FAQ 추출 (save=True 면 DB 저장까지)"""
+    from api.main_faq import (
+        faq_from_pdf, save_rows_to_db, DEFAULT_MAX_PER_SECTION, MIN_CONFIDENCE,
+    )
+    from db.session import SessionLocal
+    from services import document_registry
+
+    pdf_path = Path(payload["pdf_path"])
+    if not pdf_path.exists():
+        _mark_document(payload, document_registry.FAILED, error="파일이 없습니다")
+        raise FileNotFoundError(f"파일이 없습니다: {pdf_path}")
+
+    last = {}
+
+    def on_progress(progress: dict, force: bool = False):
+        # faq_from_pdf 는 마지막 진행 상황을 force=True 로 보냄 (간격 제한 무시)
+        last.update(progress)
+        ctx.progress(progress, force=force)
+
+    _mark_document(payload, document_registry.EXTRACTING)
+    try:
+        # LLM 커넥션 풀은 게이트웨이 루프에 있으므로 작업마다 새 루프를 만들어도 재사용됨
+        rows = asyncio.run(faq_from_pdf(
+            pdf_path,
+            max_per_section=payload.get("k", DEFAULT_MAX_PER_SECTION),
+            min_confidence=payload.get("min_conf", MIN_CONFIDENCE),
+            use_cache=payload.get("cache", True),
+            on_progress=on_progress,
+            source_name=payload.get("source_name"),
+        ))
+    except Exception as e:
+        _mark_document(payload, document_registry.FAILED, error=f"{type(e).__name__}: {e}")
+        raise
+    _mark_document(payload, document_registry.EXTRACTED, pages=last.get("pages_total") or None)
+    result = {"count": len(rows), "rows": rows}
+    if payload.get("save"):
+        db = SessionLocal()
+        try:
+            # 회사의 기존 FAQ 와 근접 중복인 질문은 저장하지 않음 (리포트는 결과에 포함)
+            result["dedup"] = save_rows_to_db(rows, comp_domain=payload["comp_domain"], db=db,
+                                              threshold=payload.get("dedup_threshold"))
+        finally:
+            db.close()
+    return result
+
+# ---------------------------------------------------------------------
+# Worker loop
+# ---------------------------------------------------------------------
+
+def make_worker_id(name: str) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{name}"
+
+
+class Worker:
+    def __init__(self, worker_id: str, queues: List[str], queue: Optional[JobQueue] = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        self.worker_id = worker_id
+        self.queues = queues
+        self.queue = queue or get_job_queue()
+        self.lease_seconds = lease_seconds
+
+    def run_once(self) -> bool:
+        jobs = self.queue.lease(self.queues, self.worker_id, limit=1, lease_seconds=self.lease_seconds)
+        if not jobs:
+            return False
+        job = jobs[0]
+        stop = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(job["job_id"], stop), daemon=True)
+        beat.start()
+        try:
+            fn = HANDLERS.get(job["kind"])
+            if fn is None:
+                raise RuntimeError(f"알 수 없는 작업 종류: {job['kind']}")
+            result = fn(job["payload"], JobContext(job, self.queue, self.worker_id))
+            self.queue.complete(job["job_id"], self.worker_id, result)
+        except Exception as e:
+            status = self.queue.fail(job["job_id"], self.worker_id, f"{type(e).__name__}: {e}")
+            print(f"[JOB] {job['kind']} {job['job_id']} 실패 → {status}")
+            traceback.print_exc()
+        finally:
+            stop.set()
+        return True
+
+    def _heartbeat(self, job_id: str, stop: threading.Event):
+        while not stop.wait(self.lease_seconds / 3):
+            self.queue.heartbeat([job_id], self.worker_id, self.lease_seconds)
+
+    def run_forever(self, poll_interval: float = 1.0, stop: Optional[threading.Event] = None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception:
+                # SQLite 잠금 등 일시 오류로 워커가 죽지 않도록
+                traceback.print_exc()
+            stop.wait(poll_interval)
+
+# ---------------------------------------------------------------------
+# API 프로세스 내장 워커
+# ---------------------------------------------------------------------
+
+_EMBEDDED_WRITER = None
+_EMBEDDED_THREADS: List[threading.Thread] = []
+
+def parse_worker_spec(spec: str) -> Dict[str, int]:
+    """'index,extract:2' → {'index': 1, 'extract': 2}"""
+    out: Dict[str, int] = {}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, n = part.partition(":")
+        out[name.strip()] = int(n) if n else 1
+    return out
+
+def start_embedded_workers(spec: Optional[str] = None) -> List[threading.Thread]:
+    """JOB_EMBEDDED_WORKERS 설정대로 데몬 스레드 워커 기동"""
+    global _EMBEDDED_WRITER
+    if _EMBEDDED_THREADS:
+        return _EMBEDDED_THREADS
+    spec = os.getenv("JOB_EMBEDDED_WORKERS", DEFAULT_EMBEDDED) if spec is None else spec
+    for name, n in parse_worker_spec(spec).items():
+        if name == "index":
+            from db.index_writer import IndexWriter
+            _EMBEDDED_WRITER = IndexWriter(make_worker_id("index"))
+            t = threading.Thread(target=_EMBEDDED_WRITER.run_forever, name="job-index", daemon=True)
+            t.start()
+            _EMBEDDED_THREADS.append(t)
+            continue
+        for i in range(n):
+            w = Worker(make_worker_id(f"{name}-{i}"), [name])
+            t = threading.Thread(target=w.run_forever, name=f"job-{name}-{i}", daemon=True)
+            t.start()
+            _EMBEDDED_THREADS.append(t)
+    return _EMBEDDED_THREADS
+
+def get_embedded_index_writer():
+    return _EMBEDDED_WRITER
+
+# ---------------------------------------------------------------------
+# CLI entry (별도 프로세스)
+# ---------------------------------------------------------------------
+
+def _load_env():
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
+
+def _run_worker_process(queues: List[str], idx: int):
+    _load_env()
+    Worker(make_worker_id(f"w{idx}"), queues).run_forever()
+
+def _run_index_process():
+    _load_env()
+    from db.index_writer import IndexWriter
+    IndexWriter(make_worker_id("index")).run_forever()
+
+def main():
+    _load_env()
+    parser = argparse.ArgumentParser(description="Genmind job worker")
+    parser.add_argument("--workers", type=int, default=1, help="일반 작업 워커 프로세스 수")
+    parser.add_argument("--queues", type=str, default=EXTRACT_QUEUE, help="처리할 큐 (쉼표 구분)")
+    parser.add_argument("--index", action="store_true", help="인덱스 writer 도 함께 실행 (단일 writer)")
+    args = parser.parse_args()
+
+    queues = [q.strip() for q in args.queues.split(",") if q.strip()]
+    ctx = mp.get_context("spawn")
+    procs = []
+    if args.index:
+        p = ctx.Process(target=_run_index_process, name="job-index")
+        p.start()
+        procs.append(p)
+    for i in range(args.workers if queues else 0):
+        p = ctx.Process(target=_run_worker_process, args=(queues, i), name=f"job-w{i}")
+        p.start()
+        procs.append(p)
+    print(f"[JOB] {len(procs)} process(es) started: queues={queues}, index={args.index}")
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# backend/services/llm_cache.py
+"""
+LLM 응답 영속 캐시 (SQLite)
+- 키: sha256(모델, temperature, 전체 프롬프트(system 포함), 기타 파라미터)
+- 같은 문서를 analyze → save 하거나 같은 PDF 를 다시 올리면 API 호출 없이 바로 응답
+- 용량 초과 시 오래 안 쓰인 항목부터 제거 (LRU)
+
+.env (선택):
+  LLM_CACHE_PATH=backend/db/llm_cache.sqlite3
+  LLM_CACHE_MAX_MB=256
+  LLM_CACHE_DISABLED=1   # 캐시 끄기
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "db", "llm_cache.sqlite3")
+DEFAULT_MAX_MB = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key       TEXT PRIMARY KEY,
+    model     TEXT NOT NULL,
+    response  TEXT NOT NULL,
+    nbytes    INTEGER NOT NULL,
+    created   REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache(last_used);
+"""
+
+
+def llm_cache_key(model: str, temperature: float, prompt: str, **params) -> str:
+    """prompt 에는 system 메시지까지 포함한 전체 입력을 넣을 것"""
+    raw = json.dumps([model, float(temperature), prompt, params], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """요청 해시 → 응답 텍스트 (SQLite 파일)"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str):
+        now = time.time()
+        nbytes = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, nbytes, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, nbytes, now, now),
+            )
+            self._conn.commit()
+            self._evict_locked()
+
+    def _evict_locked(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 90%까지 줄여서 매번 evict 하지 않도록
+        target = int(self.max_bytes * 0.9)
+        cur = self._conn.execute("SELECT key, nbytes FROM llm_cache ORDER BY last_used ASC")
+        victims = []
+        for key, nbytes in cur:
+            if total <= target:
+                break
+            victims.append((key,))
+            total -= nbytes
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+        self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, nbytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM llm_cache"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "entries": entries,
+            "size_mb": round(nbytes / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+        }
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+
+_CACHE: Optional[LLMCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """프로세스 단위 싱글톤 (LLM_CACHE_DISABLED=1 이면 None)"""
+    global _CACHE
+    if os.getenv("LLM_CACHE_DISABLED", "").strip() in {"1", "true", "yes"}:
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            path = os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+            max_mb = float(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_MB))
+            _CACHE = LLMCache(path, max_bytes=int(max_mb * 1024 * 1024))
+    return _CACHE
@@ -0,0 +1,267 @@
+# backend/services/llm_gateway.py
+"""
+LLM 호출 공용 게이트웨이 (OpenAI Chat Completions 호환)
+- 채팅(rag_engine), FAQ 요약(faq.ask_gpt_for_faq), 섹션 추출(main_faq.call_llm) 이 모두 여기를 거침
+- 전용 이벤트 루프 스레드 하나에 httpx.AsyncClient 하나 (HTTP/2 + keep-alive 풀)
+  → 스레드/이벤트 루프가 달라도 같은 커넥션 풀을 씀
+  async 코드: await gateway.achat(...), 동기 코드(스레드): gateway.chat(...)
+- 공통 정책: 타임아웃, 429/5xx/네트워크 오류 재시도(지수 백오프 + Retry-After),
+  레이트 리미터(services/rate_limiter.py), 응답 캐시(services/llm_cache.py)
+- 호출별 지연/토큰 지표를 tag(chat / faq_summary / faq_extract ...) 단위로 집계 → stats()
+- transport 교체 가능: LLM_BASE_URL 로 로컬 스텁 서버(services/llm_stub.py)를 가리키거나
+  LLMGateway(transport=httpx.MockTransport(...)) 를 set_llm_gateway 로 등록 (테스트/벤치마크)
+
+.env (선택):
+  LLM_BASE_URL=https://api.openai.com/v1
+  LLM_TIMEOUT=120            # 요청 하나의 타임아웃 (초)
+  LLM_MAX_RETRIES=3          # 재시도 횟수 (첫 시도 제외)
+  LLM_MAX_CONNECTIONS=20
+"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+import httpx
+
+from services.rate_limiter import get_rate_limiter, estimate_tokens, parse_retry_after, BATCH, COMPLETION_ESTIMATE
+from services.llm_cache import get_llm_cache, llm_cache_key
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_MAX_CONNECTIONS = 20
+BACKOFF_BASE = 1.0     # 초
+BACKOFF_MAX = 30.0     # 초
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+LATENCY_WINDOW = 500   # tag 별로 보관할 최근 지연 시간 개수 (p50/p95 계산용)
+
+
+class LLMError(RuntimeError):
+    """재시도까지 실패했거나 재시도할 수 없는 오류 (status_code 는 HTTP 상태, 네트워크 오류면 None)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def _add_usage(usage: Optional[dict], call_usage: Dict[str, int]):
+    if usage is None:
+        return
+    for name, n in call_usage.items():
+        usage[name] = usage.get(name, 0) + (n or 0)
+
+
+class LLMGateway:
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 default_model: Optional[str] = None, timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None, max_connections: Optional[int] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY", "")
+        self.base_url = (base_url or os.getenv("LLM_BASE_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.default_model = default_model or os.getenv("LLM_MODEL") or DEFAULT_MODEL
+        self.timeout = float(timeout if timeout is not None else os.getenv("LLM_TIMEOUT", DEFAULT_TIMEOUT))
+        self.max_retries = int(max_retries if max_retries is not None
+                               else os.getenv("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+        self.max_connections = int(max_connections if max_connections is not None
+                                   else os.getenv("LLM_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS))
+        self.transport = transport
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, dict] = {}
+        self._metrics_lock = threading.Lock()
+
+    # ---------------- 이벤트 루프 / 클라이언트 ----------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="llm-gateway", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """게이트웨이 루프 안에서만 호출"""
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections)
+            kwargs = dict(base_url=self.base_url, limits=limits, timeout=httpx.Timeout(self.timeout),
+                          headers={"Authorization": f"Bearer {self.api_key}"})
+            if self.transport is not None:
+                self._client = httpx.AsyncClient(transport=self.transport, **kwargs)
+            else:
+                try:
+                    self._client = httpx.AsyncClient(http2=True, **kwargs)
+                except ImportError:
+                    # h2 미설치 시 HTTP/1.1 keep-alive 풀로 동작
+                    self._client = httpx.AsyncClient(**kwargs)
+        return self._client
+
+    def close(self):
+        """클라이언트와 루프 스레드 정리 (테스트/프로세스 종료용)"""
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result(timeout=10)
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+        loop.close()
+
+    # ---------------- 지표 ----------------
+
+    def _record(self, tag: str, **fields):
+        with self._metrics_lock:
+            m = self._metrics.setdefault(tag, {
+                "calls": 0, "errors": 0, "retries": 0, "cache_hits": 0,
+                "prompt_tokens": 0, "completion_tokens": 0,
+                "latency": deque(maxlen=LATENCY_WINDOW),
+            })
+            latency = fields.pop("latency", None)
+            if latency is not None:
+                m["latency"].append(latency)
+            for name, n in fields.items():
+                m[name] += n or 0
+
+    def stats(self) -> dict:
+        """tag 별 호출 수/오류/재시도/캐시 적중/토큰, 최근 지연 시간(avg, p50, p95, 초)"""
+        out = {}
+        with self._metrics_lock:
+            for tag, m in self._metrics.items():
+                lat = list(m["latency"])
+                out[tag] = {k: v for k, v in m.items() if k != "latency"}
+                out[tag]["latency_s"] = {
+                    "avg": round(sum(lat) / len(lat), 3) if lat else None,
+                    "p50": round(_percentile(lat, 0.5), 3) if lat else None,
+                    "p95": round(_percentile(lat, 0.95), 3) if lat else None,
+                }
+        return out
+
+    # ---------------- 호출 ----------------
+
+    async def _complete(self, messages: List[dict], model: str, temperature: float,
+                        max_tokens: Optional[int], priority: str, use_cache: bool,
+                        tag: str) -> tuple:
+        """게이트웨이 루프에서 실행. (응답 텍스트, 이번 호출 usage) 반환"""
+        prompt_text = "\n".join(str(m.get("content") or "") for m in messages)
+        params = {"max_tokens": max_tokens} if max_tokens is not None else {}
+
+        # 같은 (모델, temperature, 전체 프롬프트, max_tokens) 는 캐시된 응답 재사용
+        cache = get_llm_cache() if use_cache else None
+        key = llm_cache_key(model, temperature, prompt_text, **params) if cache else None
+        if cache:
+            hit = cache.get(key)
+            if hit is not None:
+                self._record(tag, cache_hits=1)
+                return hit, {"cache_hits": 1}
+
+        payload = {"model": model, "messages": messages, "temperature": temperature, **params}
+        limiter = get_rate_limiter()
+        est = estimate_tokens(prompt_text, completion=max_tokens or COMPLETION_ESTIMATE)
+        client = self._get_client()
+        started = time.monotonic()
+        error: Optional[LLMError] = None
+        for attempt in range(self.max_retries + 1):
+            await limiter.aacquire(est, priority)
+            retry_after = None
+            try:
+                r = await client.post("/chat/completions", json=payload)
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                error = LLMError(f"{type(e).__name__}: {e}")
+            else:
+                if r.status_code == 200:
+                    data = r.json()
+                    u = data.get("usage") or {}
+                    await limiter.arecord_usage(est, u.get("total_tokens"))
+                    content = (data["choices"][0]["message"]["content"] or "").strip()
+                    call_usage = {"llm_calls": 1, "prompt_tokens": u.get("prompt_tokens") or 0,
+                                  "completion_tokens": u.get("completion_tokens") or 0}
+                    self._record(tag, calls=1, retries=attempt, latency=time.monotonic() - started,
+                                 prompt_tokens=call_usage["prompt_tokens"],
+                                 completion_tokens=call_usage["completion_tokens"])
+                    if cache and content:
+                        cache.put(key, model, content)
+                    return content, call_usage
+                retry_after = parse_retry_after(r.headers)
+                if r.status_code == 429:
+                    await limiter.apenalize(retry_after)
+                error = LLMError(f"HTTP {r.status_code}: {r.text[:300]}", r.status_code)
+                if r.status_code not in RETRY_STATUS:
+                    break
+            if attempt < self.max_retries:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)) * (0.5 + random.random() / 2)
+                await asyncio.sleep(max(delay, retry_after or 0.0))
+
+        self._record(tag, calls=1, errors=1, retries=attempt, latency=time.monotonic() - started)
+        raise error
+
+    def _submit(self, messages, model, temperature, max_tokens, priority, use_cache, tag):
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(
+            self._complete(messages, model or self.default_model, temperature, max_tokens,
+                           priority, use_cache, tag),
+            loop,
+        )
+
+    async def achat(self, messages: List[dict], model: Optional[str] = None, temperature: float = 0.2,
+                    max_tokens: Optional[int] = None, priority: str = BATCH, use_cache: bool = True,
+                    usage: Optional[dict] = None, tag: str = "default") -> str:
+        """
+        async 호출 (어느 이벤트 루프에서든). 응답 텍스트 반환, 실패 시 LLMError.
+        usage 를 주면 llm_calls / cache_hits / prompt_tokens / completion_tokens 를 누적
+        """
+        fut = self._submit(messages, model, temperature, max_tokens, priority, use_cache, tag)
+        text, call_usage = await asyncio.wrap_future(fut)
+        _add_usage(usage, call_usage)
+        return text
+
+    def chat(self, messages: List[dict], model: Optional[str] = None, temperature: float = 0.2,
+             max_tokens: Optional[int] = None, priority: str = BATCH, use_cache: bool = True,
+             usage: Optional[dict] = None, tag: str = "default") -> str:
+        """동기 호출 (스레드를 블로킹). 이벤트 루프 안에서는 achat 을 쓸 것."""
+        if self._thread is not None and threading.current_thread() is self._thread:
+            raise RuntimeError("게이트웨이 루프 안에서는 chat() 대신 achat() 을 사용하세요.")
+        fut = self._submit(messages, model, temperature, max_tokens, priority, use_cache, tag)
+        text, call_usage = fut.result()
+        _add_usage(usage, call_usage)
+        return text
+
+
+_GATEWAY: Optional[LLMGateway] = None
+_GATEWAY_LOCK = threading.Lock()
+
+def get_llm_gateway() -> LLMGateway:
+    """프로세스 단위 싱글톤"""
+    global _GATEWAY
+    with _GATEWAY_LOCK:
+        if _GATEWAY is None:
+            _GATEWAY = LLMGateway()
+        return _GATEWAY
+
+
+def set_llm_gateway(gateway: Optional[LLMGateway]):
+    """싱글톤 교체 (스텁 transport 를 쓰는 테스트/벤치마크용). None 이면 다음 호출 때 기본값으로 다시 생성"""
+    global _GATEWAY
+    with _GATEWAY_LOCK:
+        old, _GATEWAY = _GATEWAY, gateway
+    if old is not None and old is not gateway:
+        old.close()
@@ -0,0 +1,71 @@
+# backend/services/llm_stub.py
+"""
+OpenAI Chat Completions 스텁 서버 (테스트/벤치마크용, 실제 API 호출 없음)
+- POST /v1/chat/completions 에 고정 지연 후 결정적인 응답 + usage 반환
+- FAQ 추출 프롬프트([섹션 N])에는 섹션마다 Q/A 한 개짜리 JSON 배열로 응답
+- --fail-rate 로 429(Retry-After) 를 섞어서 재시도/레이트 리미터 동작 확인
+
+사용 예:
+  python -m services.llm_stub --port 8099 --latency 0.3
+  LLM_BASE_URL=http://127.0.0.1:8099/v1 python -m api.main_faq docs/ --domain acme
+"""
+
+import re
+import json
+import random
+import asyncio
+import hashlib
+import argparse
+
+from fastapi import FastAPI, Body
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="LLM stub")
+CONFIG = {"latency": 0.2, "fail_rate": 0.0}
+
+
+def _reply(prompt: str) -> str:
+    ids = [int(x) for x in re.findall(r"\[섹션 (\d+)\]", prompt)]
+    h = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+    if "JSON 배열" in prompt:
+        return json.dumps([
+            {"section_id": i, "question": f"섹션 {i} 의 내용은 무엇인가요 ({h})?",
+             "answer": f"스텁 답변 {h}-{i}", "confidence": 0.9, "ref_article": f"제{i}조"}
+            for i in (ids or [1])
+        ], ensure_ascii=False)
+    if "FAQ" in prompt:
+        return f"요약: 스텁 요약 {h}\nFAQ:\nQ1: 스텁 질문 {h}?\nA1: 스텁 답변 {h}"
+    return f"스텁 응답 {h}"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(payload: dict = Body(...)):
+    await asyncio.sleep(CONFIG["latency"])
+    if CONFIG["fail_rate"] and random.random() < CONFIG["fail_rate"]:
+        return JSONResponse(status_code=429, content={"error": {"message": "stub rate limit"}},
+                            headers={"retry-after-ms": "200"})
+    prompt = "\n".join(str(m.get("content") or "") for m in payload.get("messages", []))
+    content = _reply(prompt)
+    prompt_tokens = len(prompt) // 2 + 1
+    completion_tokens = len(content) // 2 + 1
+    return {
+        "id": "stub-" + hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12],
+        "object": "chat.completion",
+        "model": payload.get("model"),
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+    parser = argparse.ArgumentParser(description="OpenAI Chat Completions 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=CONFIG["latency"], help="응답 지연 (초)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="429 로 응답할 비율 (0~1)")
+    args = parser.parse_args()
+    CONFIG.update(latency=args.latency, fail_rate=args.fail_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
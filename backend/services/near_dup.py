@@ -0,0 +1,149 @@
+# backend/services/near_dup.py
+"""
+FAQ 질문 근접 중복 탐지 (MinHash + LSH)
+- 질문을 정규화 → 문자 3-gram 집합 → MinHash 서명(64개)
+- LSH(16 band × 4 row)로 후보만 고른 뒤 실제 Jaccard 유사도로 확인
+  → 전체 쌍 비교(O(n²)) 없이 수천 건도 바로 처리
+- 추출 결과 안의 중복 + 회사(comp_domain)에 이미 저장된 FAQ 와의 중복을 함께 걸러내고 리포트 반환
+
+.env (선택):
+  FAQ_DEDUP_THRESHOLD=0.7   # 문자 3-gram Jaccard 기준 (1.0 = 완전히 같은 질문만)
+"""
+
+import os
+import re
+import hashlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.7
+NGRAM = 3
+NUM_PERM = 64
+BANDS = 16          # BANDS * ROWS == NUM_PERM, 후보 기준 ≈ (1/BANDS)^(1/ROWS) ≈ 0.5
+ROWS = NUM_PERM // BANDS
+
+_PRIME = np.uint64(4294967311)   # 2^32 보다 큰 소수
+_rng = np.random.RandomState(20240901)   # 프로세스/실행마다 같은 서명이 나오도록 고정
+_A = _rng.randint(1, 2 ** 31 - 1, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 2 ** 31 - 1, size=NUM_PERM).astype(np.uint64)
+
+
+def get_threshold() -> float:
+    return float(os.getenv("FAQ_DEDUP_THRESHOLD", DEFAULT_THRESHOLD))
+
+
+def normalize_question(text: str) -> str:
+    t = (text or "").lower()
+    t = re.sub(r"[\s\?\!\.\,·]+", " ", t)
+    return t.strip()
+
+
+def shingles(text: str, n: int = NGRAM) -> frozenset:
+    t = normalize_question(text).replace(" ", "")
+    if len(t) <= n:
+        return frozenset([t]) if t else frozenset()
+    return frozenset(t[i:i + n] for i in range(len(t) - n + 1))
+
+
+def _hash32(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def minhash(sh: Iterable[str]) -> np.ndarray:
+    xs = np.fromiter((_hash32(s) for s in sh), dtype=np.uint64)
+    if xs.size == 0:
+        return np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    # (a*x + b) mod p  — a, b < 2^31, x < 2^32 → uint64 안에서 계산 가능
+    return ((np.outer(xs, _A) + _B) % _PRIME).min(axis=0)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class NearDupIndex:
+    """질문 → 키 LSH 인덱스 (추가하면서 바로 조회 가능)"""
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = get_threshold() if threshold is None else threshold
+        self._buckets: Dict[Tuple[int, bytes], List[object]] = {}
+        self._shingles: Dict[object, frozenset] = {}
+        self._texts: Dict[object, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def _bands(self, sig: np.ndarray):
+        for b in range(BANDS):
+            yield b, sig[b * ROWS:(b + 1) * ROWS].tobytes()
+
+    def query(self, text: str, sh: Optional[frozenset] = None) -> Optional[Tuple[object, float]]:
+        """가장 비슷한 기존 항목 (threshold 이상일 때만) → (key, 유사도)"""
+        sh = shingles(text) if sh is None else sh
+        seen, best = set(), None
+        for band in self._bands(minhash(sh)):
+            for key in self._buckets.get(band, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                sim = jaccard(sh, self._shingles[key])
+                if sim >= self.threshold and (best is None or sim > best[1]):
+                    best = (key, sim)
+        return best
+
+    def add(self, key, text: str, sh: Optional[frozenset] = None):
+        sh = shingles(text) if sh is None else sh
+        self._shingles[key] = sh
+        self._texts[key] = text
+        for band in self._bands(minhash(sh)):
+            self._buckets.setdefault(band, []).append(key)
+
+    def text(self, key) -> str:
+        return self._texts[key]
+
+
+def dedup(rows: Sequence[dict],
+          existing: Iterable[Tuple[int, str]] = (),
+          threshold: Optional[float] = None) -> Tuple[List[dict], dict]:
+    """
+    rows(question 키 포함) 에서 근접 중복 제거.
+    existing: 이미 저장된 (qa_id, question) 목록 → 이들과 비슷한 행도 제외.
+    반환: (남은 행, 리포트)
+    """
+    index = NearDupIndex(threshold)
+    for qa_id, question in existing:
+        index.add(("db", qa_id), question)
+    n_existing = len(index)
+
+    kept: List[dict] = []
+    merged: List[dict] = []
+    for i, r in enumerate(rows):
+        sh = shingles(r["question"])
+        hit = index.query(r["question"], sh)
+        if hit is not None:
+            key, sim = hit
+            entry = {"question": r["question"], "similarity": round(sim, 3),
+                     "duplicate_of": index.text(key)}
+            if key[0] == "db":
+                entry["qa_id"] = key[1]
+                entry["source"] = "existing"
+            else:
+                entry["source"] = "batch"
+            merged.append(entry)
+            continue
+        index.add(("new", i), r["question"], sh)
+        kept.append(r)
+
+    report = {
+        "threshold": index.threshold,
+        "input": len(rows),
+        "kept": len(kept),
+        "existing_checked": n_existing,
+        "merged_in_batch": sum(1 for m in merged if m["source"] == "batch"),
+        "merged_existing": sum(1 for m in merged if m["source"] == "existing"),
+        "merged": merged,
+    }
+    return kept, report
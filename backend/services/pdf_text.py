@@ -0,0 +1,382 @@
+# backend/services/pdf_text.py
+"""
+PDF 텍스트 추출 공용 모듈
+- 백엔드 선택: pymupdf(기본, 가장 빠름) / pypdf
+- 페이지가 많은 파일은 프로세스 풀에서 페이지 구간 단위로 병렬 추출 (순서 유지, 스트리밍)
+  → 동시에 제출하는 구간은 워커 수 × 2 까지 (읽는 쪽이 느리거나 중간에 멈춰도 결과가 쌓이지 않음)
+- 정리(아티팩트 제거)까지 끝낸 페이지 텍스트를 파일 내용 해시(sha256) 기준으로 캐시
+  → 같은 업로드를 analyze / save / extract-faq 해도 PDF 파싱은 한 번만
+  → 너무 큰 문서(페이지 / 텍스트 크기 상한 초과)는 캐시하지 않음 (메모리에 전체를 모으지 않도록)
+
+.env (선택):
+  PDF_BACKEND=pymupdf                 # pymupdf | pypdf
+  PDF_PARSE_WORKERS=4                 # 병렬 추출 프로세스 수 (1 이면 순차)
+  PDF_PARALLEL_MIN_PAGES=48           # 이 페이지 수 이상일 때만 병렬 추출
+  PDF_TEXT_CACHE_PATH=backend/db/pdf_text_cache.sqlite3
+  PDF_TEXT_CACHE_MAX_MB=512
+  PDF_TEXT_CACHE_MAX_PAGES=2000       # 이보다 페이지가 많은 문서는 캐시 안 함
+  PDF_TEXT_CACHE_MAX_ENTRY_MB=32      # 정리된 텍스트가 이보다 크면 캐시 안 함
+  PDF_TEXT_CACHE_DISABLED=1
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+BACKEND_PYMUPDF = "pymupdf"
+BACKEND_PYPDF = "pypdf"
+BACKENDS = (BACKEND_PYMUPDF, BACKEND_PYPDF)
+
+DEFAULT_BACKEND = BACKEND_PYMUPDF
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+PARALLEL_MIN_PAGES = 48
+PAGES_PER_TASK = 16
+CLEAN_VERSION = 1     # 정리 규칙을 바꾸면 올릴 것 (캐시 키에 포함)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "db", "pdf_text_cache.sqlite3")
+DEFAULT_CACHE_MAX_MB = 512
+DEFAULT_CACHE_MAX_PAGES = 2000
+DEFAULT_CACHE_MAX_ENTRY_MB = 32
+
+
+def get_backend(name: Optional[str] = None) -> str:
+    backend = (name or os.getenv("PDF_BACKEND", DEFAULT_BACKEND)).strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 PDF 백엔드입니다: {backend} (가능: {', '.join(BACKENDS)})")
+    return backend
+
+# ---------------------------------------------------------------------
+# 텍스트 정리
+# ---------------------------------------------------------------------
+
+def clean_text(text: str) -> str:
+    """머리글/쪽번호 같은 아티팩트 제거, 공백 정리, 줄끝 하이픈 연결"""
+    lines = []
+    for ln in text.splitlines():
+        s = ln.strip()
+        if not s:
+            continue
+        if s in {"법제처", "국가법령정보센터"}:
+            continue
+        if re.fullmatch(r"\d+\s*", s):
+            continue
+        s = re.sub(r"\s+", " ", s)
+        lines.append(s)
+    cleaned = "\n".join(lines)
+    cleaned = re.sub(r"(\S)-\s+(\S)", r"\1\2", cleaned)
+    return cleaned
+
+# ---------------------------------------------------------------------
+# 백엔드별 추출 (프로세스 풀 워커에서도 실행되므로 모듈 최상위 함수)
+# ---------------------------------------------------------------------
+
+def _page_count(path: str, backend: str) -> int:
+    if backend == BACKEND_PYMUPDF:
+        import fitz  # PyMuPDF
+        with fitz.open(path) as doc:
+            return doc.page_count
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def _iter_raw_pages(path: str, backend: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    if backend == BACKEND_PYMUPDF:
+        import fitz  # PyMuPDF
+        with fitz.open(path) as doc:
+            for i in range(start, doc.page_count if end is None else min(end, doc.page_count)):
+                yield doc.load_page(i).get_text() or ""
+        return
+    from pypdf import PdfReader
+    pages = PdfReader(path).pages
+    for i in range(start, len(pages) if end is None else min(end, len(pages))):
+        yield pages[i].extract_text() or ""
+
+
+def _extract_range(path: str, backend: str, start: int, end: int) -> List[str]:
+    """[start, end) 페이지 → 정리된 텍스트 목록"""
+    return [clean_text(t) for t in _iter_raw_pages(path, backend, start, end)]
+
+# ---------------------------------------------------------------------
+# 프로세스 풀 (프로세스 단위 싱글톤, 필요할 때 생성)
+# ---------------------------------------------------------------------
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # fork 는 스레드/torch 와 섞이면 위험 → spawn
+            _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+        return _POOL
+
+
+def _iter_parallel(path: str, backend: str, total: int, workers: int) -> Iterator[str]:
+    """구간 단위 병렬 추출, 순서대로 내보냄 (진행 중인 구간은 workers × 2 개까지)"""
+    pool = _get_pool(workers)
+    starts = iter(range(0, total, PAGES_PER_TASK))
+    window = deque()
+
+    def submit_next() -> bool:
+        start = next(starts, None)
+        if start is None:
+            return False
+        window.append(pool.submit(_extract_range, path, backend, start, start + PAGES_PER_TASK))
+        return True
+
+    try:
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+        while window:
+            chunk = window.popleft().result()
+            submit_next()
+            yield from chunk
+    finally:
+        # 읽는 쪽이 중간에 멈추면 아직 시작 안 한 구간은 취소
+        for fut in window:
+            fut.cancel()
+
+
+def shutdown_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True, cancel_futures=True)
+            _POOL = None
+
+# ---------------------------------------------------------------------
+# 캐시 (파일 내용 해시 → 정리된 페이지 텍스트)
+# ---------------------------------------------------------------------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pdf_text (
+    key       TEXT PRIMARY KEY,
+    pages     BLOB NOT NULL,
+    num_pages INTEGER NOT NULL,
+    nbytes    INTEGER NOT NULL,
+    created   REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_pdf_text_last_used ON pdf_text(last_used);
+"""
+
+
+class PdfTextCache:
+    """(sha256, 백엔드, 정리 규칙 버전) → 페이지 텍스트 목록 (zlib 압축 JSON, SQLite 파일)"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def key(sha256: str, backend: str) -> str:
+        return f"{sha256}:{backend}:v{CLEAN_VERSION}"
+
+    def get(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            row = self._conn.execute("SELECT pages FROM pdf_text WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE pdf_text SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM pdf_text WHERE key = ?", (key,)).fetchone() is not None
+
+    def put(self, key: str, pages: List[str]):
+        blob = zlib.compress(json.dumps(pages, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pdf_text (key, pages, num_pages, nbytes, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, blob, len(pages), len(blob), now, now),
+            )
+            self._conn.commit()
+            self._evict_locked()
+
+    def _evict_locked(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM pdf_text").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        victims = []
+        for key, nbytes in self._conn.execute("SELECT key, nbytes FROM pdf_text ORDER BY last_used ASC"):
+            if total <= target:
+                break
+            victims.append((key,))
+            total -= nbytes
+        self._conn.executemany("DELETE FROM pdf_text WHERE key = ?", victims)
+        self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, nbytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM pdf_text"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "entries": entries,
+            "size_mb": round(nbytes / (1024 * 1024), 2),
+        }
+
+
+_CACHE: Optional[PdfTextCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_pdf_text_cache() -> Optional[PdfTextCache]:
+    """프로세스 단위 싱글톤 (PDF_TEXT_CACHE_DISABLED=1 이면 None)"""
+    global _CACHE
+    if os.getenv("PDF_TEXT_CACHE_DISABLED", "").strip() in {"1", "true", "yes"}:
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            path = os.getenv("PDF_TEXT_CACHE_PATH", DEFAULT_CACHE_PATH)
+            max_mb = float(os.getenv("PDF_TEXT_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB))
+            _CACHE = PdfTextCache(path, max_bytes=int(max_mb * 1024 * 1024))
+    return _CACHE
+
+
+# (경로, 크기, mtime) → sha256 : 같은 파일을 여러 번 열 때 해시를 다시 계산하지 않음
+_HASHES: Dict[Tuple[str, int, int], str] = {}
+_HASHES_LOCK = threading.Lock()
+
+def file_sha256(path: str) -> str:
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _HASHES_LOCK:
+        if memo_key in _HASHES:
+            return _HASHES[memo_key]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    with _HASHES_LOCK:
+        _HASHES[memo_key] = digest
+    return digest
+
+
+def is_cached(sha256: str, backend: Optional[str] = None) -> bool:
+    """이 내용의 정리된 텍스트가 캐시에 있는지 (파싱 없이 바로 쓸 수 있는지)"""
+    cache = get_pdf_text_cache()
+    return cache is not None and cache.contains(PdfTextCache.key(sha256, get_backend(backend)))
+
+
+def remember_sha256(path: str, digest: str):
+    """이미 알고 있는 해시 등록 (업로드하면서 계산한 해시 → 파일을 다시 읽지 않음)"""
+    st = os.stat(path)
+    with _HASHES_LOCK:
+        _HASHES[(os.path.abspath(path), st.st_size, st.st_mtime_ns)] = digest
+
+# ---------------------------------------------------------------------
+# 공개 API
+# ---------------------------------------------------------------------
+
+def iter_pages(path, stats: Optional[dict] = None, backend: Optional[str] = None,
+               workers: Optional[int] = None, use_cache: bool = True) -> Iterator[str]:
+    """
+    정리된 페이지 텍스트를 순서대로 한 장씩 내보냄 (빈 페이지 포함 → 인덱스 = 페이지 번호)
+    - 캐시 적중: 파싱 없이 바로
+    - 미스: 큰 파일은 프로세스 풀에서 구간 단위 병렬 추출, 끝까지 읽었을 때만 캐시에 저장
+      (페이지 수 / 텍스트 크기 상한을 넘으면 저장하지 않고 모으던 페이지도 버림)
+    stats 를 주면 pages_total / pages_done / text_cache(hit|miss|skip) 를 채움
+    """
+    path = str(path)
+    backend = get_backend(backend)
+    cache = get_pdf_text_cache() if use_cache else None
+    key = PdfTextCache.key(file_sha256(path), backend) if cache else None
+
+    cached = cache.get(key) if cache else None
+    if stats is not None:
+        stats["text_cache"] = "hit" if cached is not None else "miss"
+    if cached is not None:
+        if stats is not None:
+            stats["pages_total"] = len(cached)
+        for t in cached:
+            if stats is not None:
+                stats["pages_done"] = stats.get("pages_done", 0) + 1
+            yield t
+        return
+
+    total = _page_count(path, backend)
+    if stats is not None:
+        stats["pages_total"] = total
+    workers = int(os.getenv("PDF_PARSE_WORKERS", DEFAULT_WORKERS)) if workers is None else workers
+    min_pages = int(os.getenv("PDF_PARALLEL_MIN_PAGES", PARALLEL_MIN_PAGES))
+
+    if workers > 1 and total >= min_pages:
+        page_iter = _iter_parallel(path, backend, total, workers)
+    else:
+        page_iter = (clean_text(t) for t in _iter_raw_pages(path, backend))
+
+    # 캐시할 문서만 페이지를 모음 (상한을 넘는 순간 포기)
+    max_pages = int(os.getenv("PDF_TEXT_CACHE_MAX_PAGES", DEFAULT_CACHE_MAX_PAGES))
+    max_bytes = float(os.getenv("PDF_TEXT_CACHE_MAX_ENTRY_MB", DEFAULT_CACHE_MAX_ENTRY_MB)) * 1024 * 1024
+    pages: Optional[List[str]] = [] if cache and total <= max_pages else None
+    nbytes = 0
+    for t in page_iter:
+        if pages is not None:
+            pages.append(t)
+            nbytes += len(t.encode("utf-8"))
+            if len(pages) > max_pages or nbytes > max_bytes:
+                pages = None
+        if stats is not None:
+            stats["pages_done"] = stats.get("pages_done", 0) + 1
+        yield t
+    if pages is not None:
+        cache.put(key, pages)
+    elif cache and stats is not None:
+        stats["text_cache"] = "skip"
+
+
+def extract_pages(path, backend: Optional[str] = None, use_cache: bool = True) -> List[str]:
+    return list(iter_pages(path, backend=backend, use_cache=use_cache))
+
+
+def extract_text(path, max_chars: Optional[int] = None, backend: Optional[str] = None,
+                 use_cache: bool = True) -> str:
+    """
+    문서 전체 텍스트 (페이지 사이는 줄바꿈)
+    max_chars 를 채우면 나머지 페이지는 읽지 않음 (캐시가 없으면 앞부분만 파싱)
+    """
+    parts, size = [], 0
+    it = iter_pages(path, backend=backend, use_cache=use_cache)
+    try:
+        for t in it:
+            if not t:
+                continue
+            parts.append(t)
+            size += len(t) + 1
+            if max_chars is not None and size >= max_chars:
+                break
+    finally:
+        it.close()
+    text = "\n".join(parts)
+    return text[:max_chars] if max_chars is not None else text
@@ -1,6 +1,8 @@
 # backend/services/rag_engine.py
 import os
-from typing import List, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 
@@ -8,21 +10,20 @@ from dotenv import load_dotenv
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 
-# OpenAI LLM (분리 패키지 우선 사용, 없으면 구버전 fallback)
-try:
-    from langchain_openai import ChatOpenAI  # pip install langchain-openai
-    _OPENAI_KIND = "new"
-except Exception:
-    # 구버전 호환 (가능하면 위 패키지 설치 권장)
-    from langchain.chat_models import ChatOpenAI  # deprecated 경로
-    _OPENAI_KIND = "legacy"
-
 from langchain.chains import RetrievalQA
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.retrievers import BaseRetriever
 
 # --- ✅ [추가] DB 관련 임포트 ---
 from sqlalchemy import update, select
 from db.session import SessionLocal
 from models.faq import CompFAQ
+from db.vector_collections import parse_collection, index_dir, collection_embedding, check_collections
+from services.rate_limiter import INTERACTIVE
+from services.llm_gateway import get_llm_gateway
 
 # --- .env 로드 (backend/.env) ---
 _ENV_LOADED = False
@@ -36,60 +37,210 @@ def _ensure_env():
     _ENV_LOADED = True
 
 # --- 환경 변수 / 경로 ---
+# 검색할 컬렉션 기본값: "이름:가중치:k" (쉼표 구분, 이름은 db/vector_collections.py 참고)
+DEFAULT_COLLECTIONS = "faq:1.0:5,laws:0.8:3"
+DEFAULT_TOP_K = 5
+# 컬렉션 병합: 가중 RRF (weight / (RRF_K + 순위))
+# 컬렉션마다 임베딩 모델 / 정규화가 달라 L2 거리끼리는 비교할 수 없으므로 순위로 합침
+RRF_K = 60
+
 def _get_cfg():
     _ensure_env()
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-    EMBED_MODEL = os.getenv("EMBED_MODEL", "BM-K/KoSimCSE-roberta")
-    # 인덱스 기본 경로: backend/db/vector_store/faiss_langchain
-    VSTORE_DIR = os.getenv(
-        "VSTORE_DIR",
-        os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            "db", "vector_store", "faiss_langchain"
-        ),
-    )
-    return OPENAI_API_KEY, OPENAI_MODEL, EMBED_MODEL, VSTORE_DIR
+    # 예: RAG_COLLECTIONS=faq/hr:1.0:5,laws:0.7:3
+    # 임베딩 모델은 컬렉션별 (db/vector_collections.py 의 collection_embedding)
+    COLLECTIONS = os.getenv("RAG_COLLECTIONS", DEFAULT_COLLECTIONS)
+    TOP_K = int(os.getenv("RAG_TOP_K", DEFAULT_TOP_K))
+    return OPENAI_API_KEY, OPENAI_MODEL, COLLECTIONS, TOP_K
+
+def parse_collections_spec(spec: str) -> List[Tuple[str, float, int]]:
+    """'faq:1.0:5,laws:0.8:3' → [('faq', 1.0, 5), ('laws', 0.8, 3)] (가중치/k 생략 가능)"""
+    out = []
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, weight, k = (part.split(":") + ["", ""])[:3]
+        out.append((name.strip(), float(weight or 1.0), int(k or DEFAULT_TOP_K)))
+    return out
 
-_vstore = None
+# 임베딩 공간별 모델 캐시: (모델, 정규화 여부) → HuggingFaceEmbeddings
+_embeddings: Dict[Tuple[str, bool], HuggingFaceEmbeddings] = {}
+_embeddings_lock = threading.Lock()
+_llm = None
 _chain = None
+_default_specs: List[Tuple[str, float, int]] = []
+_top_k = DEFAULT_TOP_K
 
-def _load():
-    """싱글톤 초기화: KoSimCSE 임베딩으로 만든 FAISS 인덱스를 로드하고 Retriever+LLM 체인 구성."""
-    global _vstore, _chain
-    if _chain:
-        return
+# 컬렉션별 FAISS 캐시: base 이름 → ((버전 디렉터리, index.faiss mtime), vectorstore)
+_stores: Dict[str, Tuple[Tuple[str, float], FAISS]] = {}
+_stores_lock = threading.Lock()
+# 컬렉션 동시 검색용 (FAISS 검색은 GIL 을 놓으므로 스레드로 충분)
+_search_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-search")
 
-    OPENAI_API_KEY, OPENAI_MODEL, EMBED_MODEL, VSTORE_DIR = _get_cfg()
+def _get_embeddings(space: Tuple[str, bool]) -> HuggingFaceEmbeddings:
+    """임베딩 공간별 모델 (같은 모델을 쓰는 컬렉션끼리 공유)"""
+    with _embeddings_lock:
+        emb = _embeddings.get(space)
+        if emb is None:
+            model, normalize = space
+            emb = HuggingFaceEmbeddings(model_name=model, encode_kwargs={"normalize_embeddings": normalize})
+            _embeddings[space] = emb
+        return emb
 
-    # ✅ 인덱스 생성에 사용한 것과 동일한 임베딩 모델 사용 (KoSimCSE)
-    embeddings = HuggingFaceEmbeddings(model_name=EMBED_MODEL)
+def _get_store(base: str) -> Optional[FAISS]:
+    """컬렉션 인덱스 로드 (새 버전이 게시되거나 파일이 다시 저장되면 재로드, 아직 없으면 None)"""
+    path = index_dir(base)  # 포인터(CURRENT)가 가리키는 버전 디렉터리
+    index_file = os.path.join(path, "index.faiss")
+    try:
+        version = (path, os.path.getmtime(index_file))
+    except OSError:
+        return None
+    with _stores_lock:
+        cached = _stores.get(base)
+    if cached and cached[0] == version:
+        return cached[1]
+    try:
+        # FAISS 인덱스 로드 (allow_dangerous_deserialization=True 필요)
+        # ✅ 인덱스 생성에 사용한 것과 동일한 임베딩 (컬렉션별)
+        vs = FAISS.load_local(path, _get_embeddings(collection_embedding(base)),
+                              allow_dangerous_deserialization=True)
+    except Exception as e:
+        # 로드 중에 이전 버전이 정리된 경우 등 → 이전 인덱스로 계속 응답 (다음 검색 때 다시 시도)
+        print(f"[RAG] {base} 인덱스 로드 실패: {e}")
+        return cached[1] if cached else None
+    with _stores_lock:
+        _stores[base] = (version, vs)
+    return vs
 
-    # FAISS 인덱스 로드 (allow_dangerous_deserialization=True 필요)
-    _vstore = FAISS.load_local(
-        VSTORE_DIR,
-        embeddings,
-        allow_dangerous_deserialization=True,
-    )
+def _search_one(name: str, weight: float, k: int, vector: List[float]) -> List[Tuple[Document, float]]:
+    base, flt = parse_collection(name)
+    vs = _get_store(base)
+    if vs is None:
+        return []
+    out = []
+    hits = vs.similarity_search_with_score_by_vector(vector, k=k, filter=flt)
+    for rank, (doc, dist) in enumerate(hits, start=1):
+        # 컬렉션 안의 순위 → 가중 RRF 점수 (거리는 같은 공간 안에서만 의미가 있어 참고용으로만 남김)
+        # docstore 원본은 건드리지 않도록 복사
+        score = weight / (RRF_K + rank)
+        out.append((Document(page_content=doc.page_content,
+                             metadata={**doc.metadata, "collection": name, "score": round(score, 5),
+                                       "distance": round(float(dist), 4)}), score))
+    return out
+
+def search(question: str,
+           specs: Optional[List[Tuple[str, float, int]]] = None,
+           top_k: Optional[int] = None) -> List[Tuple[Document, float]]:
+    """선택한 컬렉션들을 동시에 검색 → 가중 RRF 점수 순으로 병합한 상위 top_k"""
+    _load()
+    specs = specs or _default_specs
+    # 질의 임베딩은 임베딩 공간(모델, 정규화)마다 한 번만
+    spaces = {name: collection_embedding(name) for name, _, _ in specs}
+    vectors: Dict[Tuple[str, bool], Optional[List[float]]] = {}
+    for space in dict.fromkeys(spaces.values()):
+        try:
+            vectors[space] = _get_embeddings(space).embed_query(question)
+        except Exception as e:
+            print(f"[RAG] 질의 임베딩 실패 ({space[0]}): {e}")
+            vectors[space] = None
+    futures = [(name, _search_pool.submit(_search_one, name, weight, k, vectors[spaces[name]]))
+               for name, weight, k in specs if vectors[spaces[name]] is not None]
+    merged: List[Tuple[Document, float]] = []
+    for name, fut in futures:
+        try:
+            merged.extend(fut.result())
+        except Exception as e:
+            # 한 컬렉션 실패로 전체 답변이 막히지 않도록
+            print(f"[RAG] {name} 검색 실패: {e}")
+    merged.sort(key=lambda x: x[1], reverse=True)
+    return merged[:top_k or _top_k]
+
+def resolve_collections(names: List[str]) -> List[Tuple[str, float, int]]:
+    """
+    요청에서 고른 컬렉션 이름 → 기본 설정의 가중치/k 적용 (없으면 1.0 / 기본 k)
+    - 등록되지 않은 이름은 UnknownCollectionError (인덱스 경로로 쓰기 전에 거름)
+    """
+    check_collections(names)
+    by_name = {n: (n, w, k) for n, w, k in _default_specs}
+    by_base = {parse_collection(n)[0]: (w, k) for n, w, k in _default_specs}
+    out = []
+    for name in names:
+        if name in by_name:
+            out.append(by_name[name])
+            continue
+        weight, k = by_base.get(parse_collection(name)[0], (1.0, _top_k))
+        out.append((name, weight, k))
+    return out
+
+class FanOutRetriever(BaseRetriever):
+    """여러 컬렉션을 동시에 검색해서 병합하는 Retriever"""
+    specs: List[Tuple[str, float, int]]
+    top_k: int = DEFAULT_TOP_K
 
-    retriever = _vstore.as_retriever(search_kwargs={"k": 5})
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return [doc for doc, _ in search(query, self.specs, self.top_k)]
 
-    # OpenAI LLM 준비 (환경변수 사용; 키 인자는 생략해도 됨)
-    if _OPENAI_KIND == "new":
-        # langchain_openai.ChatOpenAI: model 파라미터 사용
-        llm = ChatOpenAI(model=OPENAI_MODEL, temperature=0.2)
-    else:
-        # 구버전 경로(가능하면 langchain-openai 설치 권장)
-        llm = ChatOpenAI(model_name=OPENAI_MODEL, temperature=0.2, openai_api_key=OPENAI_API_KEY)
+_ROLES = {"human": "user", "ai": "assistant", "system": "system", "tool": "tool"}
 
+class GatewayChatModel(BaseChatModel):
+    """LangChain 체인용 LLM: 호출은 services/llm_gateway.py (풀/재시도/레이트 리미터/지표 공용)"""
+    model: str = "gpt-4o-mini"
+    temperature: float = 0.2
+    priority: str = INTERACTIVE   # 채팅은 추출(batch)보다 우선
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-gateway"
+
+    def _request(self, messages: List[BaseMessage]) -> List[dict]:
+        return [{"role": _ROLES.get(m.type, "user"), "content": m.content} for m in messages]
+
+    def _result(self, text: str, usage: dict) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))],
+                          llm_output={"token_usage": usage, "model_name": self.model})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        usage: dict = {}
+        # 답변은 검색 결과에 따라 달라지므로 응답 캐시는 쓰지 않음
+        text = get_llm_gateway().chat(self._request(messages), model=self.model, temperature=self.temperature,
+                                      priority=self.priority, use_cache=False, usage=usage, tag="chat")
+        return self._result(text, usage)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        usage: dict = {}
+        text = await get_llm_gateway().achat(self._request(messages), model=self.model,
+                                             temperature=self.temperature, priority=self.priority,
+                                             use_cache=False, usage=usage, tag="chat")
+        return self._result(text, usage)
+
+def _make_chain(specs: List[Tuple[str, float, int]]):
     # source_documents를 반환하도록 설정
-    _chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        retriever=retriever,
+    return RetrievalQA.from_chain_type(
+        llm=_llm,
+        retriever=FanOutRetriever(specs=specs, top_k=_top_k),
         return_source_documents=True,
         chain_type="stuff",
     )
 
+def _load():
+    """싱글톤 초기화: KoSimCSE 임베딩 + 컬렉션 fan-out Retriever + LLM 체인 구성."""
+    global _llm, _chain, _default_specs, _top_k
+    if _chain:
+        return
+
+    OPENAI_API_KEY, OPENAI_MODEL, COLLECTIONS, TOP_K = _get_cfg()
+    _default_specs = parse_collections_spec(COLLECTIONS)
+    _top_k = TOP_K
+
+    # 임베딩 모델은 컬렉션을 처음 검색할 때 컬렉션별로 로드 (_get_embeddings)
+
+    # LLM: 공용 게이트웨이 경유 (API 키 / 주소는 게이트웨이 설정, LLM_BASE_URL 로 스텁 서버 가능)
+    _llm = GatewayChatModel(model=OPENAI_MODEL, temperature=0.2)
+
+    _chain = _make_chain(_default_specs)
+
 # --- ✅ [추가] 조회수 증가 유틸 ---
 def increment_view_by_qa_id(qa_id: int) -> bool:
     """qa_id로 comp_faq.views 를 +1한다. 성공 시 True."""
@@ -120,17 +271,27 @@ def increment_view_by_question_exact(question: str) -> bool:
     except Exception:
         return False
 
-def ask(question: str) -> Tuple[str, List[dict]]:
+def ask_with_match(question: str, collections: Optional[List[str]] = None) -> Tuple[str, List[dict], dict]:
+    """
+    ask 와 같지만 조회수는 올리지 않고 가장 유사한 문서의 메타데이터를 같이 반환
+    (api/chat.py 는 이 값으로 services.view_logger 의 비동기 카운터를 직접 await)
+    """
     _load()
-    out = _chain({"query": question})
+    chain = _make_chain(resolve_collections(collections)) if collections else _chain
+    out = chain({"query": question})
     answer = out.get("result") or out.get("answer") or ""
     docs = out.get("source_documents") or []
+    matched = (getattr(docs[0], "metadata", {}) or {}) if docs else {}
+    return answer.strip(), _sources(docs), matched
+
+def ask(question: str, collections: Optional[List[str]] = None) -> Tuple[str, List[dict]]:
+    """collections 를 주면 해당 컬렉션만 검색 (예: ["faq/hr", "laws"])"""
+    answer, sources, md = ask_with_match(question, collections)
 
     # --- ✅ [추가] 매칭된 문서 기반으로 조회수 1회 증가 ---
     # 가장 유사한 1건만 카운트 (원하면 전체 문서에 대해 set으로 중복 제거 후 반복 가능)
     try:
-        if docs:
-            md = getattr(docs[0], "metadata", {}) or {}
+        if md:
             qa_id = md.get("qa_id")
             if qa_id is not None:
                 increment_view_by_qa_id(int(qa_id))
@@ -141,7 +302,9 @@ def ask(question: str) -> Tuple[str, List[dict]]:
     except Exception:
         # 조회수 로깅 실패는 무시 (메인 답변 흐름 보장)
         pass
+    return answer, sources
 
+def _sources(docs) -> List[dict]:
     sources = []
     for d in docs:
         # 저장 시 넣어둔 메타데이터 키를 최대한 활용
@@ -158,4 +321,4 @@ def ask(question: str) -> Tuple[str, List[dict]]:
             continue
         seen.add(key)
         uniq.append(s)
-    return answer.strip(), uniq[:5]
+    return uniq[:5]
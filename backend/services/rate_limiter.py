@@ -0,0 +1,275 @@
+# backend/services/rate_limiter.py
+"""
+OpenAI 호출 공용 레이트 리미터 (토큰 버킷: 분당 요청 수 RPM + 분당 토큰 수 TPM)
+- 채팅(rag_engine), FAQ 요약(faq.ask_gpt_for_faq), 섹션 추출(main_faq.call_llm)이 같은 버킷을 씀
+  (세 곳 모두 services/llm_gateway.py 를 거치며 게이트웨이가 차감/보정/429 처리)
+- 요청 토큰은 프롬프트 길이로 추정해서 먼저 차감, 응답의 usage 로 보정
+- 429 의 Retry-After 를 받으면 그동안 모든 호출을 멈춤
+- 우선순위: interactive(채팅) 가 기다리는 동안 batch(추출)는 양보하고,
+  batch 는 버킷의 RESERVE 비율만큼은 남겨둠 → 대량 추출 중에도 채팅이 429 에 막히지 않음
+- 기본은 프로세스 내 상태, RATE_LIMIT_STATE 를 주면 SQLite 파일로 여러 프로세스(워커)가 공유
+
+.env (선택):
+  OPENAI_RPM=500
+  OPENAI_TPM=200000
+  RATE_LIMIT_RESERVE=0.2               # batch 가 남겨둘 비율
+  RATE_LIMIT_STATE=backend/db/ratelimit.sqlite3
+  RATE_LIMIT_DISABLED=1
+"""
+
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+from contextlib import closing
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+DEFAULT_RPM = 500
+DEFAULT_TPM = 200_000
+DEFAULT_RESERVE = 0.2
+COMPLETION_ESTIMATE = 512     # 응답 토큰 추정치 (max_tokens 를 모를 때)
+INTERACTIVE_HOLD = 1.0        # interactive 대기 표시 유지 시간 (초)
+MAX_WAIT_STEP = 1.0           # 한 번에 자는 최대 시간 (초)
+
+
+def estimate_tokens(text: str, completion: int = COMPLETION_ESTIMATE) -> int:
+    """대략적인 토큰 수 (한국어는 글자당 ~0.5~1 토큰 → 보수적으로 글자수/2 + 응답 몫)"""
+    return len(text or "") // 2 + 1 + completion
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """Retry-After(초 또는 HTTP 날짜) / retry-after-ms 헤더 → 초"""
+    if not headers:
+        return None
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return float(ms) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except Exception:
+            return None
+
+# ---------------------------------------------------------------------
+# 상태 저장소 (프로세스 내 / SQLite 공유)
+# ---------------------------------------------------------------------
+
+class _MemoryState:
+    blocking = False   # 잠금만 잡으므로 이벤트 루프에서 바로 불러도 됨
+
+    def __init__(self, rpm: float, tpm: float):
+        self._lock = threading.Lock()
+        self._state = {"req": float(rpm), "tok": float(tpm), "updated": time.time(),
+                       "blocked_until": 0.0, "interactive_until": 0.0}
+
+    def transact(self, fn: Callable[[dict], float]) -> float:
+        with self._lock:
+            return fn(self._state)
+
+
+class _SqliteState:
+    """여러 프로세스가 같은 버킷을 쓰도록 SQLite 한 행에 상태 저장 (BEGIN IMMEDIATE 로 직렬화)"""
+    blocking = True    # 다른 프로세스가 잠그고 있으면 최대 timeout 초 기다림 → async 쪽은 스레드에서 실행
+
+    def __init__(self, path: str, rpm: float, tpm: float):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bucket (id INTEGER PRIMARY KEY CHECK (id = 1), "
+                "req REAL, tok REAL, updated REAL, blocked_until REAL, interactive_until REAL)"
+            )
+            conn.execute("INSERT OR IGNORE INTO bucket VALUES (1, ?, ?, ?, 0, 0)", (rpm, tpm, time.time()))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def transact(self, fn: Callable[[dict], float]) -> float:
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                state = dict(conn.execute("SELECT * FROM bucket WHERE id = 1").fetchone())
+                out = fn(state)
+                conn.execute(
+                    "UPDATE bucket SET req = ?, tok = ?, updated = ?, blocked_until = ?, "
+                    "interactive_until = ? WHERE id = 1",
+                    (state["req"], state["tok"], state["updated"], state["blocked_until"],
+                     state["interactive_until"]),
+                )
+                conn.execute("COMMIT")
+                return out
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+# ---------------------------------------------------------------------
+# Limiter
+# ---------------------------------------------------------------------
+
+class RateLimiter:
+    def __init__(self, rpm: float = DEFAULT_RPM, tpm: float = DEFAULT_TPM,
+                 reserve: float = DEFAULT_RESERVE, state_path: Optional[str] = None):
+        self.rpm = float(rpm)
+        self.tpm = float(tpm)
+        self.reserve = max(0.0, min(0.9, reserve))
+        self._state = _SqliteState(state_path, self.rpm, self.tpm) if state_path else _MemoryState(self.rpm, self.tpm)
+        # 통계 (이 프로세스 기준)
+        self.waited = {INTERACTIVE: 0.0, BATCH: 0.0}
+        self.calls = {INTERACTIVE: 0, BATCH: 0}
+        self.throttled = 0
+
+    def _refill(self, s: dict, now: float):
+        elapsed = max(0.0, now - s["updated"])
+        s["req"] = min(self.rpm, s["req"] + elapsed * self.rpm / 60.0)
+        s["tok"] = min(self.tpm, s["tok"] + elapsed * self.tpm / 60.0)
+        s["updated"] = now
+
+    def _try_acquire(self, tokens: int, priority: str) -> float:
+        """차감에 성공하면 0, 아니면 다시 시도할 때까지 기다릴 시간(초)"""
+        tokens = min(float(tokens), self.tpm)   # 버킷보다 큰 요청이 영원히 못 가는 일 방지
+
+        def fn(s: dict) -> float:
+            now = time.time()
+            self._refill(s, now)
+            if s["blocked_until"] > now:
+                return s["blocked_until"] - now
+            if priority == INTERACTIVE:
+                s["interactive_until"] = now + INTERACTIVE_HOLD
+                floor_req, floor_tok = 0.0, 0.0
+            else:
+                if s["interactive_until"] > now:
+                    return min(s["interactive_until"] - now, 0.25)
+                floor_req, floor_tok = self.rpm * self.reserve, self.tpm * self.reserve
+                floor_tok = min(floor_tok, self.tpm - tokens)
+            need_req = 1.0 + floor_req - s["req"]
+            need_tok = tokens + floor_tok - s["tok"]
+            if need_req <= 0 and need_tok <= 0:
+                s["req"] -= 1.0
+                s["tok"] -= tokens
+                return 0.0
+            return max(need_req * 60.0 / self.rpm, need_tok * 60.0 / self.tpm, 0.01)
+
+        return self._state.transact(fn)
+
+    def acquire(self, tokens: int, priority: str = BATCH) -> float:
+        """동기 호출용 (스레드 블로킹). 기다린 시간 반환."""
+        started = time.monotonic()
+        while True:
+            wait = self._try_acquire(tokens, priority)
+            if wait <= 0:
+                break
+            time.sleep(min(wait, MAX_WAIT_STEP))
+        return self._done(priority, time.monotonic() - started)
+
+    async def aacquire(self, tokens: int, priority: str = BATCH) -> float:
+        """비동기 호출용 (이벤트 루프를 막지 않음). 기다린 시간 반환."""
+        started = time.monotonic()
+        while True:
+            wait = await self._off_loop(self._try_acquire, tokens, priority)
+            if wait <= 0:
+                break
+            await asyncio.sleep(min(wait, MAX_WAIT_STEP))
+        return self._done(priority, time.monotonic() - started)
+
+    async def _off_loop(self, fn, *args):
+        """SQLite 상태면 스레드에서 실행 (BEGIN IMMEDIATE 대기가 게이트웨이 이벤트 루프를 막지 않도록)"""
+        if self._state.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    def _done(self, priority: str, waited: float) -> float:
+        self.calls[priority] = self.calls.get(priority, 0) + 1
+        self.waited[priority] = self.waited.get(priority, 0.0) + waited
+        return waited
+
+    def record_usage(self, estimated: int, actual: Optional[int]):
+        """응답 usage 로 추정치 보정 (많이 잡았으면 돌려주고, 적게 잡았으면 더 차감)"""
+        if actual is None:
+            return
+        diff = float(estimated) - float(actual)
+
+        def fn(s: dict) -> float:
+            self._refill(s, time.time())
+            s["tok"] = min(self.tpm, s["tok"] + diff)
+            return 0.0
+
+        self._state.transact(fn)
+
+    async def arecord_usage(self, estimated: int, actual: Optional[int]):
+        await self._off_loop(self.record_usage, estimated, actual)
+
+    def penalize(self, retry_after: Optional[float]):
+        """429 응답: Retry-After 동안 모든 호출 중지 (헤더가 없으면 1초)"""
+        self.throttled += 1
+        pause = retry_after if retry_after is not None else 1.0
+
+        def fn(s: dict) -> float:
+            now = time.time()
+            s["blocked_until"] = max(s["blocked_until"], now + pause)
+            return 0.0
+
+        self._state.transact(fn)
+
+    async def apenalize(self, retry_after: Optional[float]):
+        await self._off_loop(self.penalize, retry_after)
+
+    def stats(self) -> dict:
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "calls": dict(self.calls),
+            "waited_s": {k: round(v, 2) for k, v in self.waited.items()},
+            "throttled": self.throttled,
+        }
+
+
+class _NoopLimiter(RateLimiter):
+    """RATE_LIMIT_DISABLED=1 일 때"""
+
+    def __init__(self):
+        super().__init__()
+
+    def _try_acquire(self, tokens: int, priority: str) -> float:
+        return 0.0
+
+    def record_usage(self, estimated: int, actual: Optional[int]):
+        return
+
+    def penalize(self, retry_after: Optional[float]):
+        self.throttled += 1
+
+
+_LIMITER: Optional[RateLimiter] = None
+_LIMITER_LOCK = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """프로세스 단위 싱글톤"""
+    global _LIMITER
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            if os.getenv("RATE_LIMIT_DISABLED") == "1":
+                _LIMITER = _NoopLimiter()
+            else:
+                _LIMITER = RateLimiter(
+                    rpm=float(os.getenv("OPENAI_RPM", DEFAULT_RPM)),
+                    tpm=float(os.getenv("OPENAI_TPM", DEFAULT_TPM)),
+                    reserve=float(os.getenv("RATE_LIMIT_RESERVE", DEFAULT_RESERVE)),
+                    state_path=os.getenv("RATE_LIMIT_STATE") or None,
+                )
+        return _LIMITER
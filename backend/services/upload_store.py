@@ -0,0 +1,529 @@
+# backend/services/upload_store.py
+"""
+업로드 파일 저장소 (내용 주소 기반)
+- 업로드를 고정 크기 청크로 디스크에 바로 쓰면서 sha256 을 같이 계산 (파일 전체를 메모리에 올리지 않음)
+- 저장 위치: <root>/objects/<sha 앞 2자리>/<sha256>.<확장자>, file_id = sha256
+  → 같은 문서를 다시 올리면 새로 쓰지 않고 기존 파일을 그대로 씀 (dedup)
+    텍스트 캐시(services/pdf_text.py) / LLM 응답 캐시도 내용 기준이라 추출 결과까지 재사용
+- 크기 제한은 받으면서 검사 (넘으면 즉시 중단하고 임시 파일 삭제)
+- 원래 파일명은 <root>/meta/<sha256>.json 에 업로더(comp_domain)별로 기록 (출처 표시용)
+- 예전 방식으로 저장된 파일(<root>/<파일명>, <root>/<uuid>.<ext>)도 file_id 로 계속 찾을 수 있음
+- 분할 업로드 (큰 문서 / 불안정한 네트워크용): 시작 → 번호 붙은 파트 업로드 → 완료
+  · 시작할 때 전체 크기만큼 빈 파일(<root>/sessions/<upload_id>/data)을 만들어 두고
+    파트는 자기 위치(offset)에 바로 씀 → 완료 시 합치는 복사 없이 해시 계산 후 이름만 바꿈
+  · 파트마다 sha256 검증, 같은 파트를 다시 보내도 같은 자리에 덮어쓰므로 재시도/병렬 업로드 안전
+  · 완료 결과는 잠시 남겨서 완료 요청 재시도에도 같은 응답, 오래된 세션은 정리(gc_sessions)
+
+.env (선택):
+  UPLOAD_DIR=backend/uploaded_files
+  UPLOAD_MAX_MB=200
+  UPLOAD_CHUNKED_MAX_MB=2048
+  UPLOAD_PART_MB=8
+  UPLOAD_SESSION_TTL_HOURS=24
+"""
+
+import os
+import re
+import json
+import time
+import glob
+import uuid
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import anyio
+
+from services import pdf_text
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploaded_files")
+DEFAULT_MAX_MB = 200
+DEFAULT_CHUNKED_MAX_MB = 2048
+DEFAULT_PART_MB = 8
+MIN_PART_SIZE = 256 * 1024
+MAX_PART_SIZE = 64 * 1024 * 1024
+MAX_PARTS = 10000
+DEFAULT_SESSION_TTL_HOURS = 24
+GC_INTERVAL = 600
+CHUNK_SIZE = 1024 * 1024
+
+_SHA_RE = re.compile(r"^[0-9a-f]{64}$")
+_UPLOAD_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"파일이 너무 큽니다 (최대 {max_bytes // (1024 * 1024)}MB).")
+        self.max_bytes = max_bytes
+
+
+def get_upload_root() -> Path:
+    root = Path(os.getenv("UPLOAD_DIR", DEFAULT_ROOT))
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def get_max_bytes() -> int:
+    return int(float(os.getenv("UPLOAD_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+
+
+def exceeds_limit(content_length: Optional[str], max_bytes: Optional[int] = None) -> bool:
+    """요청 헤더의 Content-Length 만으로 미리 거를 수 있는지 (multipart 오버헤드 여유 64KB)"""
+    try:
+        n = int(content_length or 0)
+    except ValueError:
+        return False
+    return n > (get_max_bytes() if max_bytes is None else max_bytes) + 64 * 1024
+
+
+def _ext(filename: Optional[str]) -> str:
+    ext = Path(filename or "").suffix.lower().lstrip(".")
+    return ext if re.fullmatch(r"[a-z0-9]{1,8}", ext) else "bin"
+
+
+def object_path(sha256: str, ext: str) -> Path:
+    return get_upload_root() / "objects" / sha256[:2] / f"{sha256}.{ext}"
+
+
+def _meta_path(sha256: str) -> Path:
+    return get_upload_root() / "meta" / f"{sha256}.json"
+
+
+def _load_meta(sha256: str) -> Optional[dict]:
+    try:
+        with open(_meta_path(sha256), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_meta(meta: dict):
+    path = _meta_path(meta["sha256"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def commit_object(tmp_path: Path, sha256: str, size: int, filename: Optional[str],
+                  owner: Optional[str] = None) -> dict:
+    """
+    다 받은 임시 파일을 내용 주소 위치로 옮김 (같은 내용이 이미 있으면 임시 파일만 삭제)
+    반환: {"file_id", "sha256", "size", "filename", "path", "dedup", "text_cached"}
+    """
+    ext = _ext(filename)
+    meta = _load_meta(sha256)
+    if meta is not None:
+        ext = meta["ext"]
+    target = object_path(sha256, ext)
+    dedup = target.exists()
+    if dedup:
+        os.remove(tmp_path)
+    else:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, target)
+    pdf_text.remember_sha256(str(target), sha256)
+
+    meta = meta or {"sha256": sha256, "size": size, "ext": ext, "created": time.time(), "names": {}}
+    if filename:
+        meta["names"][owner or "_"] = filename
+        _save_meta(meta)
+    elif not dedup:
+        _save_meta(meta)
+    return {
+        "file_id": sha256,
+        "sha256": sha256,
+        "size": size,
+        "filename": filename,
+        "path": str(target),
+        "dedup": dedup,
+        "text_cached": pdf_text.is_cached(sha256),
+    }
+
+
+async def save_upload(file, owner: Optional[str] = None, max_bytes: Optional[int] = None) -> dict:
+    """
+    UploadFile → 내용 주소 저장소 (CHUNK_SIZE 씩 읽어서 쓰면서 해시, 크기 제한 초과 시 UploadTooLarge)
+    owner: 원래 파일명을 기록할 단위 (보통 comp_domain)
+    """
+    max_bytes = get_max_bytes() if max_bytes is None else max_bytes
+    tmp_dir = get_upload_root() / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_dir / f"{uuid.uuid4().hex}.part"
+    h = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as out:
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                h.update(chunk)
+                await anyio.to_thread.run_sync(out.write, chunk)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return await anyio.to_thread.run_sync(commit_object, tmp_path, h.hexdigest(), size, file.filename, owner)
+
+
+def find_upload(file_id: str) -> Optional[Path]:
+    """file_id(sha256) → 저장된 파일 경로. 예전 방식(파일명 / uuid.확장자)도 찾음"""
+    if not file_id or "/" in file_id or "\\" in file_id or file_id in {".", ".."}:
+        return None
+    if _SHA_RE.match(file_id):
+        meta = _load_meta(file_id)
+        if meta is not None:
+            path = object_path(file_id, meta["ext"])
+            if path.exists():
+                return path
+    root = get_upload_root()
+    legacy = root / file_id
+    if legacy.is_file():
+        return legacy
+    for path in root.glob(glob.escape(file_id) + ".*"):
+        if path.is_file():
+            return path
+    return None
+
+
+def upload_name(file_id: str, owner: Optional[str] = None) -> Optional[str]:
+    """업로드할 때의 원래 파일명 (owner 가 올린 이름 우선, 예전 방식 파일은 파일명 그대로)"""
+    if _SHA_RE.match(file_id or ""):
+        meta = _load_meta(file_id)
+        if meta is not None:
+            names = meta.get("names") or {}
+            return names.get(owner or "_") or names.get("_") or next(iter(names.values()), None)
+    path = find_upload(file_id)
+    return path.name if path else None
+
+
+# ---------------------------------------------------------
+# 분할 업로드 세션
+#   <root>/sessions/<upload_id>/session.json  : 파일명, 전체 크기, 파트 크기, 업로더
+#   <root>/sessions/<upload_id>/data          : 전체 크기 빈 파일, 파트가 offset 위치에 바로 써짐
+#   <root>/sessions/<upload_id>/parts/<n>     : 검증 끝난 파트의 sha256 (있으면 받은 파트)
+#   <root>/sessions/done/<upload_id>.json     : 완료 결과 (완료 요청 재시도용, TTL 후 삭제)
+# ---------------------------------------------------------
+class UploadSessionError(Exception):
+    """분할 업로드 요청 오류 (status_code 는 그대로 HTTP 응답 코드로 씀)"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+
+
+def get_chunked_max_bytes() -> int:
+    return int(float(os.getenv("UPLOAD_CHUNKED_MAX_MB", DEFAULT_CHUNKED_MAX_MB)) * 1024 * 1024)
+
+
+def get_part_size() -> int:
+    return int(float(os.getenv("UPLOAD_PART_MB", DEFAULT_PART_MB)) * 1024 * 1024)
+
+
+def get_session_ttl() -> float:
+    return float(os.getenv("UPLOAD_SESSION_TTL_HOURS", DEFAULT_SESSION_TTL_HOURS)) * 3600
+
+
+def _sessions_root() -> Path:
+    return get_upload_root() / "sessions"
+
+
+def _session_dir(upload_id: str) -> Path:
+    if not _UPLOAD_ID_RE.match(upload_id or ""):
+        raise UploadSessionError(404, "업로드 세션을 찾을 수 없습니다.")
+    return _sessions_root() / upload_id
+
+
+def _done_path(upload_id: str) -> Path:
+    return _sessions_root() / "done" / f"{upload_id}.json"
+
+
+def _write_json(path: Path, data: dict):
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _load_session(upload_id: str, owner: Optional[str]) -> dict:
+    try:
+        with open(_session_dir(upload_id) / "session.json", "r", encoding="utf-8") as f:
+            session = json.load(f)
+    except (OSError, ValueError):
+        raise UploadSessionError(404, "업로드 세션을 찾을 수 없습니다.")
+    if session.get("owner") != owner:
+        raise UploadSessionError(404, "업로드 세션을 찾을 수 없습니다.")
+    return session
+
+
+def _part_range(session: dict, part_number: int):
+    """파트 번호(1부터) → (offset, 길이)"""
+    if not 1 <= part_number <= session["total_parts"]:
+        raise UploadSessionError(400, f"파트 번호는 1~{session['total_parts']} 이어야 합니다.")
+    offset = (part_number - 1) * session["part_size"]
+    return offset, min(session["part_size"], session["size"] - offset)
+
+
+def _received_parts(upload_id: str) -> dict:
+    parts_dir = _session_dir(upload_id) / "parts"
+    out = {}
+    try:
+        names = os.listdir(parts_dir)
+    except OSError:
+        return out
+    for name in names:
+        if name.isdigit():
+            try:
+                out[int(name)] = (parts_dir / name).read_text().strip()
+            except OSError:
+                pass
+    return out
+
+
+def init_session(filename: Optional[str], size: int, owner: Optional[str] = None,
+                 part_size: Optional[int] = None) -> dict:
+    """분할 업로드 시작 → {"upload_id", "part_size", "total_parts", "expires_at"}"""
+    max_bytes = get_chunked_max_bytes()
+    if size <= 0:
+        raise UploadSessionError(400, "파일 크기가 올바르지 않습니다.")
+    if size > max_bytes:
+        raise UploadSessionError(413, f"파일이 너무 큽니다 (최대 {max_bytes // (1024 * 1024)}MB).")
+    part_size = int(part_size or get_part_size())
+    part_size = max(MIN_PART_SIZE, min(MAX_PART_SIZE, part_size))
+    total_parts = -(-size // part_size)
+    if total_parts > MAX_PARTS:
+        part_size = -(-size // MAX_PARTS)
+        total_parts = -(-size // part_size)
+
+    maybe_gc_sessions()
+    upload_id = uuid.uuid4().hex
+    sdir = _sessions_root() / upload_id
+    (sdir / "parts").mkdir(parents=True)
+    # 전체 크기만큼 미리 잡아 둠 (대부분 파일시스템에서 sparse, 실제 디스크는 쓴 만큼만)
+    with open(sdir / "data", "wb") as f:
+        f.truncate(size)
+    now = time.time()
+    session = {
+        "upload_id": upload_id, "filename": filename, "size": size, "owner": owner,
+        "part_size": part_size, "total_parts": total_parts, "created": now,
+    }
+    _write_json(sdir / "session.json", session)
+    return {"upload_id": upload_id, "part_size": part_size, "total_parts": total_parts,
+            "size": size, "expires_at": now + get_session_ttl()}
+
+
+def session_status(upload_id: str, owner: Optional[str] = None) -> dict:
+    """이어 올리기용: 받은 파트 / 남은 파트 (이미 완료된 세션이면 완료 결과)"""
+    done = _load_done(upload_id, owner)
+    if done is not None:
+        return {"upload_id": upload_id, "status": "completed", "result": done}
+    session = _load_session(upload_id, owner)
+    received = _received_parts(upload_id)
+    return {
+        "upload_id": upload_id, "status": "uploading", "filename": session["filename"],
+        "size": session["size"], "part_size": session["part_size"], "total_parts": session["total_parts"],
+        "received": sorted(received),
+        "missing": [n for n in range(1, session["total_parts"] + 1) if n not in received],
+    }
+
+
+def _open_for_part(path: Path, offset: int):
+    f = open(path, "r+b")
+    f.seek(offset)
+    return f
+
+
+async def write_part(upload_id: str, part_number: int, chunks: AsyncIterator[bytes],
+                     sha256: Optional[str], owner: Optional[str] = None) -> dict:
+    """
+    파트 하나를 data 파일의 자기 위치에 바로 씀 (CHUNK_SIZE 단위 스트리밍)
+    - sha256: 클라이언트가 계산한 파트 해시 (필수), 다르면 400 + 파트는 받지 않은 것으로 처리
+    - 같은 파트를 여러 번 보내도 같은 자리에 덮어쓰므로 결과는 같음
+    """
+    sha256 = (sha256 or "").strip().lower()
+    if not _SHA_RE.match(sha256):
+        raise UploadSessionError(400, "파트 sha256(X-Part-Sha256 헤더)이 필요합니다.")
+    session = _load_session(upload_id, owner)
+    offset, expected = _part_range(session, part_number)
+    sdir = _session_dir(upload_id)
+    marker = sdir / "parts" / str(part_number)
+    # 덮어쓰는 도중 실패하면 예전 표시가 남아 있으면 안 되므로 먼저 지움
+    try:
+        os.remove(marker)
+    except FileNotFoundError:
+        pass
+
+    h = hashlib.sha256()
+    size = 0
+    try:
+        out = await anyio.to_thread.run_sync(_open_for_part, sdir / "data", offset)
+    except FileNotFoundError:
+        raise UploadSessionError(404, "업로드 세션을 찾을 수 없습니다.")
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            size += len(chunk)
+            if size > expected:
+                raise UploadSessionError(400, f"파트 {part_number} 크기는 {expected} 바이트여야 합니다.")
+            h.update(chunk)
+            await anyio.to_thread.run_sync(out.write, chunk)
+    finally:
+        await anyio.to_thread.run_sync(out.close)
+    if size != expected:
+        raise UploadSessionError(400, f"파트 {part_number} 크기는 {expected} 바이트여야 합니다 (받은 크기 {size}).")
+    digest = h.hexdigest()
+    if digest != sha256:
+        raise UploadSessionError(400, f"파트 {part_number} sha256 이 일치하지 않습니다.")
+
+    tmp = marker.with_name(f".{part_number}.{uuid.uuid4().hex}.tmp")
+    try:
+        tmp.write_text(digest)
+        os.replace(tmp, marker)
+    except FileNotFoundError:
+        # 그 사이 세션이 완료/취소됨
+        raise UploadSessionError(404, "업로드 세션을 찾을 수 없습니다.")
+    return {"upload_id": upload_id, "part_number": part_number, "size": size, "sha256": digest}
+
+
+def _load_done(upload_id: str, owner: Optional[str]) -> Optional[dict]:
+    if not _UPLOAD_ID_RE.match(upload_id or ""):
+        return None
+    try:
+        with open(_done_path(upload_id), "r", encoding="utf-8") as f:
+            done = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if done.get("owner") != owner:
+        return None
+    return done["result"]
+
+
+def _hash_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def complete_session(upload_id: str, owner: Optional[str] = None, sha256: Optional[str] = None) -> dict:
+    """
+    모든 파트를 받았으면 data 파일을 해시해서 내용 주소 저장소로 옮김 (파트를 합치는 복사 없음)
+    sha256: (선택) 전체 파일 해시, 주면 검증
+    이미 완료된 세션이면 저장해 둔 결과를 그대로 반환
+    """
+    done = _load_done(upload_id, owner)
+    if done is not None:
+        return done
+    session = _load_session(upload_id, owner)
+    received = _received_parts(upload_id)
+    missing = [n for n in range(1, session["total_parts"] + 1) if n not in received]
+    if missing:
+        raise UploadSessionError(409, f"받지 못한 파트가 있습니다: {missing[:20]}")
+
+    # 동시에 들어온 완료 요청 중 하나만 진행 (디렉터리 이름 바꾸기는 원자적)
+    sdir = _session_dir(upload_id)
+    work = sdir.with_name(f".{upload_id}.completing")
+    try:
+        os.replace(sdir, work)
+    except OSError:
+        done = _load_done(upload_id, owner)
+        if done is not None:
+            return done
+        raise UploadSessionError(409, "이미 완료 처리 중인 업로드입니다.")
+
+    try:
+        digest = _hash_file(work / "data")
+        if sha256 and sha256.strip().lower() != digest:
+            # 파트는 다 맞았는데 전체가 다르면 클라이언트 쪽 순서 문제 → 세션은 되돌려서 다시 보낼 수 있게
+            os.replace(work, sdir)
+            raise UploadSessionError(400, "전체 파일 sha256 이 일치하지 않습니다.")
+        result = commit_object(work / "data", digest, session["size"], session["filename"], owner)
+    except UploadSessionError:
+        raise
+    except BaseException:
+        if work.exists():
+            os.replace(work, sdir)
+        raise
+    done_path = _done_path(upload_id)
+    done_path.parent.mkdir(parents=True, exist_ok=True)
+    _write_json(done_path, {"owner": owner, "completed": time.time(), "result": result})
+    shutil.rmtree(work, ignore_errors=True)
+    return result
+
+
+def abort_session(upload_id: str, owner: Optional[str] = None) -> bool:
+    _load_session(upload_id, owner)
+    shutil.rmtree(_session_dir(upload_id), ignore_errors=True)
+    return True
+
+
+def gc_sessions(ttl: Optional[float] = None) -> dict:
+    """
+    오래된 분할 업로드 세션 / 완료 기록 / 단일 업로드 임시 파일 정리
+    세션은 마지막 파트를 받은 시각 기준 (parts 디렉터리 mtime)
+    """
+    ttl = get_session_ttl() if ttl is None else ttl
+    cutoff = time.time() - ttl
+    root = _sessions_root()
+    removed = {"sessions": 0, "done": 0, "tmp": 0}
+    if root.exists():
+        for sdir in root.iterdir():
+            name = sdir.name.lstrip(".").replace(".completing", "")
+            if not sdir.is_dir() or not _UPLOAD_ID_RE.match(name):
+                continue
+            try:
+                last = max(sdir.stat().st_mtime, (sdir / "parts").stat().st_mtime)
+            except OSError:
+                last = 0
+            if last < cutoff:
+                shutil.rmtree(sdir, ignore_errors=True)
+                removed["sessions"] += 1
+        done_dir = root / "done"
+        if done_dir.exists():
+            for path in done_dir.glob("*.json"):
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        removed["done"] += 1
+                except OSError:
+                    pass
+    tmp_dir = get_upload_root() / "tmp"
+    if tmp_dir.exists():
+        for path in tmp_dir.glob("*.part"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed["tmp"] += 1
+            except OSError:
+                pass
+    return removed
+
+
+_gc_lock = threading.Lock()
+_last_gc = 0.0
+
+
+def maybe_gc_sessions():
+    """세션 시작할 때 GC_INTERVAL 마다 한 번씩 정리"""
+    global _last_gc
+    with _gc_lock:
+        if time.time() - _last_gc < GC_INTERVAL:
+            return
+        _last_gc = time.time()
+    try:
+        removed = gc_sessions()
+        if any(removed.values()):
+            print(f"🧹 업로드 세션 정리: {removed}")
+    except Exception as e:
+        print("⚠️ 업로드 세션 정리 실패:", e)
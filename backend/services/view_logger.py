@@ -3,7 +3,7 @@ from typing import Optional, Iterable
 from sqlalchemy import update, select
 from sqlalchemy.engine import CursorResult
 
-from db.session import SessionLocal
+from db.session import SessionLocal, get_async_sessionmaker
 from models.faq import CompFAQ
 
 def increment_view_by_qa_id(qa_id: int) -> bool:
@@ -65,3 +65,42 @@ def increment_views_bulk(qa_ids: Iterable[int]) -> int:
         res: CursorResult = db.execute(stmt)
         db.commit()
         return int(res.rowcount or 0)
+
+
+# ---------------------------------------------------------
+# 비동기 버전 (async def 엔드포인트에서 await, 이벤트 루프를 막지 않음)
+# ---------------------------------------------------------
+async def aincrement_view_by_qa_id(qa_id: int) -> bool:
+    async with get_async_sessionmaker()() as db:
+        res = await db.execute(
+            update(CompFAQ)
+            .where(CompFAQ.qa_id == qa_id)
+            .values(views=CompFAQ.views + 1)
+        )
+        await db.commit()
+        return (res.rowcount or 0) > 0
+
+async def aincrement_view_by_question_exact(question: str) -> bool:
+    async with get_async_sessionmaker()() as db:
+        qa_id = (await db.execute(
+            select(CompFAQ.qa_id).where(CompFAQ.question == question).limit(1)
+        )).scalar()
+        if qa_id is None:
+            return False
+        res = await db.execute(
+            update(CompFAQ)
+            .where(CompFAQ.qa_id == qa_id)
+            .values(views=CompFAQ.views + 1)
+        )
+        await db.commit()
+        return (res.rowcount or 0) > 0
+
+async def aincrement_view_from_metadata(meta: dict) -> bool:
+    """increment_view_from_metadata 의 비동기 버전 (우선순위: qa_id -> question 완전일치)"""
+    if not meta:
+        return False
+    if "qa_id" in meta and meta["qa_id"] is not None:
+        return await aincrement_view_by_qa_id(int(meta["qa_id"]))
+    if "question" in meta and meta["question"]:
+        return await aincrement_view_by_question_exact(str(meta["question"]))
+    return False
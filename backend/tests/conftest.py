@@ -0,0 +1,6 @@
+# backend/tests/conftest.py
+# backend/ 를 import 루트로 (앱 코드와 같은 방식: services.xxx, db.xxx)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,125 @@
+# backend/tests/test_db_routing.py
+import pytest
+from sqlalchemy import create_engine, text, insert, table, column
+
+from db import session as db_session
+from db.session import ReplicaPool, RoutingSession, _request_state, _track_writes
+
+t = table("t", column("v"))
+
+
+def _sqlite(path, value: str):
+    eng = create_engine(f"sqlite:///{path}")
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE t (v TEXT)"))
+        conn.execute(text("INSERT INTO t VALUES (:v)"), {"v": value})
+    eng.dispose()
+    return f"sqlite:///{path}"
+
+
+@pytest.fixture
+def primary(tmp_path, monkeypatch):
+    eng = create_engine(_sqlite(tmp_path / "primary.db", "primary"))
+    _track_writes(eng)
+    monkeypatch.setattr(db_session, "engine", eng)
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def use_pool(monkeypatch):
+    """레플리카 풀 교체 (테스트 끝나면 원래대로)"""
+    def _set(pool):
+        monkeypatch.setattr(db_session, "_replica_pool", pool)
+        monkeypatch.setattr(db_session, "_replica_loaded", True)
+        return pool
+    return _set
+
+
+@pytest.fixture
+def pool(tmp_path, use_pool):
+    p = use_pool(ReplicaPool([_sqlite(tmp_path / "r1.db", "replica1"),
+                              _sqlite(tmp_path / "r2.db", "replica2")]))
+    yield p
+    for e in p.engines:
+        e.dispose()
+
+
+@pytest.fixture
+def request_state():
+    token = _request_state.set({"wrote": False})
+    yield
+    _request_state.reset(token)
+
+
+def _read(s) -> str:
+    return s.execute(text("SELECT v FROM t")).scalar()
+
+
+def test_reads_go_to_replicas_round_robin(primary, pool):
+    with RoutingSession(bind=primary) as s1, RoutingSession(bind=primary) as s2:
+        assert {_read(s1), _read(s2)} == {"replica1", "replica2"}
+    assert [r["picks"] for r in pool.stats()["replicas"]] == [1, 1]
+
+
+def test_writes_go_to_primary(primary, pool):
+    with RoutingSession(bind=primary) as s:
+        assert s.get_bind(clause=insert(t).values(v="x")) is primary
+        assert s.get_bind(clause=text("  update t set v = 'x'")) is primary
+        assert s.get_bind(clause=text("SELECT v FROM t")) in pool.engines
+
+
+def test_read_after_write_in_request_uses_primary(primary, pool, request_state):
+    with RoutingSession(bind=primary) as s:
+        assert _read(s).startswith("replica")
+        with primary.begin() as conn:
+            conn.execute(insert(t).values(v="new"))
+        assert db_session.wrote_in_request()
+        assert _read(s) == "primary"
+
+
+def test_write_outside_request_does_not_pin(primary, pool):
+    with primary.begin() as conn:
+        conn.execute(insert(t).values(v="new"))
+    with RoutingSession(bind=primary) as s:
+        assert _read(s).startswith("replica")
+
+
+def test_down_replica_falls_back_to_primary(primary, pool):
+    with RoutingSession(bind=primary) as s:
+        pool.mark_down(pool.engines.index(s._replica))
+        # 세션을 만든 뒤에 죽은 레플리카 → primary
+        assert _read(s) == "primary"
+    for i in range(len(pool.engines)):
+        pool.mark_down(i)
+    with RoutingSession(bind=primary) as s:
+        assert _read(s) == "primary"
+    assert pool.stats()["primary_fallbacks"] == 1
+
+
+def test_without_replicas_everything_uses_primary(primary, use_pool):
+    use_pool(None)
+    with RoutingSession(bind=primary) as s:
+        assert s.get_bind() is primary
+        assert _read(s) == "primary"
+
+
+def test_failed_replica_read_is_retried_on_primary(primary, tmp_path, use_pool):
+    # 열 수 없는 경로 → 연결 실패 (handle_error 가 레플리카를 내림)
+    pool = use_pool(ReplicaPool([f"sqlite:///{tmp_path / 'missing' / 'r.db'}"]))
+    with RoutingSession(bind=primary) as s:
+        assert s._replica is pool.engines[0]
+        assert _read(s) == "primary"          # 실패한 그 요청도 500 대신 primary 결과
+        assert _read(s) == "primary"
+    assert pool.stats()["replicas"][0]["up"] is False
+
+
+def test_query_error_on_replica_is_not_retried(primary, tmp_path, use_pool):
+    from sqlalchemy.exc import OperationalError
+    empty = tmp_path / "empty.db"
+    create_engine(f"sqlite:///{empty}").connect().close()   # 테이블 없는 레플리카
+    pool = use_pool(ReplicaPool([f"sqlite:///{empty}"]))
+    with RoutingSession(bind=primary) as s:
+        with pytest.raises(OperationalError):
+            _read(s)
+    assert pool.stats()["replicas"][0]["up"] is True
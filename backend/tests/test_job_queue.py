@@ -0,0 +1,100 @@
+# backend/tests/test_job_queue.py
+import types
+
+import pytest
+
+from services import job_queue
+from services.job_queue import JobQueue, QUEUED, RUNNING, DONE, DEAD, BACKOFF_BASE
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """job_queue 안의 time.time 만 고정 (now[0] 을 바꿔 시간 이동)"""
+    now = [1000.0]
+    monkeypatch.setattr(job_queue, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_lease_and_complete(queue):
+    job_id = queue.enqueue("k", {"a": 1}, queue="q")
+    jobs = queue.lease(["q"], "w1", lease_seconds=30)
+    assert [j["job_id"] for j in jobs] == [job_id]
+    assert jobs[0]["status"] == RUNNING and jobs[0]["attempts"] == 1
+    # 임대 중인 작업은 다른 워커가 못 가져감
+    assert queue.lease(["q"], "w2") == []
+    assert queue.complete(job_id, "w1", {"rows": []})
+    job = queue.get(job_id)
+    assert job["status"] == DONE and job["result"] == {"rows": []}
+
+
+def test_expired_lease_is_reclaimed(queue, clock):
+    job_id = queue.enqueue("k", queue="q")
+    queue.lease(["q"], "w1", lease_seconds=30)
+    clock[0] += 10
+    assert queue.heartbeat([job_id], "w1", lease_seconds=30) == 1   # 연장 → 시작 후 40초에 만료
+    clock[0] += 25
+    assert queue.lease(["q"], "w2") == []
+    clock[0] += 10
+    jobs = queue.lease(["q"], "w2", lease_seconds=30)
+    assert [j["job_id"] for j in jobs] == [job_id]
+    assert jobs[0]["attempts"] == 2
+    # 넘어간 작업은 이전 워커가 연장 / 완료할 수 없음
+    assert queue.heartbeat([job_id], "w1") == 0
+    assert not queue.complete(job_id, "w1")
+    assert queue.complete(job_id, "w2")
+
+
+def test_fail_backs_off_exponentially(queue, clock):
+    job_id = queue.enqueue("k", queue="q", max_attempts=5)
+    queue.lease(["q"], "w1")
+    assert queue.fail(job_id, "w1", "boom") == QUEUED
+    job = queue.get(job_id)
+    assert job["run_after"] == clock[0] + BACKOFF_BASE
+    assert job["last_error"] == "boom"
+    assert queue.lease(["q"], "w1") == []            # 백오프 동안은 임대 안 됨
+
+    clock[0] += BACKOFF_BASE
+    queue.lease(["q"], "w1")
+    assert queue.fail(job_id, "w1", "boom") == QUEUED
+    assert queue.get(job_id)["run_after"] == clock[0] + BACKOFF_BASE * 2
+
+
+def test_dead_letter_after_max_attempts(queue, clock):
+    job_id = queue.enqueue("k", queue="q", max_attempts=2)
+    queue.lease(["q"], "w1")
+    assert queue.fail(job_id, "w1", "first") == QUEUED
+    clock[0] += BACKOFF_BASE
+    queue.lease(["q"], "w1")
+    assert queue.fail(job_id, "w1", "second") == DEAD
+    job = queue.get(job_id)
+    assert job["status"] == DEAD and job["last_error"] == "second"
+    assert queue.lease(["q"], "w1") == []
+    assert queue.counts("q") == {DEAD: 1}
+
+    assert queue.retry_dead(job_id)
+    job = queue.get(job_id)
+    assert job["status"] == QUEUED and job["attempts"] == 0
+
+
+def test_expired_lease_without_attempts_left_goes_dead(queue, clock):
+    job_id = queue.enqueue("k", queue="q", max_attempts=1)
+    queue.lease(["q"], "w1", lease_seconds=30)
+    clock[0] += 31
+    assert queue.lease(["q"], "w2") == []
+    job = queue.get(job_id)
+    assert job["status"] == DEAD and job["last_error"] == "lease expired"
+
+
+def test_exclusive_queue_single_writer(queue):
+    queue.enqueue("k", queue="index")
+    queue.enqueue("k", queue="index")
+    assert len(queue.lease(["index"], "w1", exclusive=True)) == 1
+    # 다른 워커의 임대가 살아 있으면 exclusive 임대는 빈손
+    assert queue.lease(["index"], "w2", exclusive=True) == []
+    # 같은 워커는 이어서 가져갈 수 있음
+    assert len(queue.lease(["index"], "w1", exclusive=True)) == 1
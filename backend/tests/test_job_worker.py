@@ -0,0 +1,45 @@
+# backend/tests/test_job_worker.py
+from services import job_worker
+from services.job_worker import HANDLERS, KIND_FAQ_EXTRACT
+
+
+def test_faq_extract_handler_registered():
+    assert HANDLERS[KIND_FAQ_EXTRACT] is job_worker._faq_extract
+
+
+def test_helpers_are_not_handlers():
+    assert job_worker._mark_document not in HANDLERS.values()
+
+
+def test_faq_extract_forwards_forced_progress(tmp_path, monkeypatch):
+    """faq_from_pdf 는 on_progress(progress, force=True) 로 마지막 진행 상황을 보냄"""
+    import sys
+    import types
+    from services.job_queue import JobQueue
+
+    calls = []
+
+    async def faq_from_pdf(pdf_path, on_progress=None, **kwargs):
+        on_progress({"pages_total": 3, "pages_done": 1})
+        on_progress({"pages_total": 3, "pages_done": 3}, force=True)
+        return [{"question": "q", "answer": "a"}]
+
+    fake = types.ModuleType("api.main_faq")
+    fake.faq_from_pdf = faq_from_pdf
+    fake.save_rows_to_db = lambda *a, **kw: calls.append("save")
+    fake.DEFAULT_MAX_PER_SECTION = 5
+    fake.MIN_CONFIDENCE = 0.0
+    monkeypatch.setitem(sys.modules, "api.main_faq", fake)
+
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    queue.enqueue(KIND_FAQ_EXTRACT, {"pdf_path": str(pdf)}, queue="extract")
+    job = queue.lease(["extract"], "w1")[0]
+    ctx = job_worker.JobContext(job, queue, "w1")
+
+    result = job_worker._faq_extract(job["payload"], ctx)
+    assert result == {"count": 1, "rows": [{"question": "q", "answer": "a"}]}
+    assert calls == []
+    # 간격 제한 안에 두 번 왔어도 force 로 보낸 마지막 진행 상황이 기록됨
+    assert queue.get(job["job_id"])["progress"] == {"pages_total": 3, "pages_done": 3}
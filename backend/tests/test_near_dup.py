@@ -0,0 +1,52 @@
+# backend/tests/test_near_dup.py
+from services.near_dup import dedup, jaccard, shingles, normalize_question
+
+
+def _rows(*questions):
+    return [{"question": q, "answer": f"답변 {i}"} for i, q in enumerate(questions)]
+
+
+def test_normalize_ignores_case_and_punctuation():
+    assert normalize_question("연차는  몇 일인가요?!") == normalize_question("연차는 몇 일인가요")
+    assert jaccard(shingles("Annual Leave?"), shingles("annual leave")) == 1.0
+
+
+def test_dedup_within_batch_keeps_first():
+    rows = _rows(
+        "연차휴가는 1년에 며칠인가요?",
+        "연차 휴가는 1년에 며칠인가요",          # 띄어쓰기 / 문장부호만 다름
+        "퇴직금은 언제 지급되나요?",
+    )
+    kept, report = dedup(rows, threshold=0.7)
+    assert [r["question"] for r in kept] == [rows[0]["question"], rows[2]["question"]]
+    assert report["input"] == 3 and report["kept"] == 2
+    assert report["merged_in_batch"] == 1 and report["merged_existing"] == 0
+    merged = report["merged"][0]
+    assert merged["source"] == "batch"
+    assert merged["duplicate_of"] == rows[0]["question"]
+    assert merged["similarity"] >= 0.7
+
+
+def test_dedup_against_existing_reports_qa_id():
+    existing = [(101, "출장비 정산은 어떻게 하나요?"), (102, "육아휴직 신청 절차가 궁금합니다")]
+    rows = _rows("출장비 정산은 어떻게 하나요", "재택근무 신청은 어디서 하나요?")
+    kept, report = dedup(rows, existing=existing, threshold=0.7)
+    assert [r["question"] for r in kept] == [rows[1]["question"]]
+    assert report["existing_checked"] == 2
+    assert report["merged_existing"] == 1
+    assert report["merged"][0]["qa_id"] == 101
+    assert report["merged"][0]["source"] == "existing"
+
+
+def test_threshold_one_only_merges_identical():
+    rows = _rows("연차휴가는 1년에 며칠인가요?", "연차휴가는 1년에 며칠까지인가요?", "연차휴가는 1년에 며칠인가요")
+    kept, report = dedup(rows, threshold=1.0)
+    assert len(kept) == 2
+    assert report["merged"][0]["question"] == rows[2]["question"]
+
+
+def test_distinct_questions_are_all_kept():
+    rows = _rows("연차휴가 일수", "퇴직금 계산 방법", "출장비 정산 절차", "복지포인트 사용처")
+    kept, report = dedup(rows, threshold=0.7)
+    assert kept == rows
+    assert report["merged"] == []
@@ -0,0 +1,36 @@
+# backend/tests/test_rate_limiter.py
+import asyncio
+import sqlite3
+import threading
+
+from services.rate_limiter import RateLimiter, INTERACTIVE
+
+
+def test_sqlite_state_wait_does_not_block_event_loop(tmp_path):
+    limiter = RateLimiter(rpm=60, tpm=1000, state_path=str(tmp_path / "rl.sqlite3"))
+    # 다른 프로세스가 버킷을 잠그고 있는 상황
+    holder = sqlite3.connect(limiter._state.path, isolation_level=None, check_same_thread=False)
+    holder.execute("BEGIN IMMEDIATE")
+    release = threading.Timer(0.3, lambda: holder.execute("COMMIT"))
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.02)
+                ticks += 1
+
+        t = asyncio.create_task(ticker())
+        release.start()
+        await limiter.aacquire(10, INTERACTIVE)
+        t.cancel()
+        return ticks
+
+    try:
+        assert asyncio.run(main()) >= 5   # 잠금을 기다리는 동안에도 루프가 돌았음
+    finally:
+        release.join()
+        holder.close()
+    assert limiter.stats()["calls"][INTERACTIVE] == 1
@@ -0,0 +1,111 @@
+# backend/tests/test_upload_store.py
+import hashlib
+import os
+
+import anyio
+import pytest
+
+from services import upload_store
+from services.upload_store import (
+    UploadSessionError, MIN_PART_SIZE,
+    init_session, write_part, complete_session, session_status,
+)
+
+OWNER = "acme.com"
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setenv("PDF_TEXT_CACHE_DISABLED", "1")
+    return tmp_path / "uploads"
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _put(upload_id: str, n: int, data: bytes, sha: str = None):
+    async def chunks():
+        for i in range(0, len(data), 100_000):
+            yield data[i:i + 100_000]
+
+    return anyio.run(write_part, upload_id, n, chunks(), sha or _sha(data), OWNER)
+
+
+def _parts(data: bytes, part_size: int):
+    return {i // part_size + 1: data[i:i + part_size] for i in range(0, len(data), part_size)}
+
+
+@pytest.fixture
+def payload():
+    return os.urandom(MIN_PART_SIZE * 2 + 1234)
+
+
+def test_chunked_upload_completes_out_of_order(payload):
+    s = init_session("규정.pdf", len(payload), owner=OWNER, part_size=MIN_PART_SIZE)
+    assert s["total_parts"] == 3
+    parts = _parts(payload, s["part_size"])
+
+    _put(s["upload_id"], 3, parts[3])
+    _put(s["upload_id"], 1, parts[1])
+    _put(s["upload_id"], 1, parts[1])   # 재시도: 같은 자리에 덮어씀
+    assert session_status(s["upload_id"], OWNER)["missing"] == [2]
+    _put(s["upload_id"], 2, parts[2])
+
+    result = complete_session(s["upload_id"], OWNER, sha256=_sha(payload))
+    assert result["file_id"] == _sha(payload)
+    assert result["size"] == len(payload) and result["filename"] == "규정.pdf"
+    with open(result["path"], "rb") as f:
+        assert f.read() == payload
+    # 완료 요청 재시도 → 같은 결과
+    assert complete_session(s["upload_id"], OWNER) == result
+    assert session_status(s["upload_id"], OWNER)["status"] == "completed"
+
+
+def test_part_sha_mismatch_is_rejected(payload):
+    s = init_session("a.pdf", len(payload), owner=OWNER, part_size=MIN_PART_SIZE)
+    parts = _parts(payload, s["part_size"])
+    for n in (1, 3):
+        _put(s["upload_id"], n, parts[n])
+
+    with pytest.raises(UploadSessionError) as e:
+        _put(s["upload_id"], 2, parts[2], sha=_sha(b"other"))
+    assert e.value.status_code == 400
+    # 검증 실패한 파트는 받은 것으로 치지 않음
+    assert session_status(s["upload_id"], OWNER)["missing"] == [2]
+    with pytest.raises(UploadSessionError) as e:
+        complete_session(s["upload_id"], OWNER)
+    assert e.value.status_code == 409
+
+
+def test_whole_file_sha_mismatch_keeps_session(payload):
+    s = init_session("a.pdf", len(payload), owner=OWNER, part_size=MIN_PART_SIZE)
+    for n, data in _parts(payload, s["part_size"]).items():
+        _put(s["upload_id"], n, data)
+
+    with pytest.raises(UploadSessionError) as e:
+        complete_session(s["upload_id"], OWNER, sha256=_sha(b"other"))
+    assert e.value.status_code == 400
+    # 세션은 되돌려져서 다시 완료할 수 있음
+    assert session_status(s["upload_id"], OWNER)["missing"] == []
+    assert complete_session(s["upload_id"], OWNER)["file_id"] == _sha(payload)
+
+
+def test_same_content_is_deduplicated(payload):
+    results = []
+    for name in ("a.pdf", "b.pdf"):
+        s = init_session(name, len(payload), owner=OWNER, part_size=MIN_PART_SIZE)
+        for n, data in _parts(payload, s["part_size"]).items():
+            _put(s["upload_id"], n, data)
+        results.append(complete_session(s["upload_id"], OWNER))
+    assert [r["dedup"] for r in results] == [False, True]
+    assert results[0]["path"] == results[1]["path"]
+    assert upload_store.upload_name(results[0]["file_id"], OWNER) == "b.pdf"
+
+
+def test_other_owner_cannot_see_session(payload):
+    s = init_session("a.pdf", len(payload), owner=OWNER, part_size=MIN_PART_SIZE)
+    with pytest.raises(UploadSessionError) as e:
+        session_status(s["upload_id"], "other.com")
+    assert e.value.status_code == 404
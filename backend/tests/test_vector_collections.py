@@ -0,0 +1,30 @@
+# backend/tests/test_vector_collections.py
+import pytest
+
+from db.vector_collections import UnknownCollectionError, check_collections
+
+
+@pytest.fixture(autouse=True)
+def vstore_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("VSTORE_ROOT", str(tmp_path))
+    for key in ("VSTORE_DIR", "VSTORE_DIR_FAQ", "VSTORE_DIR_LAWS"):
+        monkeypatch.delenv(key, raising=False)
+    return tmp_path
+
+
+def _make_index(root, name):
+    d = root / "collections" / name
+    d.mkdir(parents=True)
+    (d / "index.faiss").write_bytes(b"")
+
+
+def test_builtin_and_indexed_collections_are_allowed(vstore_root):
+    _make_index(vstore_root, "policies")
+    names = ["faq", "faq/acme.com", "laws", "policies"]
+    assert check_collections(names) == names
+
+
+@pytest.mark.parametrize("name", ["../../etc", "faq_x", "policies", "laws/acme.com", "/tmp/x"])
+def test_unknown_collection_is_rejected(name):
+    with pytest.raises(UnknownCollectionError):
+        check_collections(["faq", name])